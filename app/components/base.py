@@ -67,14 +67,14 @@ ConnectionType = base_module.ConnectionType\n\n\n"""
 
 # ==================== 工具函数 ====================
 
-def _get_node_temp_dir(node_id: Optional[str]) -> Path:
-    """获取节点专属临时目录"""
+def _get_node_temp_dir(node_id: Optional[str], work_dir: Optional[str] = None) -> Path:
+    """获取节点专属临时目录；work_dir 为进程内执行时的项目目录（子进程已切换工作目录，为 None）"""
     if not node_id:
         # 无 node_id 时回退到系统临时目录（兼容旧逻辑）
         import tempfile
         return Path(tempfile.mkdtemp())
 
-    base_dir = Path("temp_runs") / "nodes" / node_id
+    base_dir = Path(work_dir or ".") / "temp_runs" / "nodes" / node_id
     base_dir.mkdir(parents=True, exist_ok=True)
     return base_dir
 
@@ -431,6 +431,32 @@ class BaseComponent(ABC):
     properties: Dict[str, PropertyDefinition] = {}
     logger = logger
     global_variable: GlobalVariableContext = GlobalVariableContext()
+    # 导出服务中强制以子进程隔离执行（不可信或依赖冲突的组件）
+    run_in_subprocess: bool = False
+    # 部分结果回调 (output_name, chunk)，由执行器在流式运行时注入
+    _partial_callback = None
+    # 进程内执行时由执行器设为项目目录，相对路径的输出（temp_runs）按此目录解析
+    work_dir: Optional[str] = None
+
+    @staticmethod
+    def requires_process_env(global_vars: Optional[Dict[str, Any]]) -> bool:
+        """全局变量中是否配置了默认值以外的环境变量；进程内执行不修改 os.environ，这类组件需要子进程隔离"""
+        metadata = ((global_vars or {}).get("env") or {}).get("metadata") or {}
+        return any(DEFAULT_PYTHON_ENV_VARS.get(k) != str(v) for k, v in metadata.items() if v is not None)
+
+    @property
+    def streaming_enabled(self) -> bool:
+        """当前执行是否有流式消费者（如 /run/stream）"""
+        return self._partial_callback is not None
+
+    def emit_partial(self, output_name: str, chunk: Any):
+        """推送部分结果（如大模型逐 token 输出），无流式消费者时为空操作"""
+        if self._partial_callback is None:
+            return
+        try:
+            self._partial_callback(output_name, chunk)
+        except Exception as e:
+            self.logger.warning(f"推送部分结果失败: {e}")
 
     @abstractmethod
     def run(self, params: BaseModel, inputs: BaseModel = None) -> Dict[str, Any]:
@@ -778,7 +804,7 @@ class BaseComponent(ABC):
 
     def _store_sklearn_model(self, model: Any, node_id: str = None) -> str:
         """存储sklearn模型到节点专属目录"""
-        temp_dir = _get_node_temp_dir(node_id)
+        temp_dir = _get_node_temp_dir(node_id, self.work_dir)
         model_path = temp_dir / f"model_{uuid.uuid4().hex}.pkl"
         with open(model_path, 'wb') as f:
             pickle.dump(model, f)
@@ -789,7 +815,7 @@ class BaseComponent(ABC):
         torch = _get_torch()
         if torch is None:
             raise ComponentError("torch 未安装", "MISSING_DEPENDENCY")
-        temp_dir = _get_node_temp_dir(node_id)
+        temp_dir = _get_node_temp_dir(node_id, self.work_dir)
         model_path = temp_dir / f"model_{uuid.uuid4().hex}.pth"
         scripted_model = torch.jit.script(model)
         scripted_model.save(str(model_path))
@@ -801,14 +827,14 @@ class BaseComponent(ABC):
             image = Image.fromarray(image)
         elif not isinstance(image, Image.Image):
             raise ComponentError(f"无法存储图像数据: {type(image)}")
-        temp_dir = _get_node_temp_dir(node_id)
+        temp_dir = _get_node_temp_dir(node_id, self.work_dir)
         image_path = temp_dir / f"image_{uuid.uuid4().hex}.png"
         image.save(image_path, 'PNG')
         return str(image_path)
 
     def _store_file_data(self, data: str, node_id: str = None) -> str:
         """存储文件数据到节点专属目录"""
-        temp_dir = _get_node_temp_dir(node_id)
+        temp_dir = _get_node_temp_dir(node_id, self.work_dir)
         file_path = temp_dir / f"file_{uuid.uuid4().hex}.txt"
         file_path.write_text(str(data), encoding='utf-8')
         return str(file_path)
@@ -819,9 +845,13 @@ class BaseComponent(ABC):
             params: Dict[str, Any],
             inputs: Optional[Dict[str, Any]] = None,
             global_vars: Dict[str, Any] = None,
-            node_id: str = None
+            node_id: str = None,
+            apply_env: bool = True
     ) -> Dict[str, Any]:
-        """执行组件，包含错误处理和数据类型转换"""
+        """
+        执行组件，包含错误处理和数据类型转换
+        apply_env=False 时不把全局变量中的环境变量写入 os.environ（进程内多线程执行共享同一个进程环境）
+        """
         try:
             if global_vars is not None:
                 self.global_variable.deserialize(global_vars)
@@ -849,7 +879,7 @@ class BaseComponent(ABC):
                 if v is not None
             }
 
-            with temporary_env(safe_env):
+            with temporary_env(safe_env if apply_env else {}):
                 result = self.run(validated_params, validated_inputs)
 
             if not self.validate_outputs(result):
@@ -178,17 +178,23 @@ class Component(BaseComponent):
                 extra_body[item["key"]] = item["value"]
 
         try:
-            response = client.chat.completions.create(
-                extra_body=extra_body,
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            self.logger.info(response)
-
-            reply = response.choices[0].message.content.strip()
-            raw_data = response.model_dump()
+            if self.streaming_enabled:
+                # 有流式消费者时逐 token 推送部分结果
+                reply, raw_data = self._stream_completion(
+                    client, extra_body, model, messages, temperature, max_tokens
+                )
+            else:
+                response = client.chat.completions.create(
+                    extra_body=extra_body,
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                self.logger.info(response)
+
+                reply = response.choices[0].message.content.strip()
+                raw_data = response.model_dump()
 
             # 更新历史记录
             history_message = {
@@ -219,6 +225,44 @@ class Component(BaseComponent):
             self.logger.error(f"调用大模型时发生错误: {str(e)}")
             raise e
 
+    def _stream_completion(self, client, extra_body, model, messages, temperature, max_tokens):
+        """
+        流式调用大模型，每个增量通过 emit_partial 推送到 response 输出
+        """
+        stream = client.chat.completions.create(
+            extra_body=extra_body,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        chunks = []
+        response_id, finish_reason = None, None
+        for chunk in stream:
+            response_id = response_id or chunk.id
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta.content if choice.delta else None
+            if delta:
+                chunks.append(delta)
+                self.emit_partial("response", delta)
+
+        reply = "".join(chunks).strip()
+        raw_data = {
+            "id": response_id,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": finish_reason,
+            }],
+        }
+        self.logger.info(raw_data)
+        return reply, raw_data
+
     def _is_valid_base64(self, s: str) -> bool:
         """
         验证字符串是否为有效的base64编码
@@ -3,6 +3,7 @@ import json
 import os
 import pathlib
 import shutil
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -11,8 +12,7 @@ from NodeGraphQt import BackdropNode, BaseNode
 from NodeGraphQt.constants import PipeLayoutEnum
 from NodeGraphQt.widgets.viewer import NodeViewer
 from PyQt5 import QtCore, QtGui
-from PyQt5.QtCore import Qt, QRectF, pyqtSignal, QSize, QTimer, QPoint
-from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QTimer, QPoint
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QFileDialog, QProgressDialog, QApplication
 from loguru import logger
 from qfluentwidgets import (
@@ -28,12 +28,17 @@ from app.nodes.dynamic_code_node import create_dynamic_code_node
 from app.nodes.execute_node import create_node_class
 from app.nodes.port_node import CustomPortOutputNode, CustomPortInputNode
 from app.nodes.status_node import NodeStatus, StatusNode
+from app.runner.bundle import build_bundle
 from app.scan_components import scan_components
 from app.scheduler.workflow_scheduler import WorkflowScheduler  # ← 新增导入
+from app.utils.artifact_store import get_artifact_store
+from app.utils.component_watcher import ComponentWatcher
 from app.utils.config import Settings
 from app.utils.quick_component_manager import QuickComponentManager
-from app.utils.threading_utils import ThumbnailGenerator
-from app.utils.utils import serialize_for_json, deserialize_from_json, get_icon
+from app.utils.thumbnail import ThumbnailGenerator, nodes_bounding_rect, render_scene_image
+from app.utils.utils import serialize_for_json, get_icon
+from app.utils.workflow_io import write_workflow
+from app.utils.workflow_journal import WorkflowJournal, JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_ENTRIES
 from app.widgets.custom_nodegraph import CustomNodeGraph
 from app.widgets.dialog_widget.custom_messagebox import ProjectExportDialog
 from app.widgets.dialog_widget.input_selection_dialog import InputSelectionDialog
@@ -58,6 +63,11 @@ class CanvasPage(QWidget):
         "水平": 0,
         "垂直": 1
     }
+    # 加载工作流时进度对话框的最短刷新间隔（秒）
+    PROGRESS_INTERVAL = 0.05
+    # 编辑日志：修改合并后写入的延迟（毫秒）；每隔多少次自动保存压缩一次（整体写回工作流文件）
+    JOURNAL_FLUSH_MS = 500
+    JOURNAL_COMPACT_TICKS = 10
 
     def __init__(self, parent=None, object_name: Path = None):
         super().__init__()
@@ -70,6 +80,7 @@ class CanvasPage(QWidget):
         # 初始化状态存储数据分析/因子分析
         self.node_status = {}  # {node_id: status}
         self.node_type_map = {}
+        self._component_node_classes = {}  # {full_path: 已注册的组件节点类}，热更新时替换其组件类
         self._registered_nodes = []
         self._node_flyout = None
         self._clipboard_data = None
@@ -91,6 +102,8 @@ class CanvasPage(QWidget):
         self.register_components()
         self.nav_panel = DraggableTreePanel(self)
         self.nav_view = self.nav_panel.tree
+        # 组件文件热更新
+        ComponentWatcher.get_instance().components_changed.connect(self._on_components_changed)
         # 属性面板
         self.property_panel = PropertyPanel(self)
         # 布局
@@ -119,6 +132,8 @@ class CanvasPage(QWidget):
         self.canvas_widget.installEventFilter(self)
         # 右键菜单
         self._setup_context_menus()
+        # 编辑日志 / 自动保存
+        self._setup_autosave()
 
     # ========================
     # 调度器相关（核心新增）
@@ -350,6 +365,62 @@ class CanvasPage(QWidget):
         )
         self.create_info("环境切换", f"当前运行环境: {current_text}")
 
+    def _register_component_node(self, full_path, comp_cls, nodes_menu=None):
+        """为组件创建并注册节点类型（含右键菜单）"""
+        nodes_menu = nodes_menu or self.graph.get_context_menu('nodes')
+        safe_name = full_path.replace("/", "_").replace(" ", "_").replace("-", "_")
+        node_class = create_node_class(comp_cls, full_path, self.file_map.get(full_path), self)
+        node_class = type(f"Status{node_class.__name__}", (StatusNode, node_class), {})
+        node_class.__name__ = f"StatusDynamicNode_{safe_name}"
+        self.graph.register_node(node_class)
+        self.node_type_map[full_path] = f"dynamic.{node_class.__name__}"
+        self._component_node_classes[full_path] = node_class
+        if f"dynamic.{node_class.__name__}" not in self._registered_nodes:
+            nodes_menu.add_command('运行此节点', lambda graph, node: self.run_node(node),
+                                   node_type=f"dynamic.{node_class.__name__}")
+            nodes_menu.add_command('运行到此节点', lambda graph, node: self.run_to_node(node),
+                                   node_type=f"dynamic.{node_class.__name__}")
+            nodes_menu.add_command('从此节点开始运行', lambda graph, node: self.run_from_node(node),
+                                   node_type=f"dynamic.{node_class.__name__}")
+            nodes_menu.add_command('调试模式', lambda graph, node: node._toggle_debug_mode(),
+                                   node_type=f"dynamic.{node_class.__name__}")
+            nodes_menu.add_command('编辑组件', lambda graph, node: self.edit_node(node),
+                                   node_type=f"dynamic.{node_class.__name__}")
+            nodes_menu.add_command('查看节点日志', lambda graph, node: node.show_logs(),
+                                   node_type=f"dynamic.{node_class.__name__}")
+            nodes_menu.add_command('删除节点', lambda graph, node: self.delete_node(node),
+                                   node_type=f"dynamic.{node_class.__name__}")
+
+    def _on_components_changed(self, changes):
+        """组件文件热更新：只处理变化的组件，已注册的节点类型与画布中的节点就地刷新"""
+        for full_path in changes["removed"]:
+            self.component_map.pop(full_path, None)
+            self.file_map.pop(full_path, None)
+
+        refreshed = {}
+        for full_path, (comp_cls, file_path) in changes["updated"].items():
+            self.component_map[full_path] = comp_cls
+            self.file_map[full_path] = file_path
+            if full_path not in self.node_type_map:
+                # 新增组件或名称 / 分类变化：注册新的节点类型
+                self._register_component_node(full_path, comp_cls)
+            else:
+                refreshed[full_path] = comp_cls
+                # 节点类型无法重复注册：替换已注册节点类中的组件类，之后新建的节点使用新类
+                node_class = self._component_node_classes.get(full_path)
+                if node_class is not None:
+                    node_class.COMPONENT_CLASS = comp_cls
+
+        for node in self.graph.all_nodes():
+            if getattr(node, "FULL_PATH", None) not in refreshed or not hasattr(node, "refresh_component"):
+                continue
+            try:
+                node.refresh_component(refreshed[node.FULL_PATH])
+                self.set_node_status(node, NodeStatus.NODE_STATUS_UNRUN)
+            except Exception as e:
+                logger.warning(f"刷新节点 {node.name()} 失败: {e}")
+        self.nav_view.refresh_components()
+
     def get_current_python_exe(self):
         current_data = self.env_combo.currentData()
         if hasattr(self.parent, 'package_manager') and self.parent.package_manager and current_data:
@@ -367,27 +438,7 @@ class CanvasPage(QWidget):
         # 普通节点
         nodes_menu = self.graph.get_context_menu('nodes')
         for full_path, comp_cls in self.component_map.items():
-            safe_name = full_path.replace("/", "_").replace(" ", "_").replace("-", "_")
-            node_class = create_node_class(comp_cls, full_path, self.file_map.get(full_path), self)
-            node_class = type(f"Status{node_class.__name__}", (StatusNode, node_class), {})
-            node_class.__name__ = f"StatusDynamicNode_{safe_name}"
-            self.graph.register_node(node_class)
-            self.node_type_map[full_path] = f"dynamic.{node_class.__name__}"
-            if f"dynamic.{node_class.__name__}" not in self._registered_nodes:
-                nodes_menu.add_command('运行此节点', lambda graph, node: self.run_node(node),
-                                       node_type=f"dynamic.{node_class.__name__}")
-                nodes_menu.add_command('运行到此节点', lambda graph, node: self.run_to_node(node),
-                                       node_type=f"dynamic.{node_class.__name__}")
-                nodes_menu.add_command('从此节点开始运行', lambda graph, node: self.run_from_node(node),
-                                       node_type=f"dynamic.{node_class.__name__}")
-                nodes_menu.add_command('调试模式', lambda graph, node: node._toggle_debug_mode(),
-                                       node_type=f"dynamic.{node_class.__name__}")
-                nodes_menu.add_command('编辑组件', lambda graph, node: self.edit_node(node),
-                                       node_type=f"dynamic.{node_class.__name__}")
-                nodes_menu.add_command('查看节点日志', lambda graph, node: node.show_logs(),
-                                       node_type=f"dynamic.{node_class.__name__}")
-                nodes_menu.add_command('删除节点', lambda graph, node: self.delete_node(node),
-                                       node_type=f"dynamic.{node_class.__name__}")
+            self._register_component_node(full_path, comp_cls, nodes_menu)
         # 迭代节点
         code_node = create_dynamic_code_node(self)
         code_node.__name__ = "DYNAMIC_CODE"
@@ -740,6 +791,7 @@ class CanvasPage(QWidget):
             backdrop_node.model.set_property("loop_nums", 3)
 
     def close_current_canvas(self):
+        self.close_journal()
         self.canvas_deleted.emit()
         self.parent.switchTo(self.parent.workflow_manager)
         self.parent.removeInterface(self)
@@ -939,6 +991,11 @@ class CanvasPage(QWidget):
                     "output_name": item["output_name"],
                     "format": item["format"]  # ← 新增
                 }
+            # /run/stream 在节点完成时即推送这些输出，默认与最终输出一致，可手动增补中间节点输出
+            project_spec["streamable"] = {
+                key: {"node_id": cfg["node_id"], "output_name": cfg["output_name"]}
+                for key, cfg in project_spec["outputs"].items()
+            }
             # === 收集组件和依赖 ===
             used_components = set()
             for node in nodes_to_export:
@@ -1015,6 +1072,9 @@ class CanvasPage(QWidget):
 2. 准备输入: 创建 `inputs.json`，如 `{{"input_0": "hello"}}`
 3. 直接运行: `python run.py --input inputs.json`
 4. 创建微服务: `python api_server.py --port 8888`
+5. 批量推理: `POST /run_batch`（JSON 记录列表）或 `POST /run_batch/upload`（CSV/Parquet 文件）；批量模式不支持文件类输入，CSV 输入以内联文本或记录列表传入
+6. 流式执行: `POST /run/stream`（SSE 推送节点进度与大模型逐字输出）
+7. 异步任务: `POST /jobs` 提交，`GET /jobs/{{job_id}}` 查询状态，`GET /jobs/{{job_id}}/result` 获取结果，`POST /jobs/{{job_id}}/cancel` 取消
 """
             # === 弹出新对话框 ===
             export_dialog = ProjectExportDialog(
@@ -1029,6 +1089,7 @@ class CanvasPage(QWidget):
             if not project_name:
                 self.create_warning_info("导出失败", "项目名不能为空！")
                 return
+            project_spec["cache"] = export_dialog.get_cache_settings()
             export_path = pathlib.Path("./projects") / project_name
             export_path.mkdir(parents=True, exist_ok=True)
             # 创建目录
@@ -1184,6 +1245,25 @@ class CanvasPage(QWidget):
                 src = export_path / "runner" / file
                 if src.exists():
                     shutil.move(str(src), str(export_path / file))
+            # 生成预编译执行包：精简执行计划 + 所用组件元数据 + 大体积静态输入旁路文件
+            component_meta = {}
+            for full_path in used_components:
+                comp_cls = self.component_map.get(full_path)
+                rel_file = component_path_map.get(str(self.file_map.get(full_path, "")))
+                if comp_cls is None or not rel_file:
+                    continue
+                component_meta[full_path] = {
+                    "file": rel_file,
+                    "class_name": comp_cls.__name__,
+                    "name": getattr(comp_cls, "name", ""),
+                    "category": getattr(comp_cls, "category", ""),
+                    "requirements": getattr(comp_cls, "requirements", ""),
+                }
+            try:
+                build_bundle(export_path, project_data, component_meta)
+            except Exception as e:
+                # 执行包仅用于加速，生成失败时运行端回退到 model.workflow.json
+                logger.warning(f"执行包生成失败: {e}")
             # ✅ 保存用户编辑后的 README
             (export_path / "README.md").write_text(export_dialog.get_readme_content(), encoding='utf-8')
             self._generate_selected_nodes_thumbnail(export_path)
@@ -1411,8 +1491,10 @@ class CanvasPage(QWidget):
         except Exception:
             return None
 
-    def save_full_workflow(self, file_path, show_info=True):
+    def save_full_workflow(self, file_path, show_info=True, thumbnail=True):
         graph_data = self.graph.serialize_session()
+        # 节点输入 / 输出写入旁路目录，JSON 中只保存内容哈希引用
+        artifact_store = get_artifact_store(file_path)
         # 解析图节点数据类
         runtime = {
             "environment": self.env_combo.currentData(),
@@ -1429,18 +1511,26 @@ class CanvasPage(QWidget):
             stable_key = f"{full_path}||{node_name}"
             runtime["node_id2stable_key"][node.id] = stable_key
             runtime["node_states"][stable_key] = self.node_status.get(node.id, "unrun")
-            runtime["node_inputs"][stable_key] = serialize_for_json(getattr(node, '_input_values', {}))
-            runtime["node_outputs"][stable_key] = serialize_for_json(getattr(node, '_output_values', {}))
+            runtime["node_inputs"][stable_key] = artifact_store.dump(getattr(node, '_input_values', {}))
+            runtime["node_outputs"][stable_key] = artifact_store.dump(getattr(node, '_output_values', {}))
             runtime["column_select"][stable_key] = getattr(node, 'column_select', {})
+        # runtime 体积最大，放在最后，加载时可先解析 graph 开始创建节点
         full_data = {
             "version": "1.0",
             "graph": graph_data,
+            "global_variable": self.global_variables.serialize(),
             "runtime": runtime,
-            "global_variable": self.global_variables.serialize()
         }
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(full_data, f, indent=2, ensure_ascii=False)
-        self._generate_canvas_thumbnail_async(file_path)
+        write_workflow(
+            file_path, full_data,
+            pretty=self.config.canvas_pretty_json.value,
+            compress=self.config.canvas_compress_workflow.value
+        )
+        artifact_store.commit()
+        # 文件已是最新内容，编辑日志以新文件为基准重新开始
+        self._start_journal(file_path)
+        if thumbnail:
+            self._generate_canvas_thumbnail_async(file_path)
         if show_info:
             self.create_success_info("保存成功", "工作流保存成功！")
 
@@ -1451,22 +1541,13 @@ class CanvasPage(QWidget):
             if not selected_nodes:
                 return  # 无选中节点，不生成
             # 获取选中节点的包围盒
-            scene = self.graph.viewer().scene()
-            rect = QRectF()
-            for node in selected_nodes:
-                item_rect = node.view.sceneBoundingRect()
-                rect = rect.united(item_rect)
+            rect = nodes_bounding_rect(selected_nodes)
             if rect.isEmpty():
                 return
             # 扩展边距
             rect.adjust(-25, -25, 25, 25)
-            # 创建图像
-            image = QImage(rect.size().toSize(), QImage.Format_ARGB32)
-            image.fill(Qt.white)
-            painter = QPainter(image)
-            # 渲染选中区域
-            scene.render(painter, target=QRectF(image.rect()), source=rect)
-            painter.end()
+            # 渲染选中区域（限制分辨率）
+            image = render_scene_image(self.graph.viewer().scene(), rect)
             # 保存为 preview.png
             preview_path = export_path / "preview.png"
             image.save(str(preview_path), "PNG")
@@ -1477,68 +1558,291 @@ class CanvasPage(QWidget):
             self.create_warning_info("预览图", f"生成失败: {str(e)}")
 
     def _generate_canvas_thumbnail_async(self, workflow_path):
-        self.thumbnail_thread = ThumbnailGenerator(self.graph, workflow_path)
+        # 上一次生成尚未完成时放弃，以本次保存的画布为准
+        if getattr(self, 'thumbnail_thread', None) is not None:
+            self.thumbnail_thread.cancel()
+        self.thumbnail_thread = ThumbnailGenerator(self.graph, workflow_path, parent=self)
         self.thumbnail_thread.finished.connect(self._on_thumbnail_generated)
         self.thumbnail_thread.start()
 
     def _on_thumbnail_generated(self, png_path):
-        if png_path:
+        if png_path and self.thumbnail_thread.skipped:
+            logger.info(f"画布外观未变化，沿用预览图: {png_path}")
+            self.canvas_saved.emit(self.file_path)
+        elif png_path:
             logger.info(f"✅ 预览图已保存: {png_path}")
             self.canvas_saved.emit(self.file_path)
         else:
             self.create_warning_info("预览图", "生成失败")
 
+    # ========================
+    # 编辑日志 / 自动保存
+    # ========================
+    def _setup_autosave(self):
+        """
+        修改按节点追加到编辑日志（O(修改量)），定时自动保存只同步日志；
+        每 JOURNAL_COMPACT_TICKS 次或日志过大时压缩：整体写回工作流文件并清空日志
+        """
+        self._journal = None
+        self._journal_dirty = {}  # {节点 id: 节点对象，None 表示已删除}
+        self._journal_globals = None  # 最近一次写入日志的全局变量
+        self._undo_index = 0
+        self._autosave_ticks = 0
+        self._loaded_node_ids = {}
+        self._journal_timer = QTimer(self)
+        self._journal_timer.setSingleShot(True)
+        self._journal_timer.timeout.connect(self._flush_journal)
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self._on_autosave_timer)
+        self.autosave_timer.start(self.config.canvas_auto_save_interval.value * 1000)
+        # 撤销栈覆盖绝大多数编辑（含撤销 / 重做、移动、粘贴）；其余信号补充不经过撤销栈的修改
+        self.graph.undo_stack().indexChanged.connect(self._on_undo_index_changed)
+        self.graph.node_created.connect(lambda node: self._mark_nodes_dirty([node]))
+        self.graph.nodes_deleted.connect(self._on_nodes_deleted_journal)
+        self.graph.property_changed.connect(lambda node, name, value: self._mark_nodes_dirty([node]))
+        self.graph.port_connected.connect(
+            lambda in_port, out_port: self._mark_nodes_dirty([in_port.node(), out_port.node()])
+        )
+        self.graph.port_disconnected.connect(
+            lambda in_port, out_port: self._mark_nodes_dirty([in_port.node(), out_port.node()])
+        )
+        self.global_variables_changed.connect(lambda *args: self._schedule_journal_flush())
+
+    def _start_journal(self, workflow_path, ids=None):
+        """以工作流文件的当前内容为基准开始记录；ids 为 {节点 id: 文件中的节点 id}"""
+        if self._journal is not None and self._journal.workflow_path != Path(workflow_path):
+            # 另存为：修改已写入新文件
+            self._journal.discard()
+            self._journal = None
+        if not Path(workflow_path).exists():
+            return
+        self._journal = self._journal or WorkflowJournal(workflow_path)
+        self._journal_dirty = {}
+        self._journal_globals = self.global_variables.serialize()
+        self._undo_index = self.graph.undo_stack().index()
+        self._autosave_ticks = 0
+        try:
+            self._journal.reset(ids)
+        except OSError as e:
+            logger.warning(f"无法写入编辑日志，自动保存已停用: {e}")
+            self._journal = None
+
+    def _start_journal_after_load(self):
+        loader = self.workflow_loader
+        if loader.error:
+            return
+        # 新建节点的 id -> 文件中的节点 id（重放日志新增的节点在文件中不存在）
+        ids = {
+            node_id: loader.node_origin[key]
+            for key, node_id in self._loaded_node_ids.items() if key in loader.node_origin
+        }
+        self._start_journal(loader.file_path, ids)
+        if not loader.recovered_entries or self._journal is None:
+            return
+        self.create_success_info("已恢复", f"已恢复上次未保存的 {loader.recovered_entries} 处修改")
+        if self.config.canvas_auto_save.value:
+            self._compact_workflow()
+            return
+        # 未开启自动保存时不改写工作流文件，把恢复后的状态完整写入新日志，避免再次异常退出时丢失
+        kept = set(ids.values())
+        self._journal.append([
+            {"op": "remove", "id": file_id} for file_id in loader.file_node_ids if file_id not in kept
+        ])
+        self._journal_globals = None
+        self._mark_nodes_dirty(self.graph.all_nodes())
+        self._flush_journal()
+
+    @staticmethod
+    def _command_nodes(command):
+        """撤销栈命令（含宏命令的子命令）涉及的节点"""
+        nodes = []
+        for attr in ('node', 'backdrop'):
+            node = getattr(command, attr, None)
+            if node is not None:
+                nodes.append(node)
+        nodes.extend(getattr(command, 'nodes', None) or [])
+        for attr in ('source', 'target', 'port'):
+            port = getattr(command, attr, None)
+            if port is not None and hasattr(port, 'node'):
+                nodes.append(port.node())
+        for i in range(command.childCount()):
+            nodes.extend(CanvasPage._command_nodes(command.child(i)))
+        return nodes
+
+    def _on_undo_index_changed(self, index):
+        # 新命令 / 重做：index 增大，涉及 [旧, 新) 的命令；撤销：index 减小，涉及 [新, 旧)
+        start, end = sorted((self._undo_index, index))
+        self._undo_index = index
+        if self._journal is None:
+            return
+        undo_stack = self.graph.undo_stack()
+        nodes = []
+        for i in range(start, min(end, undo_stack.count())):
+            command = undo_stack.command(i)
+            if command is not None:
+                nodes.extend(self._command_nodes(command))
+        self._mark_nodes_dirty(nodes)
+
+    def _on_nodes_deleted_journal(self, node_ids):
+        if self._journal is None:
+            return
+        for node_id in node_ids:
+            self._journal_dirty[node_id] = None
+        self._schedule_journal_flush()
+
+    def _mark_nodes_dirty(self, nodes):
+        if self._journal is None or not nodes:
+            return
+        for node in nodes:
+            self._journal_dirty[node.id] = node
+        self._schedule_journal_flush()
+
+    def _schedule_journal_flush(self):
+        # 合并短时间内的连续修改（如拖动、连续输入），只记录最终状态
+        if self._journal is not None and not self._journal_timer.isActive():
+            self._journal_timer.start(self.JOURNAL_FLUSH_MS)
+
+    def _flush_journal(self):
+        """把待记录的节点状态与全局变量追加到编辑日志"""
+        if self._journal is None:
+            return
+        dirty, self._journal_dirty = self._journal_dirty, {}
+        entries = []
+        graph_nodes = self.graph.model.nodes
+        for node_id, node in dirty.items():
+            if node is None or graph_nodes.get(node_id) is not node:
+                entries.append({"op": "remove", "id": node_id})
+            else:
+                node.update_model()
+                entries.append({"op": "node", "id": node_id, "data": node.serialize()[node_id]})
+        global_variable = self.global_variables.serialize()
+        if global_variable != self._journal_globals:
+            entries.append({"op": "globals", "data": global_variable})
+            self._journal_globals = global_variable
+        try:
+            self._journal.append(entries)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"写入编辑日志失败: {e}")
+
+    def _on_autosave_timer(self):
+        self.autosave_timer.setInterval(self.config.canvas_auto_save_interval.value * 1000)
+        if self._journal is None:
+            return
+        self._flush_journal()
+        if not self._journal.entries:
+            return
+        try:
+            self._journal.sync()
+        except OSError as e:
+            logger.warning(f"同步编辑日志失败: {e}")
+        self._autosave_ticks += 1
+        if not self.config.canvas_auto_save.value or self._scheduler is not None:
+            # 未开启自动保存只保留日志；运行中节点数据仍在变化，运行结束后会整体保存
+            return
+        if (self._autosave_ticks >= self.JOURNAL_COMPACT_TICKS
+                or self._journal.size >= JOURNAL_COMPACT_BYTES
+                or self._journal.entries >= JOURNAL_COMPACT_ENTRIES):
+            self._compact_workflow()
+
+    def _compact_workflow(self):
+        """压缩：整体写回工作流文件（不重新生成预览图），编辑日志随之清空"""
+        try:
+            self.save_full_workflow(self._journal.workflow_path, show_info=False, thumbnail=False)
+            logger.info(f"自动保存: {self._journal.workflow_path}")
+        except Exception as e:
+            logger.warning(f"自动保存失败，修改仍保留在编辑日志中: {e}")
+
+    def close_journal(self):
+        """关闭画布：开启自动保存时写回未压缩的修改，否则放弃修改"""
+        if self._journal is None:
+            return
+        self._journal_timer.stop()
+        self.autosave_timer.stop()
+        self._flush_journal()
+        if self._journal.entries and self.config.canvas_auto_save.value:
+            self._compact_workflow()
+        self.discard_journal()
+
+    def discard_journal(self):
+        if self._journal is not None:
+            self._journal.discard()
+            self._journal = None
+
     def load_full_workflow(self, file_path):
         from app.utils.threading_utils import WorkflowLoader
+        self._graph_state = None  # None: 未开始创建节点 / "building": 创建中 / "built": 已创建
+        self._pending_runtime = None
         self.workflow_loader = WorkflowLoader(file_path, self.graph, self.node_type_map)
+        self.workflow_loader.graph_loaded.connect(self._on_graph_loaded)
         self.workflow_loader.finished.connect(self._on_workflow_loaded)
         self.workflow_loader.start()
 
-    def _on_workflow_loaded(self, graph_data, runtime_data, node_status_data, global_variable):
+    def _on_graph_loaded(self, graph_data, global_variable):
+        """graph 解析完成即开始创建节点，同时后台线程继续解析 runtime"""
+        if self._graph_state is not None:
+            return
+        self._graph_state = "building"
         try:
             self.global_variables.deserialize(global_variable)
             self.property_panel.update_properties(None)
             # === 1. 准备数据 ===
             nodes_data = graph_data.get("nodes", {})
             total_nodes = len(nodes_data)
+            self._loaded_node_ids = {}
             if total_nodes == 0:
                 self.graph.deserialize_session(graph_data)
-                self._finish_loading(runtime_data, node_status_data)
-                return
+            else:
+                # === 2. 创建进度对话框 ===
+                progress = QProgressDialog("正在加载节点...", "取消", 0, total_nodes, self)
+                progress.setWindowModality(Qt.WindowModal)
+                progress.setWindowTitle("加载中")
+                progress.setCancelButton(None)  # 禁用取消，避免状态不一致
+                progress.setAutoClose(True)
+                progress.setMinimumDuration(0)
+                progress.setValue(0)
+
+                # === 3. 进度节流：最多每 PROGRESS_INTERVAL 秒刷新一次界面 ===
+                last_update = [0.0]  # 使用 list 保持引用
+
+                def on_progress(done, total):
+                    now = time.monotonic()
+                    if done < total and now - last_update[0] < self.PROGRESS_INTERVAL:
+                        return
+                    last_update[0] = now
+                    progress.setValue(done)
+                    QApplication.processEvents()  # 刷新 UI（runtime 解析完成的信号可能在此期间到达）
+
+                # === 4. 批量反序列化：推迟节点绘制，创建完成后统一绘制 ===
+                try:
+                    self._loaded_node_ids = self.graph.bulk_deserialize_session(
+                        graph_data, progress_callback=on_progress
+                    )
+                finally:
+                    progress.close()
+        except Exception as e:
+            self._graph_state = "failed"
+            logger.error(f"❌ 加载失败: {traceback.format_exc()}")
+            self.create_failed_info("加载失败", f"工作流加载失败: {str(e)}")
+            return
 
-            # === 2. 创建进度对话框 ===
-            progress = QProgressDialog("正在加载节点...", "取消", 0, total_nodes, self)
-            progress.setWindowModality(Qt.WindowModal)
-            progress.setWindowTitle("加载中")
-            progress.setCancelButton(None)  # 禁用取消，避免状态不一致
-            progress.setAutoClose(True)
-            progress.setMinimumDuration(0)
-            progress.setValue(0)
-
-            # === 3. Monkey patch add_node ===
-            original_add_node = self.graph.add_node
-            count = [0]  # 使用 list 保持引用
-
-            def patched_add_node(node, pos=None, inherite_graph_style=True):
-                result = original_add_node(node, pos, inherite_graph_style)
-                count[0] += 1
-                progress.setValue(count[0])
-                QApplication.processEvents()  # 刷新 UI
-                return result
-
-            self.graph.add_node = patched_add_node
-
-            # === 4. 执行反序列化（使用 NodeGraphQt 原生逻辑）===
-            try:
-                self.graph.deserialize_session(graph_data)
-            finally:
-                # 恢复原始方法
-                self.graph.add_node = original_add_node
-                progress.close()
+        self._graph_state = "built"
+        # === 5. runtime 已先解析完成时，接着完成后续加载 ===
+        if self._pending_runtime is not None:
+            pending, self._pending_runtime = self._pending_runtime, None
+            self._complete_loading(*pending)
 
-            # === 5. 完成后续加载 ===
-            self._finish_loading(runtime_data, node_status_data)
+    def _on_workflow_loaded(self, graph_data, runtime_data, node_status_data, global_variable):
+        if self._graph_state is None:
+            self._on_graph_loaded(graph_data, global_variable)
+        if self._graph_state == "building":
+            self._pending_runtime = (runtime_data, node_status_data)
+            return
+        if self._graph_state == "built":
+            self._complete_loading(runtime_data, node_status_data)
 
+    def _complete_loading(self, runtime_data, node_status_data):
+        try:
+            self._finish_loading(runtime_data, node_status_data)
         except Exception as e:
             logger.error(f"❌ 加载失败: {traceback.format_exc()}")
             self.create_failed_info("加载失败", f"工作流加载失败: {str(e)}")
@@ -1562,8 +1866,9 @@ class CanvasPage(QWidget):
             stable_key = f"{full_path}||{node.name()}"
             node_status = node_status_data.get(stable_key)
             if node_status:
-                node._input_values = deserialize_from_json(node_status.get("node_inputs", {}))
-                node._output_values = deserialize_from_json(node_status.get("node_outputs", {}))
+                # LazyValueDict：端口值在属性面板查看、下游运行或导出时才加载
+                node._input_values = node_status.get("node_inputs") or {}
+                node._output_values = node_status.get("node_outputs") or {}
                 node.column_select = node_status.get("column_select", {})
                 custom_props = node_status.get("custom_property", {})
                 for key, value in custom_props.items():
@@ -1584,12 +1889,13 @@ class CanvasPage(QWidget):
         QTimer.singleShot(0, self.create_name_label)
         QTimer.singleShot(300, self._delayed_fit_view)
         self.create_success_info("加载成功", "工作流加载成功！")
+        self._start_journal_after_load()
 
     def _delayed_fit_view(self):
         QtCore.QTimer.singleShot(100, lambda: self.graph._viewer.zoom_to_nodes(self.graph._viewer.all_nodes()))
 
     def edit_node(self, node):
-        self.parent.switchTo(self.parent.develop_page)
+        self.parent.switchTo(self.parent.develop_interface)
         self.parent.develop_page._load_component(node.component_class)
 
     def _setup_pipeline_style(self):
@@ -20,6 +20,7 @@ from qfluentwidgets import (
 
 from app.components.base import COMPONENT_IMPORT_CODE, PropertyType, ArgumentType, PropertyDefinition, ConnectionType
 from app.scan_components import scan_components
+from app.utils.component_watcher import ComponentWatcher
 from app.utils.utils import extract_class_source_from_file
 from app.widgets.code_editer import CodeEditorWidget, DEFAULT_CODE_TEMPLATE
 from app.widgets.node_widget.longtext_dialog import LongTextEditorDialog
@@ -858,6 +859,11 @@ class ComponentDeveloperWidget(QWidget):
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(code)
         self._current_component_file = filepath
+        # 只重新解析改动的文件（移动时原路径按删除处理），已打开画布中的同类节点就地刷新
+        watcher = ComponentWatcher.get_instance()
+        if original_file_path and Path(original_file_path) != filepath:
+            watcher.notify_file_changed(original_file_path)
+        watcher.notify_file_changed(filepath)
 
     def _cancel_edit(self):
         """取消编辑"""
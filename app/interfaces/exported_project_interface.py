@@ -5,13 +5,13 @@ import os
 import shutil
 import subprocess
 import time
-from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict
 
-from PyQt5.QtCore import QThread, pyqtSignal, QEasingCurve, Qt, QTimer, QSize
+from PyQt5.QtCore import QThread, pyqtSignal, QEasingCurve, Qt, QTimer, QSize, QFileSystemWatcher
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QDialog, QTextEdit, QLabel, QFileDialog, QHBoxLayout, QFrame
+from loguru import logger
 from qfluentwidgets import (
     PrimaryPushButton,
     InfoBar,
@@ -20,6 +20,8 @@ from qfluentwidgets import (
     TransparentToggleToolButton
 )
 
+from app.utils.gallery_index import KIND_PROJECT, get_gallery_index
+from app.utils.log_store import get_log_store
 from app.utils.service_manager import SERVICE_MANAGER
 from app.utils.utils import ansi_to_html, get_icon
 from app.widgets.card_widget.project_card import ProjectCard
@@ -27,6 +29,11 @@ from app.widgets.dialog_widget.input_selection_dialog import InputSelectionDialo
 from app.widgets.dialog_widget.output_selection_dialog import OutputSelectionDialog
 
 
+def project_log_id(project_path) -> str:
+    """项目运行日志在日志库中的 node_id"""
+    return f"project:{os.path.abspath(project_path)}"
+
+
 class ProjectRunnerThread(QThread):
     finished = pyqtSignal(dict, str)
     error = pyqtSignal(str)
@@ -65,12 +72,37 @@ class ProjectRunnerThread(QThread):
                     pass
 
             log_content = (result.stdout or "") + "\n" + (result.stderr or "")
+            # stdout / stderr 分别写入日志库，无级别的 stderr 行记为 ERROR
+            store = get_log_store()
+            if store is not None:
+                run_id = f"project_{os.path.basename(self.project_path)}_{int(time.time())}"
+                store.append(project_log_id(self.project_path), result.stdout or "", run_id)
+                store.append(project_log_id(self.project_path), result.stderr or "", run_id, default_level="ERROR")
             self.finished.emit(outputs, log_content)
 
         except Exception as e:
             self.error.emit(str(e))
 
 
+class ProjectInfoScanner(QThread):
+    """后台增量同步项目索引，scan_finished(索引是否有变化)"""
+    scan_finished = pyqtSignal(bool)
+
+    def __init__(self, export_dir: Path):
+        super().__init__()
+        self.export_dir = export_dir
+
+    def run(self):
+        changed = False
+        index = get_gallery_index()
+        if index is not None and self.export_dir.exists():
+            try:
+                changed = index.sync_projects(self.export_dir)
+            except Exception as e:
+                logger.error(f"同步项目索引失败: {e}")
+        self.scan_finished.emit(changed)
+
+
 class ExportedProjectsPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -84,15 +116,20 @@ class ExportedProjectsPage(QWidget):
         self.fixed_card_count = 1  # 只有“导入项目”
         self.current_page = 0
         self.total_pages = 1
-        self.all_project_paths: List[str] = []
+        self.total_projects = 0
 
+        # 复用的卡片池，只保留一页所需的数量；_card_map 为当前页 路径 → 卡片
+        self._card_pool: List[ProjectCard] = []
         self._card_map: Dict[str, ProjectCard] = {}
-        self._known_projects: Set[str] = set()
-        self._project_info_map: Dict[str, dict] = {}
         self._fixed_cards: List[CardWidget] = []
         self._refresh_pending = False
+        self._rescan_pending = False
+        self._requery = True
 
         self._setup_ui()
+        # 项目目录有增删时增量同步索引
+        self._watcher = QFileSystemWatcher([str(self.export_dir)], self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
         QTimer.singleShot(50, self.load_projects)
 
     def _get_default_export_dir(self):
@@ -174,10 +211,8 @@ class ExportedProjectsPage(QWidget):
             return 12
 
         card_width = 400
-        if self._card_map:
-            sample_card = next(iter(self._card_map.values()))
-            if sample_card.width() > 50:
-                card_width = sample_card.width()
+        if self._card_pool and self._card_pool[0].width() > 50:
+            card_width = self._card_pool[0].width()
         elif self._fixed_cards and self._fixed_cards[0].width() > 50:
             card_width = self._fixed_cards[0].width()
 
@@ -193,6 +228,13 @@ class ExportedProjectsPage(QWidget):
         return cards_per_row * 3
 
     def _schedule_refresh(self):
+        self._requery = True
+        self._start_refresh_timer()
+
+    def _on_directory_changed(self, path):
+        self._start_refresh_timer()
+
+    def _start_refresh_timer(self):
         if not hasattr(self, '_refresh_timer'):
             self._refresh_timer = QTimer(self)
             self._refresh_timer.setSingleShot(True)
@@ -207,61 +249,37 @@ class ExportedProjectsPage(QWidget):
 
     def load_projects(self):
         if self._is_loading:
+            # 正在同步时不打断，结束后再同步一次
+            self._rescan_pending = True
             return
 
-        self._is_loading = True
-        # 后台扫描（可选，这里简化为直接扫描）
-        QTimer.singleShot(10, self._scan_projects)
-
-    def _scan_projects(self):
-        project_dirs = []
-        project_info_map = {}
-
-        for item in os.listdir(self.export_dir):
-            item_path = self.export_dir / item
-            if item_path.is_dir() and (item_path / "model.workflow.json").exists():
-                project_dirs.append(str(item_path))
-                try:
-                    stat = item_path.stat()
-                    project_info_map[str(item_path)] = {
-                        'ctime_ts': stat.st_ctime,
-                        'ctime': datetime.fromtimestamp(stat.st_ctime).strftime("%Y-%m-%d %H:%M"),
-                    }
-                except Exception:
-                    project_info_map[str(item_path)] = {'ctime_ts': 0, 'ctime': '未知'}
-
-        self._on_scan_finished(project_dirs, project_info_map)
-
-    def _on_scan_finished(self, project_dirs: List[str], project_info_map: dict):
-        self._is_loading = False
-
-        self._project_info_map = project_info_map
-        self._known_projects = set(project_dirs)
-
-        # 创建缺失的卡片
-        for proj_path in project_dirs:
-            if proj_path not in self._card_map:
-                try:
-                    card = ProjectCard(proj_path, self)
-                    card.run_btn.clicked.connect(lambda _, p=proj_path: self._run_project(p))
-                    card.edit_btn.clicked.connect(lambda _, p=proj_path: self._edit_project(p))
-                    card.service_btn.clicked.connect(lambda _, p=proj_path: self._toggle_service(p))
-                    card.view_log_btn.clicked.connect(lambda _, p=proj_path: self._view_project_log(p))
-                    card.delete_btn.clicked.connect(lambda _, p=proj_path: self._delete_project(p))
-                    card.hide()
-                    self._card_map[proj_path] = card
-                except Exception:
-                    import traceback
-                    traceback.print_exc()
-
-        # 创建固定卡片
         if not self._fixed_cards:
+            # 首次打开先显示上次的索引，不等目录扫描
             self._fixed_cards = [self._create_import_card()]
             for card in self._fixed_cards:
                 card.hide()
+            self._apply_sort_and_filter_and_refresh()
 
-        self._ensure_all_cards_in_layout()
-        self._apply_sort_and_filter_and_refresh()
+        # 目录扫描放到后台线程，项目卡片可能有上千个且位于网络盘
+        self._is_loading = True
+        self._scanner = ProjectInfoScanner(self.export_dir)
+        self._thread = QThread()
+        self._scanner.moveToThread(self._thread)
+        self._thread.started.connect(self._scanner.run)
+        self._scanner.scan_finished.connect(self._on_scan_finished)
+        self._scanner.scan_finished.connect(self._thread.quit)
+        self._scanner.scan_finished.connect(self._scanner.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+        self._thread.start()
+
+    def _on_scan_finished(self, changed: bool):
+        self._is_loading = False
+        if changed or self._requery:
+            self._requery = False
+            self._apply_sort_and_filter_and_refresh()
+        if self._rescan_pending:
+            self._rescan_pending = False
+            self._start_refresh_timer()
 
     def _create_import_card(self):
         from qfluentwidgets import FluentIcon
@@ -291,20 +309,41 @@ class ExportedProjectsPage(QWidget):
         import_card.setCursor(Qt.PointingHandCursor)
         return import_card
 
-    def _ensure_all_cards_in_layout(self):
-        for card in self._fixed_cards:
-            if card.parent() != self.scroll_widget:
-                self.flow_layout.addWidget(card)
-        for card in self._card_map.values():
-            if card.parent() != self.scroll_widget:
-                self.flow_layout.addWidget(card)
+    def _page_range(self, page_index: int):
+        """第 page_index 页在查询结果中的 (offset, limit)；第一页要让出固定卡片的位置"""
+        first_page_count = max(0, self.page_size - self.fixed_card_count)
+        if page_index == 0:
+            return 0, first_page_count
+        return first_page_count + (page_index - 1) * self.page_size, self.page_size
+
+    def _query_page(self, page_index: int) -> List[dict]:
+        index = get_gallery_index()
+        if index is None:
+            return []
+        offset, limit = self._page_range(page_index)
+        sort = ("ctime", "name")[self.sort_field_combo.currentIndex()]
+        return index.query(
+            KIND_PROJECT, self.export_dir, self._filter_text, sort,
+            self.sort_order_button.isChecked(), offset, limit
+        )
+
+    def _create_project_card(self, proj_path: str, ctime_ts=None) -> ProjectCard:
+        card = ProjectCard(proj_path, self, ctime_ts)
+        # 卡片会被复用，回调时读取卡片当前绑定的项目
+        card.run_btn.clicked.connect(lambda _, c=card: self._run_project(c.project_path))
+        card.edit_btn.clicked.connect(lambda _, c=card: self._edit_project(c.project_path))
+        card.service_btn.clicked.connect(lambda _, c=card: self._toggle_service(c.project_path))
+        card.view_log_btn.clicked.connect(lambda _, c=card: self._view_project_log(c.project_path))
+        card.delete_btn.clicked.connect(lambda _, c=card: self._delete_project(c.project_path))
+        return card
 
     def _show_page(self, page_index: int):
         self.current_page = page_index
+        rows = self._query_page(page_index)
 
         for card in self._fixed_cards:
             card.hide()
-        for card in self._card_map.values():
+        for card in self._card_pool:
             card.hide()
 
         while self.flow_layout.count():
@@ -315,23 +354,24 @@ class ExportedProjectsPage(QWidget):
                 self.flow_layout.addWidget(card)
                 card.show()
 
-            workflow_slots = self.page_size - self.fixed_card_count
-            workflow_to_show = self.all_project_paths[:workflow_slots]
-            for proj_path in workflow_to_show:
-                card = self._card_map.get(proj_path)
-                if card is not None:
-                    self.flow_layout.addWidget(card)
-                    card.show()
-        else:
-            first_page_count = max(0, self.page_size - self.fixed_card_count)
-            start = first_page_count + (page_index - 1) * self.page_size
-            end = start + self.page_size
-            workflow_to_show = self.all_project_paths[start:end]
-            for proj_path in workflow_to_show:
-                card = self._card_map.get(proj_path)
-                if card is not None:
-                    self.flow_layout.addWidget(card)
-                    card.show()
+        self._card_map = {}
+        for i, row in enumerate(rows):
+            proj_path = row['path']
+            if i < len(self._card_pool):
+                card = self._card_pool[i]
+                card.set_project(proj_path, row['ctime'])
+            else:
+                try:
+                    card = self._create_project_card(proj_path, row['ctime'])
+                except Exception:
+                    import traceback
+                    traceback.print_exc()
+                    continue
+                self._card_pool.append(card)
+            card.update_status(proj_path in self.running_projects)
+            self.flow_layout.addWidget(card)
+            card.show()
+            self._card_map[proj_path] = card
 
         self.scroll_widget.adjustSize()
 
@@ -356,36 +396,11 @@ class ExportedProjectsPage(QWidget):
         self._apply_sort_and_filter_and_refresh()
 
     def _apply_sort_and_filter_and_refresh(self):
-        if self._is_loading:
-            return
-
-        if not self._known_projects:
-            self.all_project_paths = []
-        else:
-            field_index = self.sort_field_combo.currentIndex()  # 0: ctime, 1: name
-            is_ascending = self.sort_order_button.isChecked()
-
-            project_with_info = []
-            for proj_path in self._known_projects:
-                info = self._project_info_map.get(proj_path, {})
-                ctime_ts = info.get('ctime_ts', 0)
-                name = Path(proj_path).name
-
-                if self._filter_text and self._filter_text not in name.lower():
-                    continue
-
-                project_with_info.append((proj_path, ctime_ts, name))
-
-            if field_index == 0:  # 创建时间
-                key_func = lambda x: x[1]
-            else:  # 名称
-                key_func = lambda x: x[2].lower()
-
-            project_with_info.sort(key=key_func, reverse=not is_ascending)
-            self.all_project_paths = [item[0] for item in project_with_info]
+        index = get_gallery_index()
+        self.total_projects = index.count(KIND_PROJECT, self.export_dir, self._filter_text) if index else 0
 
         self.page_size = self._calculate_cards_per_page()
-        total_projects = len(self.all_project_paths)
+        total_projects = self.total_projects
         if total_projects == 0:
             self.total_pages = 1
         else:
@@ -408,7 +423,7 @@ class ExportedProjectsPage(QWidget):
         QTimer.singleShot(100, self._on_resize)
 
     def _on_resize(self):
-        if self._is_loading:
+        if not self._fixed_cards:
             return
         new_page_size = self._calculate_cards_per_page()
         if new_page_size != self.page_size:
@@ -606,9 +621,32 @@ class ExportedProjectsPage(QWidget):
         except Exception as e:
             self.create_error_info("保存失败", f"无法保存 project_spec.json: {e}")
 
+    def _read_last_run_log(self, project_path):
+        """最近一次运行的日志：优先查询日志库，没有记录时读取项目目录下的 run.log"""
+        store = get_log_store()
+        if store is not None:
+            try:
+                node_id = project_log_id(project_path)
+                run_id = store.latest_run_id(node_id)
+                if run_id is not None:
+                    return store.tail(node_id, run_id=run_id)
+            except Exception:
+                pass
+        path = os.path.join(project_path, "run.log")
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read().strip()
+            except Exception:
+                pass
+        return ""
+
     def _view_project_log(self, project_path):
         all_logs = []
-        for name, file in [("项目运行日志", "run.log"), ("微服务日志", "service.log")]:
+        run_log = self._read_last_run_log(project_path)
+        if run_log:
+            all_logs.append(("项目运行日志", run_log))
+        for name, file in [("微服务日志", "service.log")]:
             path = os.path.join(project_path, file)
             if os.path.exists(path):
                 try:
@@ -672,13 +710,10 @@ class ExportedProjectsPage(QWidget):
                     SERVICE_MANAGER.stop_service(project_path)
                     time.sleep(0.5)
 
-                # ✅ 安全删除卡片
-                if project_path in self._card_map:
-                    card = self._card_map[project_path]
-                    self.flow_layout.removeWidget(card)
-                    card.hide()
-                    card.deleteLater()
-                    del self._card_map[project_path]
+                # 卡片由画廊复用，只需从索引中移除
+                index = get_gallery_index()
+                if index is not None:
+                    index.remove(KIND_PROJECT, project_path)
 
                 for _ in range(3):
                     try:
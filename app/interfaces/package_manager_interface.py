@@ -172,7 +172,8 @@ class EnvManagerUI(QWidget):
         self.setLayout(mainLayout)
 
         if self.envCombo.count() > 0:
-            self.on_env_changed()
+            # 包列表（pip list）在切换到环境管理页面时再加载
+            self.current_env = self.envCombo.currentText()
         else:
             self.logEdit.append("⚠️ 没有检测到任何环境，请点击\"新建环境\"创建。")
 
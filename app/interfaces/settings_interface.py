@@ -117,7 +117,7 @@ class SettingInterface(ScrollArea):
         self.autoSaveCard = SwitchSettingCard(
             FIF.SAVE,
             "自动保存",
-            "每隔一段时间自动保存当前项目",
+            "修改实时记录到编辑日志，并定期写回工作流文件",
             configItem=self.cfg.canvas_auto_save,
             parent=self.canvasGroup
         )
@@ -131,6 +131,22 @@ class SettingInterface(ScrollArea):
         )
         self.autoSaveIntervalCard.clicked.connect(self.onAutoSaveIntervalClicked)
 
+        self.prettyJsonCard = SwitchSettingCard(
+            FIF.SAVE,
+            "格式化保存工作流",
+            "以缩进格式保存工作流文件，便于阅读和比对，文件更大、读写更慢",
+            configItem=self.cfg.canvas_pretty_json,
+            parent=self.canvasGroup
+        )
+
+        self.compressWorkflowCard = SwitchSettingCard(
+            FIF.SAVE,
+            "压缩工作流文件",
+            "使用 zstd 压缩保存的工作流文件（需安装 zstandard）",
+            configItem=self.cfg.canvas_compress_workflow,
+            parent=self.canvasGroup
+        )
+
         self.defaultZoomCard = OptionsSettingCard(
             self.cfg.canvas_default_zoom,
             FIF.ZOOM,
@@ -160,6 +176,8 @@ class SettingInterface(ScrollArea):
         self.canvasGroup.addSettingCard(self.gridSizeCard)
         self.canvasGroup.addSettingCard(self.autoSaveCard)
         self.canvasGroup.addSettingCard(self.autoSaveIntervalCard)
+        self.canvasGroup.addSettingCard(self.prettyJsonCard)
+        self.canvasGroup.addSettingCard(self.compressWorkflowCard)
         self.canvasGroup.addSettingCard(self.pipelayoutCard)
         self.canvasGroup.addSettingCard(self.pipeDirectionCard)
         self.canvasGroup.addSettingCard(self.defaultZoomCard)
@@ -2,23 +2,30 @@ import os
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict
 
-from PyQt5.QtCore import QEasingCurve, QTimer, QThread, Qt, pyqtSignal, QMutex, QMutexLocker, QSize, QEvent
+from PyQt5.QtCore import (
+    QEasingCurve, QTimer, QThread, Qt, pyqtSignal, QMutex, QMutexLocker, QSize, QEvent, QFileSystemWatcher
+)
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QFileDialog, QFrame, QHBoxLayout
+from loguru import logger
 from qfluentwidgets import (
     FlowLayout, InfoBar, CardWidget, SmoothScrollArea,
     PipsPager, PipsScrollButtonDisplayMode, ComboBox, CaptionLabel, SearchLineEdit, TransparentToggleToolButton
 )
 
-from app.interfaces.canvas_interface import CanvasPage
+from app.utils.artifact_store import copy_artifacts, remove_artifacts
+from app.utils.gallery_index import KIND_WORKFLOW, get_gallery_index
+from app.utils.workflow_journal import remove_journal
+from app.utils.startup_profiler import PROFILER
 from app.utils.utils import get_icon
 from app.widgets.card_widget.workflow_card import WorkflowCard
 from app.widgets.dialog_widget.custom_messagebox import CustomInputDialog
 
 
 class WorkflowFileInfoScanner(QThread):
-    scan_finished = pyqtSignal(list, dict)
+    """后台增量同步画廊索引，scan_finished(索引是否有变化)"""
+    scan_finished = pyqtSignal(bool)
 
     def __init__(self, workflow_dir: Path):
         super().__init__()
@@ -30,41 +37,35 @@ class WorkflowFileInfoScanner(QThread):
         with QMutexLocker(self._mutex):
             self._should_stop = True
 
-    def run(self):
-        should_stop = False
+    def _stopped(self) -> bool:
         with QMutexLocker(self._mutex):
-            should_stop = self._should_stop
-        if should_stop:
-            return
-
-        workflow_files = []
-        file_info_map = {}
-
-        if self.workflow_dir.exists():
-            workflow_files = list(self.workflow_dir.glob("*.workflow.json"))
+            return self._should_stop
 
-            for wf_path in workflow_files:
-                with QMutexLocker(self._mutex):
-                    if self._should_stop:
-                        return
+    def run(self):
+        changed = False
+        index = get_gallery_index()
+        if index is not None and self.workflow_dir.exists():
+            try:
+                changed = index.sync_workflows(self.workflow_dir, self._stopped)
+            except Exception as e:
+                logger.error(f"同步画布索引失败: {e}")
+
+        if self._stopped():
+            return
 
-                try:
-                    stat = wf_path.stat()
-                    file_info_map[str(wf_path)] = {
-                        'ctime': datetime.fromtimestamp(stat.st_ctime).strftime("%Y-%m-%d %H:%M"),
-                        'mtime': datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M"),
-                        'size_kb': stat.st_size // 1024,
-                        'mtime_ts': stat.st_mtime,
-                        'ctime_ts': stat.st_ctime,
-                    }
-                except Exception:
-                    pass
+        self.scan_finished.emit(changed)
 
-        with QMutexLocker(self._mutex):
-            if self._should_stop:
-                return
 
-        self.scan_finished.emit(workflow_files, file_info_map)
+def workflow_file_info(row: dict) -> dict:
+    """索引中的一行 → WorkflowCard 的 file_info"""
+    return {
+        'ctime': datetime.fromtimestamp(row['ctime']).strftime("%Y-%m-%d %H:%M"),
+        'mtime': datetime.fromtimestamp(row['mtime']).strftime("%Y-%m-%d %H:%M"),
+        'size_kb': row['size'] // 1024,
+        'mtime_ts': row['mtime'],
+        'ctime_ts': row['ctime'],
+        'node_count': row['node_count'],
+    }
 
 
 class WorkflowCanvasGalleryPage(QWidget):
@@ -80,15 +81,20 @@ class WorkflowCanvasGalleryPage(QWidget):
         self.fixed_card_count = 2
         self.current_page = 0
         self.total_pages = 1
-        self.all_workflow_paths: List[Path] = []
+        self.total_workflows = 0
 
+        # 复用的卡片池，只保留一页所需的数量；_card_map 为当前页 路径 → 卡片
+        self._card_pool: List[WorkflowCard] = []
         self._card_map: Dict[Path, WorkflowCard] = {}
-        self._known_files: Set[Path] = set()
-        self._file_info_map: Dict[str, dict] = {}
         self._fixed_cards: List[CardWidget] = []
         self._refresh_pending = False
+        self._rescan_pending = False
+        self._requery = True
 
         self._setup_ui()
+        # 目录有增删 / 改写时增量同步索引
+        self._watcher = QFileSystemWatcher([str(self.workflow_dir)], self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
         QTimer.singleShot(50, self.load_workflows)
 
     def _get_workflow_dir(self):
@@ -219,10 +225,8 @@ class WorkflowCanvasGalleryPage(QWidget):
             return 12
 
         card_width = 320
-        if self._card_map:
-            sample_card = next(iter(self._card_map.values()))
-            if sample_card.width() > 50:
-                card_width = sample_card.width()
+        if self._card_pool and self._card_pool[0].width() > 50:
+            card_width = self._card_pool[0].width()
         elif self._fixed_cards and self._fixed_cards[0].width() > 50:
             card_width = self._fixed_cards[0].width()
 
@@ -238,6 +242,14 @@ class WorkflowCanvasGalleryPage(QWidget):
         return cards_per_row * 3
 
     def _schedule_refresh(self):
+        self._requery = True
+        self._start_refresh_timer()
+
+    def _on_directory_changed(self, path):
+        # 画布编辑日志 / 预览图的写入也会触发，同步后索引没有变化则不刷新卡片
+        self._start_refresh_timer()
+
+    def _start_refresh_timer(self):
         if not hasattr(self, '_refresh_timer'):
             self._refresh_timer = QTimer(self)
             self._refresh_timer.setSingleShot(True)
@@ -252,15 +264,20 @@ class WorkflowCanvasGalleryPage(QWidget):
 
     def load_workflows(self):
         if self._is_loading:
-            if hasattr(self, '_scanner') and hasattr(self, '_thread'):
-                try:
-                    self._scanner.stop()
-                    self._thread.quit()
-                    self._thread.wait(100)
-                except:
-                    pass
+            # 正在同步时不打断，结束后再同步一次
+            self._rescan_pending = True
             return
 
+        if not self._fixed_cards:
+            # 首次打开先显示上次的索引，不等目录扫描
+            self._fixed_cards = [
+                WorkflowCard(parent=self, type="create"),
+                WorkflowCard(parent=self, type="import")
+            ]
+            for card in self._fixed_cards:
+                card.hide()
+            self._apply_sort_and_filter_and_refresh()
+
         self._is_loading = True
         self._scanner = WorkflowFileInfoScanner(self.workflow_dir)
         self._thread = QThread()
@@ -272,53 +289,40 @@ class WorkflowCanvasGalleryPage(QWidget):
         self._thread.finished.connect(self._thread.deleteLater)
         self._thread.start()
 
-    def _on_detailed_scan_finished(self, workflow_files: List[Path], file_info_map: dict):
+    def _on_detailed_scan_finished(self, changed: bool):
         self._is_loading = False
-        if hasattr(self, '_refresh_timer') and self._refresh_timer.isActive():
-            return
-
-        self._file_info_map = file_info_map
-        self._known_files = set(workflow_files)
-
-        # ✅ 关键：创建缺失的卡片！
-        for wf_path in workflow_files:
-            if wf_path not in self._card_map:
-                try:
-                    card = WorkflowCard(wf_path, self, self._file_info_map.get(str(wf_path)))
-                    card.hide()
-                    self._card_map[wf_path] = card
-                except Exception:
-                    import traceback
-                    traceback.print_exc()
-
-        # 创建固定卡片（仅一次）
-        if not self._fixed_cards:
-            self._fixed_cards = [
-                WorkflowCard(parent=self, type="create"),
-                WorkflowCard(parent=self, type="import")
-            ]
-            for card in self._fixed_cards:
-                card.hide()
-
-        self._ensure_all_cards_in_layout()
-
-        # 应用排序+过滤
-        self._apply_sort_and_filter_and_refresh()
+        if changed or self._requery:
+            self._requery = False
+            self._apply_sort_and_filter_and_refresh()
+        if self._rescan_pending:
+            self._rescan_pending = False
+            self._start_refresh_timer()
 
-    def _ensure_all_cards_in_layout(self):
-        for card in self._fixed_cards:
-            if card.parent() != self.scroll_widget:
-                self.flow_layout.addWidget(card)
-        for card in self._card_map.values():
-            if card.parent() != self.scroll_widget:
-                self.flow_layout.addWidget(card)
+    def _page_range(self, page_index: int):
+        """第 page_index 页在查询结果中的 (offset, limit)；第一页要让出固定卡片的位置"""
+        first_page_count = max(0, self.page_size - self.fixed_card_count)
+        if page_index == 0:
+            return 0, first_page_count
+        return first_page_count + (page_index - 1) * self.page_size, self.page_size
+
+    def _query_page(self, page_index: int) -> List[dict]:
+        index = get_gallery_index()
+        if index is None:
+            return []
+        offset, limit = self._page_range(page_index)
+        sort = ("mtime", "ctime", "name")[self.sort_field_combo.currentIndex()]
+        return index.query(
+            KIND_WORKFLOW, self.workflow_dir, self._filter_text, sort,
+            self.sort_order_button.isChecked(), offset, limit
+        )
 
     def _show_page(self, page_index: int):
         self.current_page = page_index
+        rows = self._query_page(page_index)
 
         for card in self._fixed_cards:
             card.hide()
-        for card in self._card_map.values():
+        for card in self._card_pool:
             card.hide()
 
         while self.flow_layout.count():
@@ -329,23 +333,24 @@ class WorkflowCanvasGalleryPage(QWidget):
                 self.flow_layout.addWidget(card)
                 card.show()
 
-            workflow_slots = self.page_size - self.fixed_card_count
-            workflow_to_show = self.all_workflow_paths[:workflow_slots]
-            for wf_path in workflow_to_show:
-                card = self._card_map.get(wf_path)
-                if card is not None:
-                    self.flow_layout.addWidget(card)
-                    card.show()
-        else:
-            first_page_count = max(0, self.page_size - self.fixed_card_count)
-            start = first_page_count + (page_index - 1) * self.page_size
-            end = start + self.page_size
-            workflow_to_show = self.all_workflow_paths[start:end]
-            for wf_path in workflow_to_show:
-                card = self._card_map.get(wf_path)
-                if card is not None:
-                    self.flow_layout.addWidget(card)
-                    card.show()
+        self._card_map = {}
+        for i, row in enumerate(rows):
+            wf_path = Path(row['path'])
+            file_info = workflow_file_info(row)
+            if i < len(self._card_pool):
+                card = self._card_pool[i]
+                card.set_workflow(wf_path, file_info)
+            else:
+                try:
+                    card = WorkflowCard(wf_path, self, file_info)
+                except Exception:
+                    import traceback
+                    traceback.print_exc()
+                    continue
+                self._card_pool.append(card)
+            self.flow_layout.addWidget(card)
+            card.show()
+            self._card_map[wf_path] = card
 
         self.scroll_widget.adjustSize()
 
@@ -361,44 +366,12 @@ class WorkflowCanvasGalleryPage(QWidget):
         self._apply_sort_and_filter_and_refresh()
 
     def _apply_sort_and_filter_and_refresh(self):
-        if self._is_loading:
-            return
-
-        if not self._known_files:
-            self.all_workflow_paths = []
-        else:
-            # 获取排序字段和方向
-            field_index = self.sort_field_combo.currentIndex()  # 0: mtime, 1: ctime, 2: name
-            is_ascending = self.sort_order_button.isChecked()
-
-            file_with_info = []
-            for wf_path in self._known_files:
-                info = self._file_info_map.get(str(wf_path), {})
-                ctime_ts = info.get('ctime_ts', 0)
-                mtime_ts = info.get('mtime_ts', 0)
-                name = wf_path.stem.split(".")[0]
-
-                if self._filter_text and self._filter_text not in name.lower():
-                    continue
-
-                file_with_info.append((wf_path, ctime_ts, mtime_ts, name))
-
-            # 根据字段选择排序 key
-            if field_index == 0:  # 修改时间
-                key_func = lambda x: x[2]
-            elif field_index == 1:  # 创建时间
-                key_func = lambda x: x[1]
-            else:  # 名称
-                key_func = lambda x: x[3].lower()
-
-            # 排序
-            file_with_info.sort(key=key_func, reverse=not is_ascending)
-
-            self.all_workflow_paths = [item[0] for item in file_with_info]
+        index = get_gallery_index()
+        self.total_workflows = index.count(KIND_WORKFLOW, self.workflow_dir, self._filter_text) if index else 0
 
         # 重新计算分页...
         self.page_size = self._calculate_cards_per_page()
-        total_workflow = len(self.all_workflow_paths)
+        total_workflow = self.total_workflows
         if total_workflow == 0:
             self.total_pages = 1
         else:
@@ -421,7 +394,7 @@ class WorkflowCanvasGalleryPage(QWidget):
         QTimer.singleShot(100, self._on_resize)
 
     def _on_resize(self):
-        if self._is_loading:
+        if not self._fixed_cards:
             return
 
         new_page_size = self._calculate_cards_per_page()
@@ -431,9 +404,16 @@ class WorkflowCanvasGalleryPage(QWidget):
 
     # ================== 业务逻辑 ==================
 
+    def _create_canvas_page(self, file_path: Path):
+        # 画布依赖 NodeGraphQt 与组件基础库（numpy / pandas / pydantic），首次打开画布时再导入
+        from app.interfaces.canvas_interface import CanvasPage
+
+        with PROFILER.section(f"CanvasPage {file_path.name}"):
+            return CanvasPage(self.parent_window, object_name=file_path)
+
     def open_canvas(self, file_path: Path):
         if file_path not in self.opened_workflows:
-            canvas_page = CanvasPage(self.parent_window, object_name=file_path)
+            canvas_page = self._create_canvas_page(file_path)
             canvas_page.load_full_workflow(file_path)
             canvas_page.canvas_deleted.connect(
                 lambda: (
@@ -472,7 +452,7 @@ class WorkflowCanvasGalleryPage(QWidget):
             counter += 1
 
         if file_path not in self.opened_workflows:
-            canvas_page = CanvasPage(self.parent_window, object_name=file_path)
+            canvas_page = self._create_canvas_page(file_path)
             canvas_page.canvas_deleted.connect(
                 lambda: (
                     self.opened_workflows.pop(file_path, None),
@@ -519,6 +499,7 @@ class WorkflowCanvasGalleryPage(QWidget):
 
         try:
             shutil.copy2(src_path, dest_path)
+            copy_artifacts(src_path, dest_path)
             src_png = src_path.parent / f'{base_name}.png'
             if src_png.exists():
                 dest_png = dest_path.parent / f'{base_name}.png'
@@ -558,6 +539,7 @@ class WorkflowCanvasGalleryPage(QWidget):
         try:
             # 复制文件
             shutil.copy2(src_path, dest_path)
+            copy_artifacts(src_path, dest_path)
             if src_png.exists():
                 shutil.copy2(src_png, dest_png)
 
@@ -567,8 +549,12 @@ class WorkflowCanvasGalleryPage(QWidget):
             if dest_png.exists():
                 os.utime(dest_png, (now, now))
 
-            # 删除原文件
+            # 删除原文件（已打开的画布先停止记录编辑日志）
+            if src_path in self.opened_workflows:
+                self.opened_workflows[src_path].discard_journal()
             src_path.unlink()
+            remove_artifacts(src_path)
+            remove_journal(src_path)
             preview_path = self.workflow_dir / f"{src_path.stem.split('.')[0]}.png"
             if preview_path.exists():
                 preview_path.unlink()
@@ -578,16 +564,8 @@ class WorkflowCanvasGalleryPage(QWidget):
                 self.parent_window.removeInterface(self.opened_workflows[src_path])
                 del self.opened_workflows[src_path]
 
-            # ✅ 关键：从布局中移除并销毁旧卡片
-            if src_path in self._card_map:
-                old_card = self._card_map[src_path]
-                # 从布局中移除
-                self.flow_layout.removeWidget(old_card)
-                # 隐藏并安排销毁
-                old_card.hide()
-                old_card.deleteLater()
-                # 从缓存中删除
-                del self._card_map[src_path]
+            # 卡片由画廊复用，只需从索引中移除
+            self._remove_from_index(src_path)
 
             InfoBar.success("重命名成功", f"已创建 {new_name}", parent=self)
             self._schedule_refresh()
@@ -616,6 +594,7 @@ class WorkflowCanvasGalleryPage(QWidget):
 
         try:
             shutil.copy2(src_path, dest_path)
+            copy_artifacts(src_path, dest_path)
             if src_png.exists():
                 shutil.copy2(src_png, dest_png)
 
@@ -637,7 +616,11 @@ class WorkflowCanvasGalleryPage(QWidget):
             return
 
         try:
+            if file_path in self.opened_workflows:
+                self.opened_workflows[file_path].discard_journal()
             file_path.unlink()
+            remove_artifacts(file_path)
+            remove_journal(file_path)
             preview_path = self.workflow_dir / f"{file_path.stem.split('.')[0]}.png"
             if preview_path.exists():
                 preview_path.unlink()
@@ -648,21 +631,18 @@ class WorkflowCanvasGalleryPage(QWidget):
                 self.parent_window.removeInterface(self.opened_workflows[file_path])
                 del self.opened_workflows[file_path]
 
-            # ✅ 关键：从布局中移除并销毁旧卡片
-            if file_path in self._card_map:
-                old_card = self._card_map[file_path]
-                # 从布局中移除
-                self.flow_layout.removeWidget(old_card)
-                # 隐藏并安排销毁
-                old_card.hide()
-                old_card.deleteLater()
-                # 从缓存中删除
-                del self._card_map[file_path]
+            # 卡片由画廊复用，只需从索引中移除
+            self._remove_from_index(file_path)
 
             self._schedule_refresh()
         except Exception as e:
             InfoBar.error("删除失败", str(e), parent=self)
 
+    def _remove_from_index(self, file_path: Path):
+        index = get_gallery_index()
+        if index is not None:
+            index.remove(KIND_WORKFLOW, file_path)
+
     def _on_canvas_saved(self, workflow_path: Path):
         card = self._card_map.get(workflow_path)
         if card and hasattr(card, 'refresh_preview'):
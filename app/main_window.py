@@ -1,18 +1,19 @@
 # -*- coding: utf-8 -*-
-from PyQt5.QtCore import QSize
+from PyQt5.QtCore import QSize, QTimer
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QPlainTextEdit, QApplication, QDesktopWidget
 from loguru import logger
 from qfluentwidgets import FluentWindow, Theme, setTheme, NavigationItemPosition, SplashScreen, FluentIcon
 
-from app.interfaces.component_developer import ComponentDeveloperWidget
 from app.interfaces.exported_project_interface import ExportedProjectsPage
 from app.interfaces.package_manager_interface import EnvManagerUI
 from app.interfaces.settings_interface import SettingInterface
 from app.interfaces.update_checker import UpdateChecker
 from app.interfaces.workflow_manager import WorkflowCanvasGalleryPage
+from app.utils.startup_profiler import PROFILER
 from app.utils.utils import get_icon
 from app.widgets.dialog_widget.logger_dialog import QTextEditLogger
+from app.widgets.lazy_interface import LazyInterface
 
 
 class LowCodeWindow(FluentWindow):
@@ -38,27 +39,33 @@ class LowCodeWindow(FluentWindow):
         self.splashScreen = SplashScreen(self.windowIcon(), self)
         self.splashScreen.setIconSize(QSize(400, 400))
         self.show()
+        PROFILER.mark("启动界面显示")
         # 创建主界面页面
-        self.package_manager = EnvManagerUI()
-        self.package_manager.mgr.install_miniconda()
-        self.develop_page = ComponentDeveloperWidget(self)
-        self.project_manager = ExportedProjectsPage(self)
-        self.workflow_manager = WorkflowCanvasGalleryPage(self)
+        with PROFILER.section("EnvManagerUI"):
+            self.package_manager = EnvManagerUI()
+            self.package_manager.mgr.install_miniconda()
+        # 组件管理页面（代码编辑器依赖 spyder / jedi）首次打开时再创建
+        self.develop_interface = LazyInterface("component_developer_interface", self._create_develop_page)
+        with PROFILER.section("ExportedProjectsPage"):
+            self.project_manager = ExportedProjectsPage(self)
+        with PROFILER.section("WorkflowCanvasGalleryPage"):
+            self.workflow_manager = WorkflowCanvasGalleryPage(self)
         # 添加主界面页面
         workflow_interface = self.addSubInterface(self.workflow_manager, get_icon("工作流"), '画布管理')
         workflow_interface.clicked.connect(self.workflow_manager._schedule_refresh)
-        devp_interface = self.addSubInterface(self.develop_page, get_icon("组件"), '组件管理')
+        devp_interface = self.addSubInterface(self.develop_interface, get_icon("组件"), '组件管理')
         devp_interface.clicked.connect(
             lambda: self.develop_page.code_editor.code_editor.set_jedi_environment(
                 self.package_manager.get_current_python_exe()
             )
         )
         project_interface = self.addSubInterface(self.project_manager, get_icon("项目"), '项目管理')
-        project_interface.clicked.connect(self.project_manager.load_projects)
+        project_interface.clicked.connect(self.project_manager._schedule_refresh)
         package_interface = self.addSubInterface(self.package_manager, get_icon("工具包"), '环境管理')
         package_interface.clicked.connect(self.package_manager.on_env_changed)
         self.updater = UpdateChecker(self)
-        self.updater.check_update()
+        # 更新检查涉及网络请求，窗口显示后再进行
+        QTimer.singleShot(3000, self.updater.check_update)
         self.navigationInterface.addItem(
             routeKey='update',
             icon=FluentIcon.SYNC,
@@ -77,12 +84,23 @@ class LowCodeWindow(FluentWindow):
             )
         )
         # 配置管理界面
-        self.setting_card = SettingInterface(self)
+        with PROFILER.section("SettingInterface"):
+            self.setting_card = SettingInterface(self)
         self.addSubInterface(
             self.setting_card, FluentIcon.SETTING, '系统设置', NavigationItemPosition.BOTTOM
         )
         self.splashScreen.finish()
 
+    @property
+    def develop_page(self):
+        """组件管理页面，首次访问时创建"""
+        return self.develop_interface.widget()
+
+    def _create_develop_page(self):
+        from app.interfaces.component_developer import ComponentDeveloperWidget
+
+        return ComponentDeveloperWidget(self)
+
     def setup_log_viwer(self):
         if not hasattr(self, 'log_viewer'):
             self.log_viewer = QPlainTextEdit()
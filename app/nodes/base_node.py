@@ -2,7 +2,7 @@ import uuid
 from NodeGraphQt import NodeObject
 from loguru import logger
 
-from app.utils.node_logger import NodeLogHandler
+from app.utils.node_logger import NodeLogHandler, RealtimeLogBuffer
 from app.widgets.dialog_widget.component_log_message_box import LogMessageBox
 
 
@@ -18,7 +18,8 @@ class BasicNodeWithGlobalProperty(NodeObject):
         self._input_values = {}
         self.column_select = {}
         self._node_logs = ""
-        self._realtime_logs = ""
+        # 有界实时日志缓冲（行数 / 字节数上限，并计入全局日志内存预算）
+        self._realtime_logs = RealtimeLogBuffer()
 
         self.model.add_property("global_variable", {})
         self.model.add_property("persistent_id", str(uuid.uuid4()))
@@ -36,21 +37,22 @@ class BasicNodeWithGlobalProperty(NodeObject):
         self.log_capture = NodeLogHandler(self.persistent_id, self._log_message, use_file_logging=True)
 
     def _log_message(self, node_id, message):
-        """处理实时日志：追加到内存变量，并推送到已连接的日志窗口"""
+        """处理实时日志：追加到有界内存缓冲，并推送到已连接的日志窗口"""
         if isinstance(message, str) and message.strip():
             if not message.endswith('\n'):
                 message += '\n'
-            # 1. 追加到内存变量 (保持原有逻辑)
-            self._realtime_logs += message
+            self._realtime_logs.append(message)
 
-            # 2. 推送到日志窗口 (新增逻辑)
-            if hasattr(self, 'log_capture') and self.log_capture and self.log_capture.log_window:
+            log_capture = getattr(self, 'log_capture', None)
+            if log_capture and log_capture.log_window:
                 try:
-                    # 直接调用 LogMessageBox 的 add_log_entry 方法
-                    self.log_capture.log_window.add_log_entry(message)
-                    print(f"[DEBUG] BasicNode: Sent message to log window: {message[:30]}...")  # 调试信息
+                    log_capture.log_window.add_log_entry(message)
                 except Exception as e:
-                    print(f"Error sending log to window from _log_message: {e}")
+                    logger.warning(f"推送日志到日志窗口失败: {e}")
+
+    def get_realtime_logs(self):
+        """本次会话中保留在内存里的最近实时日志"""
+        return self._realtime_logs.getvalue()
 
     def get_logs(self):
         """从持久化日志文件读取内容（最多5000行）"""
@@ -64,7 +66,7 @@ class BasicNodeWithGlobalProperty(NodeObject):
 
     def show_logs(self):
         log_content = self.get_logs()
-        w = LogMessageBox(log_content, self.parent_window)
+        w = LogMessageBox(log_content, self.parent_window, search_callback=self.log_capture.search_logs)
 
         self.log_capture.set_log_window(w)
         # ---
@@ -364,6 +364,7 @@ def create_dynamic_code_node(parent_window=None):
             result_path = run_dir / "result.pkl"
             error_path = run_dir / "error.pkl"
             log_file_path = self.log_capture.get_log_file_path()
+            self.log_capture.begin_run(run_id)
 
             # 保存组件代码
             with open(temp_component_path, 'w', encoding='utf-8') as f:
@@ -391,6 +392,8 @@ def create_dynamic_code_node(parent_window=None):
                 raise Exception("执行已被用户取消")
 
             # 启动子进程（非阻塞）
+            # 只读取本次运行新增的日志，避免把历史日志重复推送 / 写入日志库
+            last_log_pos = os.path.getsize(log_file_path) if os.path.exists(log_file_path) else 0
             kwargs = {}
             if platform.system() == "Windows":
                 kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
@@ -407,7 +410,6 @@ def create_dynamic_code_node(parent_window=None):
             start_time = time.time()
             timeout = 300  # 5分钟
             cancelled = False
-            last_log_pos = 0
 
             while proc.poll() is None:
                 # 检查取消
@@ -439,6 +441,7 @@ def create_dynamic_code_node(parent_window=None):
                             new_content = lf.read()
                             if new_content:
                                 self._log_message(self.persistent_id, new_content)
+                                self.log_capture.ingest(new_content)
                                 last_log_pos = lf.tell()
                 except Exception:
                     pass
@@ -457,6 +460,7 @@ def create_dynamic_code_node(parent_window=None):
                         tail_content = lf.read()
                         if tail_content:
                             self._log_message(self.persistent_id, tail_content)
+                            self.log_capture.ingest(tail_content)
             except Exception:
                 pass
             # 清除零时组件
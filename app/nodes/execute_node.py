@@ -20,6 +20,7 @@ from app.components.base import ArgumentType, PropertyType, ConnectionType, Glob
 from app.nodes.base_node import BasicNodeWithGlobalProperty
 from app.nodes.node_execute_script import _EXECUTION_SCRIPT_TEMPLATE
 from app.scheduler.expression_engine import ExpressionEngine
+from app.utils.component_watcher import ComponentWatcher
 from app.utils.node_logger import NodeLogHandler
 from app.utils.utils import draw_square_port, resource_path  # 假设 resource_path 也在 utils
 from app.widgets.node_widget.combobox_widget import ComboBoxWidgetWrapper
@@ -87,15 +88,16 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
         NODE_NAME = component_class.name
         FULL_PATH = full_path
         FILE_PATH = file_path  # 现在 FILE_PATH 是真实的组件文件路径
+        COMPONENT_CLASS = component_class  # 热更新时替换为重新加载的组件类
 
         def __init__(self, qgraphics_item=None):
             super().__init__(CustomNodeItem)
             self.parent_window = parent_window
             self.model.add_property("debug_code", {})
-            self.component_class = component_class
+            self.component_class = self.COMPONENT_CLASS
             self.component_class.path = full_path
-            if hasattr(component_class, "icon"):
-                self.set_icon(component_class.icon)
+            if hasattr(self.component_class, "icon"):
+                self.set_icon(self.component_class.icon)
             
             # --- 调试模式新增 ---
             self._debug_enabled = False
@@ -104,14 +106,20 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
             # --- /调试模式新增 ---
 
             # === 动态生成属性 ===
-            self._generate_parms_widget()
+            # 属性按组件定义直接创建；批量创建节点时（加载工作流）控件推迟到节点首次显示时再构建
+            self._create_parms_properties()
+            self._parms_widgets_built = False
+            if CustomNodeItem.is_drawing_deferred():
+                self.view.on_first_paint = self.build_parms_widgets
+            else:
+                self.build_parms_widgets()
             # === 端口 ===
-            for port_name, label, connection in component_class.get_inputs():
+            for port_name, label, connection in self.component_class.get_inputs():
                 if connection == ConnectionType.SINGLE:
                     self.add_input(port_name)
                 else:
                     self.add_input(port_name, True, painter_func=draw_square_port)
-            for port_name, label in component_class.get_outputs():
+            for port_name, label in self.component_class.get_outputs():
                 self.add_output(port_name)
 
         def _toggle_debug_mode(self):
@@ -204,34 +212,118 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                         f.write(code_text)
                     self._debug_code_content = code_text
                     logger.info(f"已将调试代码保存到 {self.FILE_PATH}")
+                    # 只重新解析该文件，画布中同类节点就地刷新
+                    ComponentWatcher.get_instance().notify_file_changed(self.FILE_PATH)
                 except Exception as e:
                     logger.error(f"保存调试代码到 {self.FILE_PATH} 失败: {e}")
                     # 可以考虑弹窗提示用户保存失败
                     # QMessageBox.warning(self.view, "保存失败", f"无法保存代码到 {self.FILE_PATH}: {e}")
 
-        def _generate_parms_widget(self):
-            """生成节点属性配置控件"""
+        def refresh_component(self, comp_cls=None):
+            """组件文件修改后就地刷新：切换到重新加载的组件类，同步端口、补充新增属性的控件，并清除旧的输出结果"""
+            if comp_cls is not None:
+                self.component_class = comp_cls
+                self.component_class.path = full_path
+            self.set_port_deletion_allowed(True)
+            inputs = self.component_class.get_inputs()
+            input_names = {port_name for port_name, _, _ in inputs}
+            for port_name, port in list(self.inputs().items()):
+                if port_name not in input_names:
+                    port.clear_connections(push_undo=False)
+                    self.delete_input(port)
+            for port_name, label, connection in inputs:
+                if port_name in self.inputs():
+                    continue
+                if connection == ConnectionType.SINGLE:
+                    self.add_input(port_name)
+                else:
+                    self.add_input(port_name, True, painter_func=draw_square_port)
+
+            outputs = self.component_class.get_outputs()
+            output_names = {port_name for port_name, _ in outputs}
+            for port_name, port in list(self.outputs().items()):
+                if port_name not in output_names:
+                    port.clear_connections(push_undo=False)
+                    self.delete_output(port)
+            for port_name, label in outputs:
+                if port_name not in self.outputs():
+                    self.add_output(port_name)
+
+            new_props = [name for name in self.component_class.get_properties() if not self.has_property(name)]
+            if new_props:
+                self._create_parms_properties(new_props)
+                if self._parms_widgets_built:
+                    self._generate_parms_widget(new_props)
+            self.clear_output_value()
+            self.view.draw_node()
+
+        def _create_parms_properties(self, prop_names=None):
+            """按组件定义创建节点属性（初始值与对应控件的初始值一致），prop_names 不为空时只创建其中的属性"""
+            for prop_name, prop_def in self.component_class.get_properties().items():
+                if prop_names is not None and prop_name not in prop_names:
+                    continue
+                prop_type = prop_def.get("type", PropertyType.TEXT)
+                default = prop_def.get("default", "")
+                if prop_type == PropertyType.BOOL:
+                    value = default if isinstance(default, bool) else default in ("true", 1, "True", "1")
+                    self.create_property(prop_name, value, tab="properties")
+                elif prop_type == PropertyType.CHOICE:
+                    choices = prop_def.get("choices", [])
+                    if choices:
+                        self.create_property(prop_name, default if default in choices else choices[0],
+                                             tab="properties")
+                elif prop_type == PropertyType.RANGE:
+                    self.create_property(prop_name, prop_def.get("default", prop_def.get("min", 0)), tab='Properties')
+                elif prop_type == PropertyType.DYNAMICFORM:
+                    self.create_property(prop_name, [], tab='Properties')
+                elif prop_type == PropertyType.VARIABLE:
+                    self.create_property(prop_name, default, tab="properties")
+                elif prop_type == PropertyType.LONGTEXT:
+                    self.create_property(prop_name, default, tab='Properties')
+                else:
+                    self.create_property(prop_name, str(default), tab='Properties')
+
+        def build_parms_widgets(self):
+            """构建属性控件（只构建一次），控件取属性当前值，构建后整个节点重绘一次"""
+            if self._parms_widgets_built:
+                return
+            self._parms_widgets_built = True
+            self.view.on_first_paint = None
+            self._generate_parms_widget()
+            self.view.draw_node()
+            self.model.width = self.view.width
+            self.model.height = self.view.height
+
+        def _embed_parms_widget(self, widget):
+            """嵌入属性控件：属性已由 _create_parms_properties 创建，这里只同步控件值并连接信号"""
+            widget.set_value(self.get_property(widget.get_name()))
+            widget.value_changed.connect(lambda k, v: self.set_property(k, v))
+            widget._node = self
+            self.view.add_widget(widget)
+            widget.parent()
+
+        def _generate_parms_widget(self, prop_names=None):
+            """生成节点属性配置控件，prop_names 不为空时只生成其中的属性"""
             # 生成其他组件属性控件
-            for i, (prop_name, prop_def) in enumerate(component_class.get_properties().items()):
+            for i, (prop_name, prop_def) in enumerate(self.component_class.get_properties().items()):
+                if prop_names is not None and prop_name not in prop_names:
+                    continue
                 prop_type = prop_def.get("type", PropertyType.TEXT)
                 default = prop_def.get("default", "")
                 label = prop_def.get("label", prop_name)
                 if prop_type == PropertyType.BOOL:
-                    self.add_custom_widget(
-                        CheckBoxWidgetWrapper(parent=self.view, name=prop_name, text=label, state=default),
-                        tab="properties"
+                    self._embed_parms_widget(
+                        CheckBoxWidgetWrapper(parent=self.view, name=prop_name, text=label, state=default)
                     )
                 elif prop_type == PropertyType.CHOICE:
                     choices = prop_def.get("choices", [])
                     if choices:
-                        self.add_custom_widget(
+                        self._embed_parms_widget(
                             ComboBoxWidgetWrapper(
                                 parent=self.view, name=prop_name, label=label, items=choices,
-                                z_value=len(component_class.get_properties()) - i
-                            ),
-                            tab="properties"
+                                z_value=len(self.component_class.get_properties()) - i
+                            )
                         )
-                        self.set_property(prop_name, default if default in choices else choices[0])
                 elif prop_type == PropertyType.LONGTEXT:
                     widget = LongTextWidgetWrapper(
                         parent=self.view,
@@ -240,7 +332,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                         default=default,
                         window=parent_window
                     )
-                    self.add_custom_widget(widget, tab='Properties')
+                    self._embed_parms_widget(widget)
                 elif prop_type == PropertyType.RANGE:
                     min_val = prop_def.get("min", 0)
                     max_val = prop_def.get("max", 100)
@@ -255,7 +347,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                         step=step_val,
                         default=default_val
                     )
-                    self.add_custom_widget(widget, tab='Properties')
+                    self._embed_parms_widget(widget)
                 elif prop_type == PropertyType.DYNAMICFORM:
                     raw_schema = prop_def.get("schema", {})
                     processed_schema = {}
@@ -273,23 +365,21 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                         label=label,
                         schema=processed_schema,
                         window=parent_window,
-                        z_value=len(component_class.get_properties()) - i
+                        z_value=len(self.component_class.get_properties()) - i
                     )
-                    self.add_custom_widget(widget, tab='Properties')
+                    self._embed_parms_widget(widget)
                 elif prop_type == PropertyType.VARIABLE:  # 新增类型
-                    self.add_custom_widget(
+                    self._embed_parms_widget(
                         GlobalVarComboBoxWidgetWrapper(
                             parent=self.view,
                             name=prop_name,
                             label=label,
                             main_window=parent_window,  # 传入 main_window 引用
-                            z_value=len(component_class.get_properties()) - i
-                        ),
-                        tab="properties"
+                            z_value=len(self.component_class.get_properties()) - i
+                        )
                     )
-                    self.set_property(prop_name, default)
                 else:
-                    self.add_custom_widget(
+                    self._embed_parms_widget(
                         TextWidgetWrapper(
                             parent=self.view,
                             name=prop_name,
@@ -297,7 +387,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                             type=prop_type,
                             default=str(default),
                             window=parent_window
-                        ), tab='Properties'
+                        )
                     )
 
         def _select_file(self, prop_name):
@@ -370,8 +460,12 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                 prop_type = prop_def.get("type", PropertyType.TEXT)
                 default = prop_def.get("default", "")
                 if prop_type == PropertyType.DYNAMICFORM:
+                    # 控件未构建（节点尚未显示）时属性值即为表单数据
                     widget = self.get_widget(prop_name)
-                    params[prop_name] = widget.get_value() if widget else (default or [])
+                    if widget:
+                        params[prop_name] = widget.get_value()
+                    else:
+                        params[prop_name] = self.get_property(prop_name) if self.has_property(prop_name) else (default or [])
                 else:
                     params[prop_name] = self.get_property(prop_name) if self.has_property(prop_name) else default
 
@@ -453,6 +547,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
 
             # ✅ 复用 NodeLogHandler 的持久化日志路径
             log_file_path = self.log_capture.get_log_file_path()
+            self.log_capture.begin_run(run_id)
 
             # 保存参数
             with open(params_path, 'wb') as f:
@@ -479,6 +574,8 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                     raise Exception("执行已被用户取消")
 
                 # 启动子进程（非阻塞）
+                # 只读取本次运行新增的日志，避免把历史日志重复推送 / 写入日志库
+                last_log_pos = os.path.getsize(log_file_path) if os.path.exists(log_file_path) else 0
                 kwargs = {}
                 if platform.system() == "Windows":
                     kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
@@ -494,7 +591,6 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                 start_time = time.time()
                 timeout = 300  # 5分钟
                 cancelled = False
-                last_log_pos = 0
                 while proc.poll() is None:
                     # 检查取消
                     if check_cancel and check_cancel():
@@ -523,6 +619,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                                 new_content = lf.read()
                                 if new_content:
                                     self._log_message(self.persistent_id, new_content)
+                                    self.log_capture.ingest(new_content)
                                     last_log_pos = lf.tell()
                     except Exception:
                         pass
@@ -540,6 +637,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
                             tail_content = lf.read()
                             if tail_content:
                                 self._log_message(self.persistent_id, tail_content)
+                                self.log_capture.ingest(tail_content)
                 except Exception:
                     pass
 
@@ -559,7 +657,7 @@ def create_node_class(component_class, full_path, file_path, parent_window=None)
             if os.path.exists(result_path):
                 with open(result_path, 'rb') as f:
                     output = pickle.load(f)
-                component_class.logger.success("✅ 节点在独立环境执行完成")
+                self.component_class.logger.success("✅ 节点在独立环境执行完成")
                 for port in comp_obj.outputs:
                     if port.type != ArgumentType.UPLOAD:
                         self.set_output_value(port.name, output.get(port.name))
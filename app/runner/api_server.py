@@ -1,20 +1,36 @@
 # api_server.py（优化版）
 import argparse
+import asyncio
 import json
 import sys
-import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi.encoders import jsonable_encoder
+from starlette.routing import Match
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from loguru import logger
-from pydantic import BaseModel, create_model
+from pydantic import BaseModel, ConfigDict, create_model
 
 sys.path.append(str(Path(__file__).parent))
+from runner.component_executor import ISOLATION_MODES, ISOLATION_AUTO
+from runner.job_queue import JobQueue, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED
+from runner import metrics
+from runner.upload_spool import UploadSpool, SpoolQuotaExceeded
+from runner.result_cache import ResultCache, SingleFlight, canonical_hash, DEFAULT_CACHE_SETTINGS, UncacheableInput
 from runner.workflow_runner import execute_workflow
 
 PROJECT_DIR = Path(__file__).parent
 SPEC_PATH = PROJECT_DIR / "project_spec.json"
+WORKFLOW_PATH = PROJECT_DIR / "model.workflow.json"
+JOBS_DIR = PROJECT_DIR / ".jobs"
+SPOOL_DIR = PROJECT_DIR / ".spool"
+# 批量模式下以内联表格传入、可整体拼接的输入格式（EXCEL 属于文件类输入，批量模式不接受）
+TABLE_FORMATS = ("CSV",)
 
 if not SPEC_PATH.exists():
     raise RuntimeError("project_spec.json 未找到！")
@@ -89,11 +105,49 @@ for key, cfg in project_spec.get("inputs", {}).items():
 
 InputModel = create_model("InputModel", **input_fields)
 
+# === 构建批量 InputModel ===
+# 批量模式不接受文件类输入（不允许客户端传入服务端文件路径）；CSV 输入为内联 CSV 文本或 List[dict]
+BATCH_TABLE_KEYS = {
+    key for key, cfg in project_spec.get("inputs", {}).items() if cfg.get("format", "TEXT") in TABLE_FORMATS
+}
+batch_record_fields = {
+    key: ((Optional[Union[List[dict], str]], None) if key in BATCH_TABLE_KEYS else field_def)
+    for key, field_def in input_fields.items()
+    if not input_file_map[key]
+}
+BatchRecordModel = create_model("BatchRecordModel", __config__=ConfigDict(extra="forbid"), **batch_record_fields)
+BatchInputModel = create_model("BatchInputModel", records=(List[BatchRecordModel], ...))
+
 
 class OutputModel(BaseModel):
     result: Dict[str, Any]
 
 
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class JobSubmitModel(BaseModel):
+    job_id: str
+    status: str
+
+
+class BatchOutputModel(BaseModel):
+    mode: str
+    results: List[BatchItemResult]
+
+
+batch_executor: Optional[ThreadPoolExecutor] = None
+
+# === 结果缓存与请求合并（由 project_spec.json 的 cache 配置控制）===
+cache_settings = {**DEFAULT_CACHE_SETTINGS, **project_spec.get("cache", {})}
+result_cache = ResultCache.from_settings(cache_settings, PROJECT_DIR / ".cache" / "results")
+single_flight = SingleFlight() if cache_settings["coalesce"] else None
+job_queue: Optional[JobQueue] = None
+upload_spool: Optional[UploadSpool] = None
+
 app = FastAPI(
     title="导出的工作流微服务",
     description="由可视化工作流自动生成的 API 服务",
@@ -101,36 +155,502 @@ app = FastAPI(
 )
 
 
+async def _collect_external_inputs(input: InputModel, spool_dir: Path):
+    """
+    将请求模型转换为 execute_workflow 的外部输入
+
+    上传文件分块写入请求级暂存目录 spool_dir；启用结果缓存或请求合并时顺带计算内容哈希
+    """
+    external_inputs = {}
+    file_hashes = {}
+
+    for key, cfg in project_spec.get("inputs", {}).items():
+        value = getattr(input, key)
+
+        if input_file_map.get(key, False) and value is not None:
+            try:
+                file_path, digest = await upload_spool.save(
+                    value, spool_dir, compute_hash=result_cache is not None or single_flight is not None
+                )
+            except SpoolQuotaExceeded as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            external_inputs[key] = file_path
+            if digest:
+                file_hashes[key] = digest
+        else:
+            # DYNAMICFORM 的表单行是动态 pydantic 模型，转为 dict 列表，与持久化后的异步任务输入一致
+            external_inputs[key] = jsonable_encoder(value)
+
+    return external_inputs, file_hashes
+
+
 @app.post("/run", response_model=OutputModel)
 async def run_workflow(input: InputModel):
+    spool_dir = upload_spool.create_dir()
     try:
-        external_inputs = {}
-
-        for key, cfg in project_spec.get("inputs", {}).items():
-            value = getattr(input, key)
-
-            if input_file_map.get(key, False) and value is not None:
-                # 保存上传文件
-                suffix = Path(value.filename).suffix if value.filename else ""
-                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                    content = await value.read()
-                    tmp.write(content)
-                    tmp_path = tmp.name
-                external_inputs[key] = tmp_path
-            else:
-                external_inputs[key] = value
-
-        outputs = execute_workflow(
-            str(PROJECT_DIR / "model.workflow.json"),
-            external_inputs=external_inputs,
-            python_executable=args.python
-        )
-        logger.info(f"工作流执行成功，结果：{outputs}")
+        external_inputs, file_hashes = await _collect_external_inputs(input, spool_dir)
+
+        loop = asyncio.get_running_loop()
+        outputs = await loop.run_in_executor(None, _execute_cached, external_inputs, file_hashes)
+        logger.info(f"工作流执行成功，输出: {list(outputs.keys())}")
+        logger.debug(f"工作流执行结果：{outputs}")
         return {"result": outputs}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("工作流执行失败")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload_spool.release(spool_dir)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/run/stream")
+async def run_workflow_stream(input: InputModel):
+    """
+    以 SSE 推送执行进度：started → node_started / node_partial / node_finished / node_skipped → result | error
+
+    首个事件在执行开始前立即发出，首字节时间与工作流长度无关；流式请求不走结果缓存。
+    """
+    spool_dir = upload_spool.create_dir()
+    try:
+        external_inputs, _ = await _collect_external_inputs(input, spool_dir)
+    except BaseException:
+        upload_spool.release(spool_dir)
+        raise
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event: Dict[str, Any]):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def worker():
+        try:
+            outputs = _execute_record(external_inputs, on_event=on_event)
+            on_event({"event": "result", "result": outputs})
+        except Exception as e:
+            logger.exception("工作流执行失败")
+            on_event({"event": "error", "detail": str(e)})
+        finally:
+            upload_spool.release(spool_dir)
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    async def event_stream():
+        yield _sse("started", {"inputs": list(external_inputs.keys())})
+        future = loop.run_in_executor(None, worker)
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield _sse(event.pop("event"), event)
+        await future
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _get_batch_executor():
+    """批量推理线程池（惰性创建，大小由 --workers 决定）"""
+    global batch_executor
+    if batch_executor is None:
+        batch_executor = ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="batch")
+    return batch_executor
+
+
+def _current_pool() -> str:
+    """按线程名区分执行所在的线程池：batch 批量池 / jobs 任务队列 / default 事件循环默认池"""
+    thread_name = threading.current_thread().name
+    if thread_name.startswith("batch"):
+        return "batch"
+    if thread_name.startswith("job-worker"):
+        return "jobs"
+    return "default"
+
+
+def _execute_record(external_inputs: Dict[str, Any], on_event=None, cancel_event=None) -> Dict[str, Any]:
+    if not metrics.REGISTRY.enabled:
+        return execute_workflow(
+            str(WORKFLOW_PATH),
+            external_inputs=external_inputs,
+            python_executable=args.python,
+            isolation=args.isolation,
+            on_event=on_event,
+            cancel_event=cancel_event
+        )
+
+    pool = _current_pool()
+    metrics.POOL_BUSY.inc(pool=pool)
+    start, status = time.perf_counter(), "success"
+    try:
+        return execute_workflow(
+            str(WORKFLOW_PATH),
+            external_inputs=external_inputs,
+            python_executable=args.python,
+            isolation=args.isolation,
+            on_event=on_event,
+            cancel_event=cancel_event
+        )
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        metrics.POOL_BUSY.dec(pool=pool)
+        metrics.WORKFLOW_DURATION.observe(time.perf_counter() - start, status=status)
+
+
+def _execute_cached(external_inputs: Dict[str, Any], file_hashes: Optional[Dict[str, str]] = None):
+    """带结果缓存与请求合并的执行入口；两者均未启用时直接执行"""
+    if result_cache is None and single_flight is None:
+        return _execute_record(external_inputs)
+
+    try:
+        key = canonical_hash(external_inputs, file_hashes)
+    except UncacheableInput as e:
+        logger.debug(f"输入无法按内容哈希，跳过缓存与请求合并: {e}")
+        return _execute_record(external_inputs)
+    if result_cache is not None:
+        hit, cached = result_cache.get(key)
+        if hit:
+            logger.info(f"命中结果缓存: {key[:12]}")
+            return cached
+
+    def _compute():
+        outputs = _execute_record(external_inputs)
+        if result_cache is not None:
+            result_cache.put(key, outputs)
+        return outputs
+
+    if single_flight is None:
+        return _compute()
+    return single_flight.do(key, _compute)
+
+
+def _get_concat_key() -> Optional[str]:
+    """
+    返回可拼接的表格输入名。
+    仅当 project_spec 声明 batch.concat=true（组件按行独立处理）且恰好有一个表格类组件输入时启用。
+    """
+    if not project_spec.get("batch", {}).get("concat", False):
+        return None
+    table_keys = [
+        key for key, cfg in project_spec.get("inputs", {}).items()
+        if cfg.get("type") == "组件输入" and cfg.get("format") in TABLE_FORMATS
+    ]
+    return table_keys[0] if len(table_keys) == 1 else None
+
+
+def _execute_batch_record(record: Dict[str, Any]):
+    """逐条执行一条批量记录：CSV 输入先在服务端解析为 DataFrame，组件不会把文本当作文件路径读取"""
+    record = {
+        key: _load_table(value) if key in BATCH_TABLE_KEYS and value is not None else value
+        for key, value in record.items()
+    }
+    return _execute_cached(record)
+
+
+def _run_batch_fanout(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """逐条分发到线程池执行，单条失败不影响其他记录"""
+    executor = _get_batch_executor()
+    futures = [executor.submit(_execute_batch_record, record) for record in records]
+    results = []
+    for index, future in enumerate(futures):
+        try:
+            results.append({"index": index, "result": future.result()})
+        except Exception as e:
+            logger.error(f"批量记录 {index} 执行失败: {e}")
+            results.append({"index": index, "error": str(e)})
+    return results
+
+
+class ConcatUnavailable(ValueError):
+    """批量记录不满足拼接条件（在执行前检查），回退为逐条执行"""
+
+
+def _load_table(value):
+    """
+    将一条批量记录中的表格输入转换为 DataFrame。
+    只接受内联数据（CSV 文本、List[dict]、dict），不会按文件路径读取服务端文件。
+    """
+    import io
+
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        return value
+    if isinstance(value, list):
+        return pd.DataFrame(value)
+    if isinstance(value, dict):
+        return pd.DataFrame([value])
+    if isinstance(value, str) and value:
+        return pd.read_csv(io.StringIO(value))
+    raise ConcatUnavailable(f"无法作为表格拼接的输入: {type(value).__name__}")
+
+
+def _prepare_concat(records: List[Dict[str, Any]], concat_key: str):
+    """检查拼接的前提条件并加载表格，返回 (共用输入, [DataFrame])；不满足时抛出 ConcatUnavailable"""
+    shared_inputs = {k: v for k, v in records[0].items() if k != concat_key}
+    for record in records[1:]:
+        if {k: v for k, v in record.items() if k != concat_key} != shared_inputs:
+            raise ConcatUnavailable("非表格输入在记录间不一致")
+
+    frames = []
+    for record in records:
+        try:
+            frames.append(_load_table(record.get(concat_key)))
+        except ConcatUnavailable:
+            raise
+        except Exception as e:
+            raise ConcatUnavailable(f"输入 {concat_key} 无法解析为表格: {e}")
+    return shared_inputs, frames
+
+
+def _run_batch_concat(shared_inputs: Dict[str, Any], frames: list, concat_key: str) -> List[Dict[str, Any]]:
+    """将表格输入按行拼接后只执行一次工作流，再按行数切分输出"""
+    import pandas as pd
+
+    lengths = [len(frame) for frame in frames]
+    total = sum(lengths)
+    merged = pd.concat(frames, ignore_index=True)
+
+    outputs = _execute_record({**shared_inputs, concat_key: merged})
+
+    # 只有输出行数与输入总行数一致时才能按记录切分；工作流已执行过，不再回退为逐条执行
+    split_outputs = [{} for _ in frames]
+    for out_key, out_val in outputs.items():
+        if isinstance(out_val, pd.DataFrame) and len(out_val) == total:
+            rows = out_val.to_dict(orient="records")
+        elif isinstance(out_val, list) and len(out_val) == total:
+            rows = out_val
+        else:
+            raise ValueError(
+                f"输出 {out_key} 行数与输入不一致，无法按记录切分（工作流不是逐行处理时请关闭 batch.concat）"
+            )
+        offset = 0
+        for index, length in enumerate(lengths):
+            split_outputs[index][out_key] = rows[offset:offset + length]
+            offset += length
+    return [{"index": index, "result": result} for index, result in enumerate(split_outputs)]
+
+
+def _run_batch(records: List[Dict[str, Any]]):
+    concat_key = _get_concat_key()
+    if concat_key and len(records) > 1:
+        try:
+            shared_inputs, frames = _prepare_concat(records, concat_key)
+        except ConcatUnavailable as e:
+            logger.warning(f"批量记录不满足拼接条件，回退为逐条执行: {e}")
+        else:
+            return "concat", _run_batch_concat(shared_inputs, frames, concat_key)
+    return "fanout", _run_batch_fanout(records)
+
+
+def _read_batch_table(file_path: str) -> List[Dict[str, Any]]:
+    """将上传的 CSV/Parquet/Excel 文件解析为输入记录，列名对应输入名"""
+    import pandas as pd
+
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".csv":
+        df = pd.read_csv(file_path)
+    elif suffix == ".parquet":
+        df = pd.read_parquet(file_path)
+    elif suffix in (".xlsx", ".xls"):
+        df = pd.read_excel(file_path)
+    else:
+        raise HTTPException(status_code=400, detail=f"不支持的批量文件格式: {suffix}")
+
+    input_keys = set(project_spec.get("inputs", {}).keys())
+    file_columns = [col for col in df.columns if input_file_map.get(col, False)]
+    if file_columns:
+        raise HTTPException(status_code=400, detail=f"批量模式不支持文件类输入: {file_columns}")
+    unknown_columns = [col for col in df.columns if col not in input_keys]
+    if unknown_columns:
+        logger.warning(f"批量文件中以下列不是输入项，已忽略: {unknown_columns}")
+    df = df[[col for col in df.columns if col in input_keys]]
+    # NaN 统一转为 None，保持与 /run 缺省输入一致
+    df = df.astype(object).where(pd.notna(df), None)
+    return df.to_dict(orient="records")
+
+
+async def _run_batch_async(records: List[Dict[str, Any]]):
+    if not records:
+        return {"mode": "fanout", "results": []}
+    loop = asyncio.get_running_loop()
+    try:
+        mode, results = await loop.run_in_executor(None, _run_batch, records)
+    except Exception as e:
+        # 只有拼接模式的整体执行会走到这里（逐条执行的错误按记录返回）
+        logger.exception("批量拼接执行失败")
+        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"批量执行完成，模式: {mode}，记录数: {len(records)}")
+    return {"mode": mode, "results": results}
+
+
+@app.post("/run_batch", response_model=BatchOutputModel)
+async def run_workflow_batch(input: BatchInputModel):
+    records = [record.model_dump() for record in input.records]
+    return await _run_batch_async(records)
+
+
+@app.post("/run_batch/upload", response_model=BatchOutputModel)
+async def run_workflow_batch_upload(file: UploadFile = File(...)):
+    spool_dir = upload_spool.create_dir()
+    try:
+        file_path, _ = await upload_spool.save(file, spool_dir, compute_hash=False)
+        records = _read_batch_table(file_path)
+    except SpoolQuotaExceeded as e:
+        upload_spool.release(spool_dir)
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        upload_spool.release(spool_dir)
+        raise
+    except Exception as e:
+        upload_spool.release(spool_dir)
+        logger.exception("批量文件解析失败")
+        raise HTTPException(status_code=400, detail=f"批量文件解析失败: {e}")
+    # 表格已解析为记录，暂存文件不再需要
+    upload_spool.release(spool_dir)
+    return await _run_batch_async(records)
+
+
+@app.on_event("startup")
+def _start_job_queue():
+    """初始化上传暂存区并启动异步任务队列，恢复上次退出时未完成的任务"""
+    global job_queue, upload_spool
+    upload_spool = UploadSpool(SPOOL_DIR, quota_mb=args.spool_quota_mb)
+    job_queue = JobQueue(
+        runner=lambda external_inputs, cancel_event: _execute_record(external_inputs, cancel_event=cancel_event),
+        data_dir=JOBS_DIR,
+        workers=args.job_workers,
+        retention_hours=args.job_retention_hours,
+        release_spool=upload_spool.release
+    )
+    # 保留仍被排队任务引用的上传目录，其余遗留目录删除
+    upload_spool.purge_stale(keep=job_queue.pending_spool_dirs())
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+def _stop_job_queue():
+    if job_queue is not None:
+        job_queue.stop()
+
+
+def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return job
+
+
+@app.post("/jobs", response_model=JobSubmitModel)
+async def submit_job(input: InputModel):
+    """提交异步任务，立即返回 job_id；适合训练、多文档解析等长耗时工作流"""
+    spool_dir = upload_spool.create_dir()
+    try:
+        external_inputs, _ = await _collect_external_inputs(input, spool_dir)
+    except BaseException:
+        upload_spool.release(spool_dir)
+        raise
+    # 上传目录随任务结束由队列释放
+    job_id = job_queue.submit(external_inputs, spool_dir=str(spool_dir))
+    logger.info(f"任务已提交: {job_id}")
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs")
+def get_jobs_stats():
+    """队列深度、运行中任务数与平均耗时"""
+    return job_queue.stats()
+
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    return _get_job_or_404(job_id)
+
+
+@app.get("/jobs/{job_id}/result", response_model=OutputModel)
+def get_job_result(job_id: str):
+    job = _get_job_or_404(job_id)
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] == JOB_CANCELLED:
+        raise HTTPException(status_code=410, detail="任务已取消")
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"任务尚未完成: {job['status']}")
+    try:
+        return {"result": job_queue.result(job_id)}
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="任务结果已过期清理")
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """取消排队中的任务，或终止运行中任务的组件子进程"""
+    status = job_queue.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return {"job_id": job_id, "status": status}
+
+
+def _route_template(request: Request) -> str:
+    """请求对应的路由模板（如 /jobs/{job_id}）；中间件在路由之前执行，需自行匹配"""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+@app.middleware("http")
+async def _collect_request_metrics(request: Request, call_next):
+    """请求数、耗时、并发与请求 / 响应体大小；未启用指标时直接放行"""
+    if not metrics.REGISTRY.enabled:
+        return await call_next(request)
+
+    # 使用路由模板作为标签，避免 /jobs/{job_id} 等路径产生大量时间序列
+    endpoint = _route_template(request)
+    metrics.REQUESTS_IN_FLIGHT.inc(endpoint=endpoint)
+    start, status_code, response = time.perf_counter(), 500, None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+        metrics.REQUESTS_TOTAL.inc(method=request.method, endpoint=endpoint, status=status_code)
+        metrics.REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, endpoint=endpoint)
+        request_size = request.headers.get("content-length")
+        if request_size:
+            metrics.PAYLOAD_BYTES.observe(int(request_size), endpoint=endpoint, direction="request")
+        response_size = response.headers.get("content-length") if response is not None else None
+        if response_size:
+            metrics.PAYLOAD_BYTES.observe(int(response_size), endpoint=endpoint, direction="response")
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus 文本格式指标，需以 --metrics 启动"""
+    if not metrics.REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="指标未启用，请以 --metrics 启动服务")
+
+    if result_cache is not None:
+        cache_stats = result_cache.stats()
+        metrics.CACHE_HITS.set(cache_stats["hits"])
+        metrics.CACHE_MISSES.set(cache_stats["misses"])
+        metrics.CACHE_HIT_RATIO.set(cache_stats["hit_rate"])
+    if job_queue is not None:
+        job_stats = job_queue.stats()
+        metrics.QUEUE_DEPTH.set(job_stats["queue_depth"])
+        metrics.POOL_SIZE.set(job_stats["workers"], pool="jobs")
+    metrics.POOL_SIZE.set(max(1, args.workers), pool="batch")
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/spec")
@@ -138,11 +658,29 @@ def get_spec():
     return project_spec
 
 
+@app.get("/cache")
+def get_cache_stats():
+    coalesced = single_flight.coalesced if single_flight else 0
+    if result_cache is None:
+        return {"enabled": False, "coalesce": single_flight is not None, "coalesced": coalesced}
+    stats = result_cache.stats()
+    stats["coalesced"] = coalesced
+    return {"enabled": True, "settings": cache_settings, "stats": stats}
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=8000, help="服务端口")
     parser.add_argument("--python", type=str, default=None, help="画布运行python环境")
+    parser.add_argument("--workers", type=int, default=4, help="批量推理并发数")
+    parser.add_argument("--isolation", type=str, default=ISOLATION_AUTO, choices=ISOLATION_MODES,
+                        help="组件执行隔离：auto 解释器一致时进程内执行，subprocess 始终子进程，inprocess 始终进程内")
+    parser.add_argument("--job-workers", type=int, default=2, help="异步任务并发数")
+    parser.add_argument("--spool-quota-mb", type=float, default=2048, help="上传文件暂存磁盘配额（MB）")
+    parser.add_argument("--job-retention-hours", type=float, default=24, help="已完成任务结果保留时长（小时）")
+    parser.add_argument("--metrics", action="store_true", help="启用 /metrics 指标采集")
     args = parser.parse_args()
+    metrics.REGISTRY.enabled = args.metrics
 
     import uvicorn
 
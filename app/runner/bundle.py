@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+导出项目的预编译执行包（bundle/）
+
+导出时在 model.workflow.json 之外额外生成：
+- plan.pkl：精简的执行计划（仅执行所需的节点字段、连接、运行时数据及所用组件的元数据），二进制格式加载
+- sidecars/：体积较大的静态输入 / 参数单独存放，避免随计划一起解析
+- components/ 下所用组件预先编译为 .pyc
+
+运行时若 bundle 与 model.workflow.json 匹配则直接使用，只注册计划中列出的组件；否则回退到 JSON + 扫描组件目录。
+"""
+import compileall
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from .component_registry import LazyComponent
+
+BUNDLE_DIRNAME = "bundle"
+PLAN_FILENAME = "plan.pkl"
+SIDECAR_DIRNAME = "sidecars"
+BUNDLE_VERSION = 2
+# JSON 序列化后超过该大小的静态输入 / 参数落为旁路文件
+SIDECAR_THRESHOLD = 256 * 1024
+
+
+def _workflow_signature(workflow_path: Path) -> str:
+    """按内容计算 model.workflow.json 的 sha256；打包 / 拷贝会改动 mtime，不能用文件时间判断"""
+    digest = hashlib.sha256()
+    with open(workflow_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _extract_sidecars(values: Dict[str, Any], sidecar_dir: Path, prefix: str) -> Dict[str, Any]:
+    """将大体积的值写入旁路文件，计划中只保留 {"__sidecar__": 文件名}"""
+    result = {}
+    for index, (key, value) in enumerate(values.items()):
+        try:
+            size = len(json.dumps(value, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            size = 0
+        if size < SIDECAR_THRESHOLD:
+            result[key] = value
+            continue
+        sidecar_dir.mkdir(parents=True, exist_ok=True)
+        filename = f"{prefix}_{index}.pkl"
+        with open(sidecar_dir / filename, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        result[key] = {"__sidecar__": filename}
+    return result
+
+
+def _resolve_sidecars(values: Dict[str, Any], sidecar_dir: Path) -> Dict[str, Any]:
+    resolved = {}
+    for key, value in values.items():
+        if isinstance(value, dict) and set(value) == {"__sidecar__"}:
+            with open(sidecar_dir / value["__sidecar__"], "rb") as f:
+                value = pickle.load(f)
+        resolved[key] = value
+    return resolved
+
+
+def build_bundle(export_path: Path, project_data: Dict[str, Any], component_meta: Dict[str, Dict[str, Any]]):
+    """
+    根据导出的工作流数据生成执行包
+
+    :param export_path: 导出项目根目录（model.workflow.json 需已写入）
+    :param project_data: 写入 model.workflow.json 的完整数据
+    :param component_meta: {full_path: {"file": 相对项目路径, "class_name", "name", "category", "requirements"}}，仅含所用组件
+    """
+    export_path = Path(export_path)
+    bundle_dir = export_path / BUNDLE_DIRNAME
+    sidecar_dir = bundle_dir / SIDECAR_DIRNAME
+    if sidecar_dir.exists():
+        for stale in sidecar_dir.glob("*.pkl"):
+            stale.unlink()
+
+    nodes = {}
+    for index, (node_id, node_data) in enumerate(project_data["graph"]["nodes"].items()):
+        custom = node_data.get("custom", {})
+        nodes[node_id] = {
+            "name": node_data["name"],
+            "type_": node_data.get("type_"),
+            "custom": {
+                "params": _extract_sidecars(custom.get("params", {}), sidecar_dir, f"{index}_params"),
+                "input_values": _extract_sidecars(custom.get("input_values", {}), sidecar_dir, f"{index}_inputs"),
+                "internal_nodes": custom.get("internal_nodes", []),
+            }
+        }
+
+    runtime = project_data.get("runtime", {})
+    plan = {
+        "version": BUNDLE_VERSION,
+        "workflow_signature": _workflow_signature(export_path / "model.workflow.json"),
+        "graph": {"nodes": nodes, "connections": project_data["graph"]["connections"]},
+        "runtime": {
+            key: runtime[key]
+            for key in ("environment_exe", "node_id2stable_key", "column_select", "global_variable")
+            if key in runtime
+        },
+        "components": component_meta,
+    }
+
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = bundle_dir / f"{PLAN_FILENAME}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, bundle_dir / PLAN_FILENAME)
+
+    # 预编译组件与 runner，首次导入直接命中 __pycache__
+    for sub_dir in ("components", "runner"):
+        if (export_path / sub_dir).exists():
+            compileall.compile_dir(str(export_path / sub_dir), quiet=1)
+    return bundle_dir / PLAN_FILENAME
+
+
+def load_bundle(project_dir: Path, logger=logger) -> Optional[Dict[str, Any]]:
+    """读取执行包；不存在、版本不符或与 model.workflow.json 不一致时返回 None"""
+    plan_path = Path(project_dir) / BUNDLE_DIRNAME / PLAN_FILENAME
+    if not plan_path.exists():
+        return None
+    try:
+        with open(plan_path, "rb") as f:
+            plan = pickle.load(f)
+        workflow_path = Path(project_dir) / "model.workflow.json"
+        if plan.get("version") != BUNDLE_VERSION:
+            return None
+        if workflow_path.exists() and plan["workflow_signature"] != _workflow_signature(workflow_path):
+            logger.info("model.workflow.json 已修改，忽略过期的执行包")
+            return None
+    except Exception as e:
+        logger.warning(f"执行包加载失败，回退到 JSON: {e}")
+        return None
+
+    sidecar_dir = plan_path.parent / SIDECAR_DIRNAME
+    for node_data in plan["graph"]["nodes"].values():
+        custom = node_data["custom"]
+        custom["params"] = _resolve_sidecars(custom["params"], sidecar_dir)
+        custom["input_values"] = _resolve_sidecars(custom["input_values"], sidecar_dir)
+    return plan
+
+
+def load_component_class(project_dir: Path, meta: Dict[str, Any]) -> LazyComponent:
+    """按计划中的元数据注册组件，模块在节点首次执行时才导入"""
+    file_path = (Path(project_dir) / meta["file"]).resolve()
+    return LazyComponent(file_path, meta)
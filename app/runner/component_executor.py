@@ -1,15 +1,205 @@
 # -*- coding: utf-8 -*-
+import copy
+import importlib
+import json
 import os
 import pickle
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import traceback
 import uuid
 from pathlib import Path
 
 from loguru import logger
 from wcwidth import wcswidth
 
+from components.base import BaseComponent
+from runner.component_registry import LazyComponent, resolve_component
+from runner.metrics import REGISTRY, NODE_DURATION
+
+# 组件执行隔离策略
+ISOLATION_AUTO = "auto"  # 解释器与当前进程一致时进程内执行，否则子进程
+ISOLATION_SUBPROCESS = "subprocess"  # 始终子进程（不可信 / 依赖冲突的组件）
+ISOLATION_INPROCESS = "inprocess"  # 始终进程内
+ISOLATION_MODES = (ISOLATION_AUTO, ISOLATION_SUBPROCESS, ISOLATION_INPROCESS)
+# 子进程通过 stdout 回传部分结果的行前缀
+PARTIAL_PREFIX = "__PARTIAL__"
+# 启用指标时子进程回传分段耗时的行前缀
+TIMING_PREFIX = "__TIMING__"
+
+
+class ExecutionCancelled(Exception):
+    """执行被外部取消（cancel_event 置位），正在运行的组件子进程会被终止"""
+
+
+def is_same_interpreter(python_executable: str = None) -> bool:
+    """判断目标解释器是否就是当前进程的解释器"""
+    if not python_executable:
+        return True
+    try:
+        return os.path.samefile(python_executable, sys.executable)
+    except OSError:
+        return os.path.normcase(os.path.realpath(python_executable)) == \
+            os.path.normcase(os.path.realpath(sys.executable))
+
+
+def _declares_subprocess(comp_class) -> bool:
+    """组件是否声明 run_in_subprocess；未导入的惰性组件只读 AST 元数据，不触发导入"""
+    if isinstance(comp_class, LazyComponent) and not comp_class.is_loaded:
+        return bool(comp_class.__dict__.get("run_in_subprocess", False))
+    return bool(getattr(comp_class, "run_in_subprocess", False))
+
+
+def should_run_in_process(comp_class, python_executable: str = None, isolation: str = ISOLATION_AUTO,
+                          global_variable: dict = None) -> bool:
+    # 组件类未加载成功时只能交给子进程按文件加载
+    if not isinstance(comp_class, (type, LazyComponent)):
+        return False
+    if isolation == ISOLATION_SUBPROCESS:
+        return False
+    if isolation != ISOLATION_INPROCESS:
+        # 进程内执行不修改共享的 os.environ，配置了自定义环境变量时交给子进程
+        if BaseComponent.requires_process_env(global_variable) or not is_same_interpreter(python_executable):
+            return False
+    return not _declares_subprocess(comp_class)
+
+
+def run_component(
+        comp_class,
+        file_path: str,
+        params: dict,
+        inputs: dict,
+        global_variable: dict = None,
+        python_executable: str = None,
+        timeout: int = 300,
+        isolation: str = ISOLATION_AUTO,
+        logger: logger = logger,
+        partial_callback=None,
+        cancel_event=None
+):
+    """
+    执行组件：按隔离策略选择进程内执行或子进程执行
+
+    :param isolation: auto / subprocess / inprocess，见 ISOLATION_MODES
+    :param partial_callback: 部分结果回调 (output_name, chunk)，组件通过 emit_partial 推送
+    :param cancel_event: threading.Event，置位后终止执行并抛出 ExecutionCancelled
+    :return: 组件输出字典
+    """
+    if should_run_in_process(comp_class, python_executable, isolation, global_variable):
+        return run_component_in_process(
+            # 惰性注册的组件在首次进程内执行时才导入模块
+            comp_class=resolve_component(comp_class),
+            params=params,
+            inputs=inputs,
+            global_variable=global_variable,
+            # 与子进程模式切换到的目录一致（组件文件的上三级，即项目目录）
+            work_dir=str(Path(file_path).parent.parent.parent) if file_path else None,
+            timeout=timeout,
+            logger=logger,
+            partial_callback=partial_callback,
+            cancel_event=cancel_event
+        )
+    return run_component_in_subprocess(
+        comp_class=comp_class,
+        file_path=file_path,
+        params=params,
+        inputs=inputs,
+        global_variable=global_variable,
+        python_executable=python_executable,
+        timeout=timeout,
+        logger=logger,
+        partial_callback=partial_callback,
+        cancel_event=cancel_event
+    )
+
+
+def run_component_in_process(
+        comp_class,
+        params: dict,
+        inputs: dict,
+        global_variable: dict = None,
+        work_dir: str = None,
+        timeout: int = 300,
+        logger: logger = logger,
+        partial_callback=None,
+        cancel_event=None
+):
+    """
+    在当前进程中执行已由 scan_components 加载的组件类，省去临时脚本、pickle 文件与解释器启动开销
+
+    - 输入参数深拷贝，避免组件原地修改影响共享的上游输出
+    - 每个组件实例使用独立的全局变量上下文
+    - 在工作线程中执行并按 timeout 等待（超时或取消时线程无法强制终止，只能放弃其结果）
+    - 按 node_id 捕获组件日志，输出格式与子进程模式一致
+    - 不切换工作目录、不修改 os.environ（多线程共享），相对路径输出按 work_dir 解析
+    """
+    node_id = str(uuid.uuid4())
+    node_logger = logger.bind(node_id=node_id)
+    captured_lines = []
+    log_handler_id = logger.add(
+        lambda message: captured_lines.append(str(message).rstrip("\n")),
+        level="DEBUG",
+        format="[{time:YYYY-MM-DD HH:mm:ss}] {function}-{line} {level}: {message}",
+        filter=lambda record: record["extra"].get("node_id") == node_id
+    )
+    outcome = {}
+
+    def _target():
+        try:
+            comp_instance = comp_class()
+            comp_instance.logger = node_logger
+            # 类属性上的全局变量上下文在并发请求间共享，这里替换为实例独享
+            comp_instance.global_variable = type(comp_class.global_variable)()
+            comp_instance._partial_callback = partial_callback
+            comp_instance.work_dir = work_dir
+            node_logger.info("开始执行组件")
+            serialize_start = time.perf_counter()
+            params_copy, inputs_copy = copy.deepcopy(params), copy.deepcopy(inputs)
+            execute_start = time.perf_counter()
+            outcome["result"] = comp_instance.execute(params_copy, inputs_copy, global_variable, node_id,
+                                                       apply_env=False)
+            NODE_DURATION.observe(execute_start - serialize_start, component=comp_class.name, phase="serialize")
+            NODE_DURATION.observe(time.perf_counter() - execute_start, component=comp_class.name, phase="execute")
+            node_logger.success("节点执行完成")
+        except BaseException as e:
+            outcome["error"] = e
+            outcome["traceback"] = traceback.format_exc()
+            node_logger.error(f"执行异常: {e}")
+
+    def _execute_once():
+        outcome.clear()
+        worker = threading.Thread(target=_target, name=f"component-{comp_class.__name__}", daemon=True)
+        worker.start()
+        if cancel_event is None:
+            worker.join(timeout)
+        else:
+            deadline = time.monotonic() + timeout
+            while worker.is_alive() and time.monotonic() < deadline:
+                if cancel_event.is_set():
+                    raise ExecutionCancelled(f"组件 {comp_class.name} 执行已取消")
+                worker.join(0.2)
+        if worker.is_alive():
+            raise TimeoutError(f"组件 {comp_class.name} 执行超时（{timeout}s）")
+
+    try:
+        _execute_once()
+        requirements_str = getattr(comp_class, 'requirements', '')
+        if isinstance(outcome.get("error"), ImportError) and requirements_str.strip():
+            _install_requirements(sys.executable, requirements_str)
+            importlib.invalidate_caches()
+            _execute_once()
+    finally:
+        logger.remove(log_handler_id)
+
+    _print_node_log(comp_class.name, captured_lines, logger)
+    if "error" in outcome:
+        logger.error(f"组件执行失败: {outcome['error']}\n{outcome['traceback']}")
+        raise RuntimeError(f"组件执行失败: {outcome['error']}\n{outcome['traceback']}")
+    return outcome.get("result")
+
 
 def run_component_in_subprocess(
         comp_class,
@@ -20,7 +210,9 @@ def run_component_in_subprocess(
         python_executable: str = None,
         log_file_path: str = None,
         timeout: int = 300,
-        logger: logger = logger
+        logger: logger = logger,
+        partial_callback=None,
+        cancel_event=None
 ):
     """
     在独立子进程中执行组件（无 GUI 依赖）
@@ -32,6 +224,8 @@ def run_component_in_subprocess(
     :param python_executable: Python 解释器路径
     :param log_file_path: 日志文件路径（可选）
     :param timeout: 超时时间（秒）
+    :param partial_callback: 部分结果回调，子进程通过 stdout 行回传
+    :param cancel_event: threading.Event，置位后终止子进程
     :return: 组件输出字典
     """
     if python_executable is None:
@@ -58,68 +252,45 @@ def run_component_in_subprocess(
             comp_class=comp_class,
             file_path=file_path,
             temp_script_path=temp_script_path,
-            log_file_path=log_file_path
+            log_file_path=log_file_path,
+            stream_partial=partial_callback is not None,
+            report_timing=REGISTRY.enabled
         )
         f.write(script_content)
 
     try:
         # 保存参数
+        serialize_start = time.perf_counter()
         with open(f"{temp_script_path}.params", 'wb') as f:
             pickle.dump((params, inputs, global_variable), f)
+        serialize_seconds = time.perf_counter() - serialize_start
 
         # 第一次执行
-        result = _run_subprocess(python_executable, temp_script_path, timeout)
+        launched_at = time.time()
+        result = _run_subprocess(python_executable, temp_script_path, timeout, logger, partial_callback, cancel_event)
         # 检查是否需要安装依赖
         needs_install = _check_needs_install(result, temp_script_path)
 
         if needs_install and requirements_str.strip():
             _install_requirements(python_executable, requirements_str)
             # 重新执行
-            result = _run_subprocess(python_executable, temp_script_path, timeout, logger)
+            launched_at = time.time()
+            result = _run_subprocess(python_executable, temp_script_path, timeout, logger, partial_callback, cancel_event)
         # 打印节点日志
         if os.path.exists(log_file_path):
             with open(log_file_path, 'r', encoding='utf-8') as f:
                 inner_lines = f.read().splitlines()
-
-            node_name = comp_class.name
-            title = f"节点 {node_name} 日志"
-
-            # 计算每行的显示宽度（含中文）
-            content_widths = [wcswidth(line) for line in inner_lines]
-            title_width = wcswidth(title)
-            max_content_width = max(content_widths + [title_width, 0])
-
-            # 总宽度 = 内容最大宽 + 左右空格(2) + 两边 | (2) → 共 +4
-            total_width = max_content_width + 4
-            total_width = max(total_width, 60)  # 最小宽度保障
-
-            raw_logger = logger.opt(raw=True)
-
-            # 顶部边框（纯等号，宽度 = total_width）
-            raw_logger.info("=" * total_width + "\n")
-
-            # 标题行：左对齐，右侧补齐空格到 total_width - 2（因为有 "| " 和 " |"）
-            title_padded = f"| {title}"
-            title_display = wcswidth(title_padded)
-            needed_spaces = total_width - 2 - title_display  # -2 是末尾的 " |"
-            title_line = title_padded + " " * needed_spaces + "|\n"
-            raw_logger.info(title_line)
-
-            # 内容行
-            for line in inner_lines:
-                line_padded = f"| {line}"
-                line_display = wcswidth(line_padded)
-                needed_spaces = total_width - 2 - line_display
-                content_line = line_padded + " " * needed_spaces + "|\n"
-                raw_logger.info(content_line)
-
-            # 底部边框
-            raw_logger.info("=" * total_width + "\n")
+            _print_node_log(comp_class.name, inner_lines, logger)
 
         # 处理结果
         if os.path.exists(f"{temp_script_path}.result"):
+            load_start = time.perf_counter()
             with open(f"{temp_script_path}.result", 'rb') as f:
-                return pickle.load(f)
+                output = pickle.load(f)
+            if REGISTRY.enabled:
+                serialize_seconds += time.perf_counter() - load_start
+                _observe_subprocess_timing(comp_class.name, result.stdout, launched_at, serialize_seconds)
+            return output
         elif os.path.exists(f"{temp_script_path}.error"):
             with open(f"{temp_script_path}.error", 'rb') as f:
                 error_info = pickle.load(f)
@@ -137,10 +308,62 @@ def run_component_in_subprocess(
                 os.remove(path)
 
 
-def _generate_execution_script(comp_class, file_path, temp_script_path, log_file_path):
+def _observe_subprocess_timing(component_name, stdout, launched_at, parent_serialize_seconds):
+    """解析子进程回传的分段耗时：spawn（解释器启动 + 组件加载）/ execute / serialize（父子进程两侧 pickle）"""
+    for line in reversed(stdout.splitlines()):
+        if line.startswith(TIMING_PREFIX):
+            timing = json.loads(line[len(TIMING_PREFIX):])
+            NODE_DURATION.observe(max(0.0, timing["spawned"] - launched_at), component=component_name, phase="spawn")
+            NODE_DURATION.observe(timing["execute"], component=component_name, phase="execute")
+            NODE_DURATION.observe(parent_serialize_seconds + timing["serialize"], component=component_name,
+                                  phase="serialize")
+            return
+
+
+def _print_node_log(node_name, inner_lines, logger=logger):
+    """以边框形式打印节点日志"""
+    title = f"节点 {node_name} 日志"
+
+    # 计算每行的显示宽度（含中文）
+    content_widths = [wcswidth(line) for line in inner_lines]
+    title_width = wcswidth(title)
+    max_content_width = max(content_widths + [title_width, 0])
+
+    # 总宽度 = 内容最大宽 + 左右空格(2) + 两边 | (2) → 共 +4
+    total_width = max_content_width + 4
+    total_width = max(total_width, 60)  # 最小宽度保障
+
+    raw_logger = logger.opt(raw=True)
+
+    # 顶部边框（纯等号，宽度 = total_width）
+    raw_logger.info("=" * total_width + "\n")
+
+    # 标题行：左对齐，右侧补齐空格到 total_width - 2（因为有 "| " 和 " |"）
+    title_padded = f"| {title}"
+    title_display = wcswidth(title_padded)
+    needed_spaces = total_width - 2 - title_display  # -2 是末尾的 " |"
+    title_line = title_padded + " " * needed_spaces + "|\n"
+    raw_logger.info(title_line)
+
+    # 内容行
+    for line in inner_lines:
+        line_padded = f"| {line}"
+        line_display = wcswidth(line_padded)
+        needed_spaces = total_width - 2 - line_display
+        content_line = line_padded + " " * needed_spaces + "|\n"
+        raw_logger.info(content_line)
+
+    # 底部边框
+    raw_logger.info("=" * total_width + "\n")
+
+
+def _generate_execution_script(comp_class, file_path, temp_script_path, log_file_path, stream_partial=False,
+                               report_timing=False):
     return f'''# -*- coding: utf-8 -*-
 import sys
 import os
+import json
+import time
 import pickle
 import importlib.util
 import traceback
@@ -187,6 +410,8 @@ if __name__ == "__main__":
     RESULT_PATH = r"{temp_script_path}.result"
     ERROR_PATH = r"{temp_script_path}.error"
     NODE_ID = "{str(uuid.uuid4())}"
+    STREAM_PARTIAL = {bool(stream_partial)}
+    REPORT_TIMING = {bool(report_timing)}
     file_path = Path(FILE_PATH)
     original_cwd = os.getcwd()
     os.chdir(file_path.parent.parent.parent)  # 切到组件所在目录
@@ -218,6 +443,7 @@ if __name__ == "__main__":
         comp_class = getattr(module, CLASS_NAME, None)
         if comp_class is None:
             raise AttributeError(f"模块中未找到类: {{CLASS_NAME}}")
+        spawned_at = time.time()
 
         # 2. 加载参数
         with open(PARAMS_PATH, 'rb') as f:
@@ -225,17 +451,32 @@ if __name__ == "__main__":
             if not isinstance(loaded, (tuple, list)) or len(loaded) != 3:
                 raise ValueError("参数文件格式错误：应为 (params, inputs, global_vars) 三元组")
             params, inputs, global_variables = loaded
+        params_loaded_at = time.time()
 
         # 3. 实例化并执行
         comp_instance = comp_class()
         comp_instance.logger = node_logger  # 注入带 node_id 的 logger
+        if STREAM_PARTIAL:
+            # 部分结果按行写到 stdout，由父进程实时解析
+            comp_instance._partial_callback = lambda output_name, chunk: print(
+                "{PARTIAL_PREFIX}" + json.dumps({{"output": output_name, "chunk": chunk}}, default=str),
+                flush=True
+            )
 
         node_logger.info("开始执行组件")
+        execute_start = time.time()
         output = comp_instance.execute(params, inputs, global_variables, NODE_ID)
+        executed_at = time.time()
 
         # 4. 保存结果
         with open(RESULT_PATH, 'wb') as f:
             pickle.dump(output, f)
+        if REPORT_TIMING:
+            print("{TIMING_PREFIX}" + json.dumps({{
+                "spawned": spawned_at,
+                "execute": executed_at - execute_start,
+                "serialize": (params_loaded_at - spawned_at) + (time.time() - executed_at)
+            }}), flush=True)
 
         node_logger.success("节点执行完成")
         sys.exit(0)
@@ -272,13 +513,17 @@ if __name__ == "__main__":
             logger.remove(log_handler_id)'''
 
 
-def _run_subprocess(python_executable, script_path, timeout):
-    result = subprocess.run(
-        [python_executable, script_path],
-        capture_output=True, text=True, timeout=timeout,
-        creationflags=subprocess.CREATE_NO_WINDOW,
-        encoding='utf-8'
-    )
+def _run_subprocess(python_executable, script_path, timeout, logger=logger, partial_callback=None,
+                    cancel_event=None):
+    if partial_callback is None and cancel_event is None:
+        result = subprocess.run(
+            [python_executable, script_path],
+            capture_output=True, text=True, timeout=timeout,
+            creationflags=subprocess.CREATE_NO_WINDOW,
+            encoding='utf-8'
+        )
+    else:
+        result = _run_subprocess_streaming(python_executable, script_path, timeout, partial_callback, cancel_event)
     # 调试时可打印子进程日志
     if result.stdout.strip():
         logger.debug("子进程 stdout:\n{}", result.stdout)
@@ -287,6 +532,62 @@ def _run_subprocess(python_executable, script_path, timeout):
     return result
 
 
+def _run_subprocess_streaming(python_executable, script_path, timeout, partial_callback=None, cancel_event=None):
+    """
+    逐行读取子进程 stdout，将部分结果行实时转交回调，其余输出照常收集
+
+    超时或 cancel_event 置位时由监视线程终止子进程
+    """
+    args = [python_executable, script_path]
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8',
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_reader.start()
+    stop_reason = {}
+    cancel_event = cancel_event or threading.Event()
+
+    def _watch():
+        deadline = time.monotonic() + timeout
+        while process.poll() is None:
+            if cancel_event.wait(0.1):
+                stop_reason["cancelled"] = True
+            elif time.monotonic() >= deadline:
+                stop_reason["timed_out"] = True
+            else:
+                continue
+            process.kill()
+            return
+
+    watcher = threading.Thread(target=_watch, daemon=True)
+    watcher.start()
+    stdout_lines = []
+    try:
+        for line in process.stdout:
+            if partial_callback is not None and line.startswith(PARTIAL_PREFIX):
+                try:
+                    payload = json.loads(line[len(PARTIAL_PREFIX):])
+                    partial_callback(payload["output"], payload["chunk"])
+                except Exception as e:
+                    logger.warning(f"部分结果解析失败: {e}")
+            else:
+                stdout_lines.append(line)
+        process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr_reader.join()
+    if stop_reason.get("cancelled"):
+        raise ExecutionCancelled("组件子进程已被取消")
+    if stop_reason.get("timed_out"):
+        raise subprocess.TimeoutExpired(args, timeout)
+    return subprocess.CompletedProcess(args, process.returncode, "".join(stdout_lines), "".join(stderr_chunks))
+
+
 def _check_needs_install(result, temp_script_path):
     if result.returncode == 0:
         return False
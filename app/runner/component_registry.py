@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+惰性组件注册表
+
+扫描组件目录时只用 AST 提取类名、name、category 等字面量元数据（按文件 mtime 缓存），
+不执行组件文件的顶层导入；组件模块在首次实例化或访问其他类属性时才真正导入。
+无法静态解析的文件（name / category 不是字面量）回退为立即导入。
+
+GUI 侧使用进程级 ComponentRegistry 并挂载磁盘元数据缓存（MetadataCache）：
+端口 / 属性定义在组件首次导入后写入缓存，之后的启动与新建画布直接读取，不再导入组件模块；
+再次扫描时只重新解析 mtime / size 有变化的文件。
+"""
+import ast
+import atexit
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# AST 中可直接读取的类属性
+LITERAL_ATTRS = ("name", "category", "description", "requirements", "run_in_subprocess")
+
+# {文件路径: ((mtime_ns, size), [元数据, ...] 或 None)}，None 表示需要立即导入
+_metadata_cache: Dict[str, tuple] = {}
+_metadata_lock = threading.Lock()
+
+
+def _file_signature(py_file: Path):
+    stat = py_file.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def parse_component_metadata(py_file: Path, source: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    从源码 AST 提取组件元数据：[{"class_name", "name", "category", ...}]
+
+    返回 None 表示该文件无法静态解析，需要导入模块获取组件信息
+    """
+    try:
+        if source is None:
+            source = Path(py_file).read_text(encoding="utf-8")
+        tree = ast.parse(source, filename=str(py_file))
+    except (SyntaxError, UnicodeDecodeError, OSError):
+        return None
+
+    components = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        attrs = {}
+        for stmt in node.body:
+            targets = []
+            if isinstance(stmt, ast.Assign):
+                targets, value = stmt.targets, stmt.value
+            elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+                targets, value = [stmt.target], stmt.value
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id in LITERAL_ATTRS:
+                    try:
+                        attrs[target.id] = ast.literal_eval(value)
+                    except Exception:
+                        attrs[target.id] = value
+        if "category" not in attrs:
+            continue
+        if not all(isinstance(attrs.get(key), str) for key in ("name", "category")):
+            return None
+        components.append({"class_name": node.name, **{
+            key: value for key, value in attrs.items() if not isinstance(value, ast.AST)
+        }})
+    return components or None
+
+
+def get_component_metadata(py_file: Path) -> Optional[List[Dict[str, Any]]]:
+    """带 mtime 缓存的 parse_component_metadata"""
+    key = str(py_file)
+    signature = _file_signature(py_file)
+    with _metadata_lock:
+        cached = _metadata_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    metadata = parse_component_metadata(py_file)
+    with _metadata_lock:
+        _metadata_cache[key] = (signature, metadata)
+    return metadata
+
+
+def load_module(py_file: Path):
+    module_name = f"dynamic_component_{py_file.stem}_{hash(py_file)}"
+    spec = importlib.util.spec_from_file_location(module_name, py_file)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load spec for {py_file}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LazyComponent:
+    """
+    组件类的惰性代理
+
+    name / category / description / requirements / __name__ 直接来自 AST；
+    元数据带有 ports（磁盘缓存的端口 / 属性定义）时，get_inputs / get_outputs / get_properties 也无需导入；
+    访问其他属性、设置属性或实例化时导入模块并转发给真实组件类。
+    """
+
+    def __init__(self, py_file: Path, metadata: Dict[str, Any],
+                 module_loader: Callable[[Path], Any] = load_module,
+                 enum_types: Optional[Dict[str, type]] = None,
+                 on_resolve: Optional[Callable[["LazyComponent", type], None]] = None):
+        object.__setattr__(self, "_lazy_file", Path(py_file))
+        object.__setattr__(self, "_lazy_loader", module_loader)
+        object.__setattr__(self, "_lazy_class", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+        object.__setattr__(self, "_lazy_ports", metadata.get("ports"))
+        object.__setattr__(self, "_lazy_enum_types", enum_types or {})
+        object.__setattr__(self, "_lazy_on_resolve", on_resolve)
+        object.__setattr__(self, "__name__", metadata["class_name"])
+        object.__setattr__(self, "_source_file", Path(py_file))
+        for key in LITERAL_ATTRS:
+            if key in metadata:
+                object.__setattr__(self, key, metadata[key])
+
+    def resolve(self):
+        """导入组件模块并返回真实组件类"""
+        comp_class = self._lazy_class
+        if comp_class is not None:
+            return comp_class
+        with self._lazy_lock:
+            if self._lazy_class is None:
+                module = self._lazy_loader(self._lazy_file)
+                comp_class = getattr(module, self.__name__)
+                comp_class._source_file = self._lazy_file
+                object.__setattr__(self, "_lazy_class", comp_class)
+                if self._lazy_ports is None and self._lazy_on_resolve is not None:
+                    self._lazy_on_resolve(self, comp_class)
+        return self._lazy_class
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_class is not None
+
+    def reload(self, metadata: Dict[str, Any]):
+        """组件文件修改后就地更新元数据并丢弃已导入的类，引用该代理的节点下次访问时导入新代码"""
+        with self._lazy_lock:
+            object.__setattr__(self, "_lazy_class", None)
+            object.__setattr__(self, "_lazy_ports", metadata.get("ports"))
+            for key in LITERAL_ATTRS:
+                if key in metadata:
+                    object.__setattr__(self, key, metadata[key])
+                else:
+                    self.__dict__.pop(key, None)
+
+    def _cached_ports(self, key):
+        if self._lazy_class is not None or self._lazy_ports is None:
+            return None
+        return _decode_value(self._lazy_ports[key], self._lazy_enum_types)
+
+    def get_inputs(self):
+        cached = self._cached_ports("inputs")
+        if cached is None:
+            return self.resolve().get_inputs()
+        return [tuple(port) for port in cached]
+
+    def get_outputs(self):
+        cached = self._cached_ports("outputs")
+        if cached is None:
+            return self.resolve().get_outputs()
+        return [tuple(port) for port in cached]
+
+    def get_properties(self):
+        cached = self._cached_ports("properties")
+        if cached is None:
+            return self.resolve().get_properties()
+        return cached
+
+    def __getattr__(self, item):
+        # 仅在实例上找不到属性时调用：转发给真实组件类
+        if item.startswith("_lazy"):
+            raise AttributeError(item)
+        return getattr(self.resolve(), item)
+
+    def __setattr__(self, key, value):
+        setattr(self.resolve(), key, value)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "lazy"
+        return f"<LazyComponent {self.__name__} ({state}) from {self._lazy_file}>"
+
+
+def resolve_component(comp_class):
+    """惰性代理返回真实组件类，其他对象原样返回"""
+    if isinstance(comp_class, LazyComponent):
+        return comp_class.resolve()
+    return comp_class
+
+
+def _encode_value(value):
+    """枚举值编码为 {"__enum__": 类名, "value": 值}，以便 JSON 缓存后还原"""
+    if isinstance(value, Enum):
+        return {"__enum__": type(value).__name__, "value": value.value}
+    if isinstance(value, dict):
+        return {key: _encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    return value
+
+
+def _decode_value(value, enum_types: Dict[str, type]):
+    if isinstance(value, dict):
+        if set(value) == {"__enum__", "value"}:
+            enum_type = enum_types.get(value["__enum__"])
+            return enum_type(value["value"]) if enum_type is not None else value["value"]
+        return {key: _decode_value(item, enum_types) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(item, enum_types) for item in value]
+    return value
+
+
+def capture_ports(comp_class) -> Optional[Dict[str, Any]]:
+    """读取组件类的端口 / 属性定义并编码为可 JSON 缓存的结构，无法序列化时返回 None"""
+    try:
+        ports = {
+            "inputs": _encode_value(comp_class.get_inputs()),
+            "outputs": _encode_value(comp_class.get_outputs()),
+            "properties": _encode_value(comp_class.get_properties()),
+        }
+        json.dumps(ports, ensure_ascii=False)
+    except Exception:
+        return None
+    return ports
+
+
+class MetadataCache:
+    """
+    组件元数据的磁盘缓存（JSON）
+
+    每个文件一条记录：{"signature": [mtime_ns, size], "sha256", "components": [元数据..] 或 null}，
+    元数据在组件首次导入后补充 ports。dependencies（如 base.py）的签名变化时整体失效。
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Path, dependencies=()):
+        self.path = Path(path)
+        self._dependencies = {str(Path(dep)): list(_file_signature(Path(dep))) for dep in dependencies
+                              if Path(dep).exists()}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+        atexit.register(self.save)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.VERSION or data.get("dependencies") != self._dependencies:
+            self._dirty = True
+            return
+        self._files = data.get("files", {})
+
+    def get(self, py_file: Path, signature) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._files.get(str(py_file))
+        if entry is not None and tuple(entry["signature"]) == tuple(signature):
+            return entry
+        return None
+
+    def put(self, py_file: Path, signature, sha256: str, components):
+        with self._lock:
+            self._files[str(py_file)] = {"signature": list(signature), "sha256": sha256, "components": components}
+            self._dirty = True
+
+    def set_ports(self, py_file: Path, class_name: str, ports: Dict[str, Any]):
+        with self._lock:
+            entry = self._files.get(str(py_file))
+            for meta in (entry or {}).get("components") or []:
+                if meta["class_name"] == class_name:
+                    meta["ports"] = ports
+                    self._dirty = True
+
+    def prune(self, existing):
+        """删除已不存在的文件记录"""
+        with self._lock:
+            for key in set(self._files) - set(existing):
+                del self._files[key]
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(
+                {"version": self.VERSION, "dependencies": self._dependencies, "files": self._files},
+                ensure_ascii=False
+            )
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            with self._lock:
+                self._dirty = True
+
+
+class ComponentRegistry:
+    """
+    组件注册表：返回 (comp_map, file_map)
+
+    同一个实例重复扫描时复用未变化文件的组件对象，只重新解析 mtime / size 变化的文件；
+    挂载 MetadataCache 后，元数据与端口定义跨进程复用。
+    """
+
+    def __init__(self, comp_path: Path, metadata_cache: Optional[MetadataCache] = None,
+                 enum_types: Optional[Dict[str, type]] = None, skip_empty_name: bool = False,
+                 exclude: Optional[Callable[[Any], bool]] = None):
+        self.comp_path = Path(comp_path)
+        self.metadata_cache = metadata_cache
+        self.enum_types = enum_types or {}
+        self.skip_empty_name = skip_empty_name
+        self.exclude = exclude
+        # {文件路径: (签名, [(full_path, 组件类), ...])}
+        self._files: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def scan(self, logger):
+        comp_map = {}
+        file_map = {}
+        with self._lock:
+            seen = set()
+            for py_file in self.comp_path.rglob("*.py"):
+                if py_file.name == "__init__.py" or py_file.name == "base.py":
+                    continue
+                key = str(py_file)
+                try:
+                    signature = _file_signature(py_file)
+                except OSError:
+                    continue
+                seen.add(key)
+
+                cached = self._files.get(key)
+                if cached is None or cached[0] != signature:
+                    cached = self._refresh(py_file, signature, logger)
+                    if cached is None:
+                        continue
+
+                for full_path, comp_class in cached[1]:
+                    comp_map[full_path] = comp_class
+                    file_map[full_path] = py_file
+
+            for key in set(self._files) - seen:
+                del self._files[key]
+            if self.metadata_cache is not None:
+                self.metadata_cache.prune(seen)
+                self.metadata_cache.save()
+        return comp_map, file_map
+
+    def refresh_files(self, paths, logger) -> Dict[str, Dict[str, Any]]:
+        """
+        只重新解析指定文件（文件监视器回调使用）
+
+        Returns:
+            {"removed": {full_path: 文件}, "updated": {full_path: (组件类, 文件)}}，未变化的文件不出现在结果中
+        """
+        removed, updated = {}, {}
+        with self._lock:
+            for py_file in {Path(p) for p in paths}:
+                if py_file.suffix != ".py" or py_file.name in ("__init__.py", "base.py"):
+                    continue
+                key = str(py_file)
+                previous = self._files.get(key)
+                try:
+                    signature = _file_signature(py_file)
+                except OSError:
+                    signature = None
+                if previous is not None and previous[0] == signature:
+                    continue
+                old_paths = {full_path for full_path, _ in previous[1]} if previous else set()
+                if signature is None:
+                    self._files.pop(key, None)
+                    current = []
+                else:
+                    cached = self._refresh(py_file, signature, logger)
+                    current = cached[1] if cached is not None else []
+                for full_path, comp_class in current:
+                    updated[full_path] = (comp_class, py_file)
+                for full_path in old_paths - set(updated):
+                    removed[full_path] = py_file
+            if self.metadata_cache is not None:
+                self.metadata_cache.save()
+        return {"removed": removed, "updated": updated}
+
+    def _refresh(self, py_file: Path, signature, logger):
+        key = str(py_file)
+        previous = self._files.get(key)
+        try:
+            cached = (signature, self._load_file(py_file, signature, previous[1] if previous else ()))
+        except Exception as e:
+            import traceback
+            logger.error(f"⚠️ Failed to load {py_file}: {e}\n{traceback.format_exc()}")
+            self._files.pop(key, None)
+            return None
+        self._files[key] = cached
+        return cached
+
+    def _read_metadata(self, py_file: Path, signature):
+        if self.metadata_cache is None:
+            return get_component_metadata(py_file)
+        entry = self.metadata_cache.get(py_file, signature)
+        if entry is not None:
+            return entry["components"]
+        raw = py_file.read_bytes()
+        try:
+            metadata = parse_component_metadata(py_file, raw.decode("utf-8"))
+        except UnicodeDecodeError:
+            metadata = None
+        self.metadata_cache.put(py_file, signature, hashlib.sha256(raw).hexdigest(), metadata)
+        return metadata
+
+    def _on_resolve(self, proxy: LazyComponent, comp_class):
+        ports = capture_ports(comp_class)
+        if ports is not None:
+            self.metadata_cache.set_ports(proxy._lazy_file, proxy.__name__, ports)
+
+    def _load_file(self, py_file: Path, signature, previous=()):
+        components = []
+        metadata = self._read_metadata(py_file, signature)
+        if metadata is not None:
+            # 同一类名的代理就地更新，已创建的节点类和节点继续引用同一对象
+            proxies = {
+                comp_class.__name__: comp_class for _, comp_class in previous
+                if isinstance(comp_class, LazyComponent)
+            }
+            on_resolve = self._on_resolve if self.metadata_cache is not None else None
+            for meta in metadata:
+                if self.skip_empty_name and len(meta["name"]) == 0:
+                    continue
+                full_path = f"{meta['category']}/{meta['name']}"
+                proxy = proxies.pop(meta["class_name"], None)
+                if proxy is not None:
+                    proxy.reload(meta)
+                else:
+                    proxy = LazyComponent(py_file, meta, enum_types=self.enum_types, on_resolve=on_resolve)
+                components.append((full_path, proxy))
+            return components
+
+        module = load_module(py_file)
+        # 遍历模块中的所有类
+        for name, obj in inspect.getmembers(module, inspect.isclass):
+            if getattr(obj, 'category', None) is None or (self.exclude is not None and self.exclude(obj)):
+                continue
+            component_name = getattr(obj, 'name', obj.__name__)
+            if self.skip_empty_name and len(component_name) == 0:
+                continue
+            obj._source_file = py_file  # 动态加属性
+            full_path = f"{getattr(obj, 'category', None)}/{component_name}"
+            components.append((full_path, obj))
+        return components
+
+
+def scan_components_lazy(comp_path: Path, logger, skip_empty_name: bool = False,
+                         exclude: Optional[Callable[[Any], bool]] = None):
+    """
+    扫描组件目录，返回 (comp_map, file_map)
+
+    可静态解析的文件注册 LazyComponent，其余文件立即导入（与原有扫描行为一致）
+    """
+    registry = ComponentRegistry(comp_path, skip_empty_name=skip_empty_name, exclude=exclude)
+    return registry.scan(logger)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict, deque
+
+
+class GraphIndex:
+    """
+    连接关系索引：一次构建，按节点 / 端口直接查询上下游连接。
+
+    替代在每个节点上重复扫描 graph_data["connections"] 的做法，
+    连接顺序与原始 connections 列表保持一致（多输入端口聚合依赖该顺序）。
+    """
+
+    def __init__(self, connections):
+        # in_node_id -> [(out_node_id, out_port, in_port)]
+        self.in_edges = defaultdict(list)
+        # out_node_id -> [(in_node_id, in_port, out_port)]
+        self.out_edges = defaultdict(list)
+
+        for conn in connections:
+            out_nid, out_port = conn["out"][0], conn["out"][1]
+            in_nid, in_port = conn["in"][0], conn["in"][1]
+            self.in_edges[in_nid].append((out_nid, out_port, in_port))
+            self.out_edges[out_nid].append((in_nid, in_port, out_port))
+
+    def inputs_of(self, node_id):
+        """节点的所有入边：[(out_node_id, out_port, in_port)]"""
+        return self.in_edges.get(node_id, ())
+
+    def outputs_of(self, node_id):
+        """节点的所有出边：[(in_node_id, in_port, out_port)]"""
+        return self.out_edges.get(node_id, ())
+
+    def downstream(self, start_node_id, allowed_ids=None):
+        """BFS 获取所有直接 / 间接下游节点（不含起点）"""
+        downstream = set()
+        visited = {start_node_id}
+        queue = deque([start_node_id])
+        while queue:
+            current = queue.popleft()
+            for target, _, _ in self.out_edges.get(current, ()):
+                if allowed_ids is not None and target not in allowed_ids:
+                    continue
+                if target not in visited:
+                    visited.add(target)
+                    downstream.add(target)
+                    queue.append(target)
+        return downstream
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+import json
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from loguru import logger
+
+from runner.component_executor import ExecutionCancelled
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobQueue:
+    """
+    基于 SQLite 的持久化异步任务队列
+
+    - 任务记录（状态、输入、时间戳、错误）持久化在 jobs.db，服务重启后未完成的任务重新排队
+    - 结果以 pickle 存放在 results 目录，超过保留期的已完成任务连同结果一起清理
+    - 每个运行中的任务持有一个 cancel_event，取消时传给 execute_workflow 以终止组件子进程
+    - 任务可关联一个上传暂存目录，任务结束（完成 / 失败 / 取消）后交给 release_spool 删除
+    - 服务停止时中断的任务保持运行中状态并保留上传目录，下次启动时重新排队执行
+    """
+
+    def __init__(self, runner: Callable[[Dict[str, Any], threading.Event], Any], data_dir: Path,
+                 workers: int = 2, retention_hours: float = 24,
+                 release_spool: Optional[Callable[[str], None]] = None):
+        self.runner = runner
+        self.release_spool = release_spool
+        self.workers = max(1, workers)
+        self.retention_seconds = retention_hours * 3600
+        self.data_dir = Path(data_dir)
+        self.results_dir = self.data_dir / "results"
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.data_dir / "jobs.db"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._cancel_events: Dict[str, threading.Event] = {}
+        # 由客户端取消的运行中任务；其余被中断的任务视为服务停止，留待重启后恢复
+        self._client_cancelled = set()
+        self._threads = []
+        self._stopped = False
+        self._last_cleanup = 0.0
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    inputs TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    error TEXT,
+                    spool_dir TEXT
+                )
+            """)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "spool_dir" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN spool_dir TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+            # 上次进程退出时仍在运行的任务重新排队
+            recovered = self._conn.execute(
+                "UPDATE jobs SET status=?, started_at=NULL WHERE status=?", (JOB_QUEUED, JOB_RUNNING)
+            ).rowcount
+            self._conn.commit()
+        if recovered:
+            logger.warning(f"恢复 {recovered} 个中断的任务")
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """停止领取新任务并中止运行中的组件；被中止的任务保持运行中状态，重启时重新排队"""
+        with self._wakeup:
+            self._stopped = True
+            for event in self._cancel_events.values():
+                event.set()
+            self._wakeup.notify_all()
+
+    def submit(self, inputs: Dict[str, Any], spool_dir: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        # pydantic 模型（如 DYNAMICFORM 的表单行）转为普通 dict / list，与同步接口收到的数据结构一致
+        payload = json.dumps(jsonable_encoder(inputs), ensure_ascii=False)
+        with self._wakeup:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, inputs, created_at, spool_dir) VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, payload, time.time(), spool_dir)
+            )
+            self._conn.commit()
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self._row_to_status(row) if row else None
+
+    def pending_spool_dirs(self):
+        """排队 / 运行中任务仍在引用的上传目录"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT spool_dir FROM jobs WHERE status IN (?, ?) AND spool_dir IS NOT NULL",
+                (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def result(self, job_id: str):
+        path = self._result_path(job_id)
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """取消任务，返回取消后的状态；任务不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT status, spool_dir FROM jobs WHERE id=?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            status = row["status"]
+            if status == JOB_QUEUED:
+                self._conn.execute(
+                    "UPDATE jobs SET status=?, finished_at=? WHERE id=?", (JOB_CANCELLED, time.time(), job_id)
+                )
+                self._conn.commit()
+                status = JOB_CANCELLED
+                self._release(row["spool_dir"])
+            elif status == JOB_RUNNING:
+                # 由工作线程在执行中止后写入最终状态
+                cancel_event = self._cancel_events.get(job_id)
+                if cancel_event is not None:
+                    self._client_cancelled.add(job_id)
+                    cancel_event.set()
+        return status
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            timings = self._conn.execute(
+                "SELECT AVG(started_at - created_at), AVG(finished_at - started_at), MAX(finished_at - started_at) "
+                "FROM jobs WHERE status=? AND started_at IS NOT NULL", (JOB_SUCCEEDED,)
+            ).fetchone()
+        return {
+            "workers": self.workers,
+            "queue_depth": counts.get(JOB_QUEUED, 0),
+            "running": counts.get(JOB_RUNNING, 0),
+            "counts": counts,
+            "avg_wait_seconds": timings[0],
+            "avg_run_seconds": timings[1],
+            "max_run_seconds": timings[2],
+            "retention_hours": self.retention_seconds / 3600,
+        }
+
+    def _claim_next(self):
+        """取出最早排队的任务并标记为运行中；队列为空时阻塞等待"""
+        with self._wakeup:
+            while not self._stopped:
+                row = self._conn.execute(
+                    "SELECT id, inputs, spool_dir FROM jobs WHERE status=? ORDER BY created_at LIMIT 1", (JOB_QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status=?, started_at=? WHERE id=?", (JOB_RUNNING, time.time(), row["id"])
+                    )
+                    self._conn.commit()
+                    cancel_event = threading.Event()
+                    self._cancel_events[row["id"]] = cancel_event
+                    return row["id"], json.loads(row["inputs"]), row["spool_dir"], cancel_event
+                self._wakeup.wait(timeout=60)
+                self._cleanup_expired()
+        return None
+
+    def _worker_loop(self):
+        while True:
+            claimed = self._claim_next()
+            if claimed is None:
+                return
+            job_id, inputs, spool_dir, cancel_event = claimed
+            status, error = JOB_SUCCEEDED, None
+            try:
+                outputs = self.runner(inputs, cancel_event)
+                tmp_path = self._result_path(job_id).with_suffix(".tmp")
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+                tmp_path.replace(self._result_path(job_id))
+            except ExecutionCancelled:
+                status = JOB_CANCELLED
+            except Exception as e:
+                status, error = JOB_FAILED, str(e)
+                logger.exception(f"任务执行失败: {job_id}")
+
+            # 取消事件的移除与最终状态写入在同一次加锁内完成，cancel() 不会看到“运行中但已无事件”的中间状态
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+                client_cancelled = job_id in self._client_cancelled
+                self._client_cancelled.discard(job_id)
+                if status != JOB_SUCCEEDED and cancel_event.is_set() and not client_cancelled:
+                    # 服务停止导致的中断：保持运行中状态与上传目录，重启时重新排队
+                    logger.info(f"服务停止，任务将在重启后恢复: {job_id}")
+                    continue
+                self._conn.execute(
+                    "UPDATE jobs SET status=?, finished_at=?, error=? WHERE id=?",
+                    (status, time.time(), error, job_id)
+                )
+                self._conn.commit()
+                self._cleanup_expired()
+            if status == JOB_CANCELLED:
+                logger.info(f"任务已取消: {job_id}")
+            self._release(spool_dir)
+
+    def _cleanup_expired(self):
+        """清理超过保留期的已完成任务及其结果文件（调用方持有锁）"""
+        now = time.time()
+        if now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+        placeholders = ",".join("?" * len(FINISHED_STATES))
+        expired = [row[0] for row in self._conn.execute(
+            f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+            (*FINISHED_STATES, now - self.retention_seconds)
+        ).fetchall()]
+        if not expired:
+            return
+        for job_id in expired:
+            self._result_path(job_id).unlink(missing_ok=True)
+        self._conn.executemany("DELETE FROM jobs WHERE id=?", [(job_id,) for job_id in expired])
+        self._conn.commit()
+        logger.info(f"清理过期任务 {len(expired)} 个")
+
+    def _release(self, spool_dir: Optional[str]):
+        if spool_dir and self.release_spool is not None:
+            try:
+                self.release_spool(spool_dir)
+            except Exception as e:
+                logger.warning(f"清理任务上传目录失败: {e}")
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.results_dir / f"{job_id}.pkl"
+
+    @staticmethod
+    def _row_to_status(row) -> Dict[str, Any]:
+        started_at, finished_at = row["started_at"], row["finished_at"]
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "wait_seconds": (started_at or finished_at or time.time()) - row["created_at"],
+            "run_seconds": ((finished_at or time.time()) - started_at) if started_at else None,
+            "error": row["error"],
+        }
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+轻量 Prometheus 文本格式指标（无第三方依赖）
+
+默认关闭：未启用时各记录方法在首行直接返回，执行路径上几乎没有额外开销。
+导出服务以 --metrics 启动后通过 GET /metrics 暴露。
+"""
+import math
+import threading
+from typing import Dict, Iterable, Tuple
+
+# 秒级延迟分桶
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# 字节大小分桶：1KB ~ 1GB
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(11))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _format_labels(self, key: Tuple, extra: Dict[str, str] = None) -> str:
+        pairs = list(zip(self.label_names, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield from self._render_value(key, value)
+
+    def _render_value(self, key, value):
+        yield f"{self.name}{self._format_labels(key)} {_format_number(value)}"
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, registry, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各分桶计数..., +Inf 计数, 总和]
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def _render_value(self, key, state):
+        cumulative = 0
+        for bound, count in zip(self.buckets, state):
+            cumulative += count
+            yield f"{self.name}_bucket{self._format_labels(key, {'le': _format_number(bound)})} {cumulative}"
+        cumulative += state[len(self.buckets)]
+        yield f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {cumulative}"
+        yield f"{self.name}_count{self._format_labels(key)} {cumulative}"
+        yield f"{self.name}_sum{self._format_labels(key)} {_format_number(state[-1])}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self._metrics = []
+
+    def counter(self, name, documentation, label_names=()) -> Counter:
+        return self._register(Counter(self, name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+# ==================== 服务指标 ====================
+REQUESTS_TOTAL = REGISTRY.counter(
+    "canvas_requests_total", "HTTP 请求数", ("method", "endpoint", "status"))
+REQUEST_DURATION = REGISTRY.histogram(
+    "canvas_request_duration_seconds", "HTTP 请求耗时", ("method", "endpoint"))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "canvas_requests_in_flight", "正在处理的 HTTP 请求数", ("endpoint",))
+PAYLOAD_BYTES = REGISTRY.histogram(
+    "canvas_payload_bytes", "请求 / 响应体大小", ("endpoint", "direction"), buckets=SIZE_BUCKETS)
+
+# ==================== 执行指标 ====================
+WORKFLOW_DURATION = REGISTRY.histogram(
+    "canvas_workflow_duration_seconds", "单次工作流执行耗时", ("status",))
+NODE_DURATION = REGISTRY.histogram(
+    "canvas_node_duration_seconds",
+    "节点耗时；phase=total 为节点整体，spawn / execute / serialize 为子进程启动、组件执行与参数结果序列化",
+    ("component", "phase"))
+POOL_BUSY = REGISTRY.gauge(
+    "canvas_pool_busy_workers", "线程池 / 任务队列中忙碌的工作线程数", ("pool",))
+POOL_SIZE = REGISTRY.gauge(
+    "canvas_pool_max_workers", "线程池 / 任务队列的工作线程上限", ("pool",))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "canvas_job_queue_depth", "异步任务排队数")
+
+# ==================== 缓存指标 ====================
+CACHE_HITS = REGISTRY.gauge("canvas_cache_hits", "结果缓存命中次数")
+CACHE_MISSES = REGISTRY.gauge("canvas_cache_misses", "结果缓存未命中次数")
+CACHE_HIT_RATIO = REGISTRY.gauge("canvas_cache_hit_ratio", "结果缓存命中率")
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+DEFAULT_CACHE_SETTINGS = {
+    "enabled": False,
+    "ttl": 300,  # 秒
+    "max_memory_mb": 256,
+    "max_disk_mb": 0,  # 0 表示不落盘
+    # 相同输入的并发请求只执行一次；对非确定性工作流（如大模型调用）会改变结果，需在导出时显式开启
+    "coalesce": False,
+}
+
+
+class UncacheableInput(TypeError):
+    """输入中含有无法按内容稳定哈希的对象，该请求不参与缓存与合并"""
+
+
+def _content_digest(value) -> Dict[str, str]:
+    """json.dumps 的 default：DataFrame / ndarray / bytes 按内容哈希，其余对象的 repr 可能截断或依赖对象标识，拒绝哈希"""
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes_sha256__": hashlib.sha256(value).hexdigest()}
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        try:
+            row_hashes = pd.util.hash_pandas_object(value, index=True).values.tobytes()
+        except (TypeError, ValueError):
+            row_hashes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if isinstance(value, pd.DataFrame):
+            columns, dtypes = list(value.columns), [str(t) for t in value.dtypes]
+        else:
+            columns, dtypes = [value.name], [str(value.dtype)]
+        header = repr((type(value).__name__, columns, dtypes, value.shape)).encode("utf-8")
+        return {"__frame_sha256__": hashlib.sha256(header + row_hashes).hexdigest()}
+    if np is not None and isinstance(value, np.ndarray):
+        if value.dtype == object:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            data = np.ascontiguousarray(value).tobytes()
+        header = repr((str(value.dtype), value.shape)).encode("utf-8")
+        return {"__ndarray_sha256__": hashlib.sha256(header + data).hexdigest()}
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    raise UncacheableInput(f"无法按内容哈希的输入类型: {type(value).__name__}")
+
+
+def canonical_hash(external_inputs: Dict[str, Any], file_hashes: Optional[Dict[str, str]] = None) -> str:
+    """
+    计算外部输入的规范化哈希
+
+    文件类输入的临时路径每次请求都不同，使用其内容哈希代替路径参与计算。
+    含有无法按内容哈希的对象时抛出 UncacheableInput。
+    """
+    file_hashes = file_hashes or {}
+    normalized = {
+        key: {"__file_sha256__": file_hashes[key]} if key in file_hashes else value
+        for key, value in external_inputs.items()
+    }
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=_content_digest)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """带 TTL 的两级 LRU 结果缓存：内存优先，超出内存预算的条目可淘汰到磁盘"""
+
+    def __init__(self, ttl: float = 300, max_memory_mb: float = 256, max_disk_mb: float = 0,
+                 disk_dir: Optional[Path] = None):
+        self.ttl = ttl
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.disk_dir = Path(disk_dir) if disk_dir and self.max_disk_bytes > 0 else None
+        # key -> (expire_at, size, payload)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (expire_at, size)
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            # 进程重启后旧的磁盘条目无法确认过期时间，直接清理
+            for stale in self.disk_dir.glob("*.pkl"):
+                stale.unlink(missing_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any], disk_dir: Path) -> Optional["ResultCache"]:
+        settings = {**DEFAULT_CACHE_SETTINGS, **(settings or {})}
+        if not settings["enabled"]:
+            return None
+        return cls(
+            ttl=settings["ttl"],
+            max_memory_mb=settings["max_memory_mb"],
+            max_disk_mb=settings["max_disk_mb"],
+            disk_dir=disk_dir
+        )
+
+    def get(self, key: str):
+        """返回 (命中, 结果)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expire_at, _, payload = entry
+                if expire_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return True, pickle.loads(payload)
+                self._drop_memory(key)
+
+            disk_entry = self._disk.get(key)
+            if disk_entry is not None:
+                expire_at, _ = disk_entry
+                if expire_at > now:
+                    try:
+                        payload = self._disk_path(key).read_bytes()
+                        self._disk.move_to_end(key)
+                        self.hits += 1
+                        return True, pickle.loads(payload)
+                    except Exception as e:
+                        logger.warning(f"读取磁盘缓存失败: {e}")
+                self._drop_disk(key)
+
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any):
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"结果不可序列化，跳过缓存: {e}")
+            return
+        size = len(payload)
+        expire_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._drop_memory(key)
+            self._drop_disk(key)
+            if size > self.max_memory_bytes:
+                self._put_disk(key, expire_at, payload)
+                return
+            self._memory[key] = (expire_at, size, payload)
+            self._memory_bytes += size
+            # LRU 淘汰：内存超预算时把最久未用的条目挪到磁盘（若启用）
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                old_key, (old_expire, _, old_payload) = next(iter(self._memory.items()))
+                self._drop_memory(old_key)
+                if old_expire > time.monotonic():
+                    self._put_disk(old_key, old_expire, old_payload)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _put_disk(self, key, expire_at, payload):
+        if not self.disk_dir or len(payload) > self.max_disk_bytes:
+            return
+        try:
+            tmp_path = self._disk_path(key).with_suffix(".tmp")
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, self._disk_path(key))
+        except Exception as e:
+            logger.warning(f"写入磁盘缓存失败: {e}")
+            return
+        self._disk[key] = (expire_at, len(payload))
+        self._disk_bytes += len(payload)
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            self._drop_disk(next(iter(self._disk)))
+
+    def _drop_memory(self, key):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    def _drop_disk(self, key):
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+            self._disk_path(key).unlink(missing_ok=True)
+
+
+class SingleFlight:
+    """请求合并：相同 key 的并发调用只执行一次，其余调用等待同一结果"""
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, func: Callable[[], Any]):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import hashlib
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from loguru import logger
+
+# 每次从上传流读取的块大小
+CHUNK_SIZE = 1024 * 1024
+
+
+class SpoolQuotaExceeded(Exception):
+    """上传文件落盘总量超出磁盘配额"""
+
+
+class UploadSpool:
+    """
+    上传文件暂存区：按块流式写入请求级目录，不在内存中缓冲整个文件
+
+    - 每个请求 / 任务一个独立目录，执行结束后调用 release 整体删除
+    - 所有目录共享 quota_mb 磁盘配额，写入途中超额立即中止并删除半成品文件
+    - 可在写入时顺带计算 sha256，供结果缓存使用
+    """
+
+    def __init__(self, root: Path, quota_mb: float = 2048):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.quota_bytes = int(quota_mb * 1024 * 1024)
+        self._used_bytes = 0
+        self._dir_bytes = {}
+        self._lock = threading.Lock()
+
+    def create_dir(self) -> Path:
+        spool_dir = self.root / uuid.uuid4().hex
+        spool_dir.mkdir()
+        with self._lock:
+            self._dir_bytes[spool_dir] = 0
+        return spool_dir
+
+    async def save(self, upload, spool_dir: Path, compute_hash: bool = True) -> Tuple[str, Optional[str]]:
+        """
+        将 UploadFile 分块写入 spool_dir，返回 (文件路径, sha256 或 None)
+
+        打开、写入与哈希计算都在线程池中执行，慢速磁盘上的大文件不会阻塞事件循环
+        """
+        suffix = Path(upload.filename).suffix if upload.filename else ""
+        target = spool_dir / f"{uuid.uuid4().hex}{suffix}"
+        digest = hashlib.sha256() if compute_hash else None
+        written = 0
+        loop = asyncio.get_running_loop()
+        try:
+            f = await loop.run_in_executor(None, open, target, "wb")
+            try:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self._reserve(spool_dir, len(chunk))
+                    written += len(chunk)
+                    await loop.run_in_executor(None, self._write_chunk, f, chunk, digest)
+            finally:
+                await loop.run_in_executor(None, f.close)
+        except BaseException:
+            target.unlink(missing_ok=True)
+            self._reserve(spool_dir, -written)
+            raise
+        return str(target), digest.hexdigest() if digest is not None else None
+
+    @staticmethod
+    def _write_chunk(f, chunk: bytes, digest=None):
+        f.write(chunk)
+        if digest is not None:
+            digest.update(chunk)
+
+    def release(self, spool_dir: Optional[Path]):
+        """删除请求目录并归还配额"""
+        if spool_dir is None:
+            return
+        spool_dir = Path(spool_dir)
+        with self._lock:
+            freed = self._dir_bytes.pop(spool_dir, 0)
+            self._used_bytes -= freed
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    def purge_stale(self, keep: Iterable[str] = ()):
+        """启动时清理上次进程遗留的目录，keep 中的目录（如排队任务引用的）保留并计入配额"""
+        keep = {Path(p) for p in keep if p}
+        removed = 0
+        for spool_dir in self.root.iterdir():
+            if not spool_dir.is_dir():
+                continue
+            if spool_dir in keep:
+                size = sum(p.stat().st_size for p in spool_dir.iterdir() if p.is_file())
+                with self._lock:
+                    self._dir_bytes[spool_dir] = size
+                    self._used_bytes += size
+                continue
+            shutil.rmtree(spool_dir, ignore_errors=True)
+            removed += 1
+        if removed:
+            logger.info(f"清理遗留上传目录 {removed} 个")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "quota_bytes": self.quota_bytes,
+                "used_bytes": self._used_bytes,
+                "active_dirs": len(self._dir_bytes),
+            }
+
+    def _reserve(self, spool_dir: Path, size: int):
+        with self._lock:
+            if size > 0 and self._used_bytes + size > self.quota_bytes:
+                raise SpoolQuotaExceeded(
+                    f"上传文件超出磁盘配额（{self.quota_bytes // (1024 * 1024)} MB）"
+                )
+            self._used_bytes += size
+            self._dir_bytes[spool_dir] = self._dir_bytes.get(spool_dir, 0) + size
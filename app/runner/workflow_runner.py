@@ -1,5 +1,6 @@
 import json
 import sys
+import time
 import warnings
 import loguru
 
@@ -14,12 +15,15 @@ import copy
 sys.path.append(str(Path(__file__).parent.parent))
 
 from scan_components import scan_components
-from runner.component_executor import run_component_in_subprocess
+from runner.component_executor import run_component, ISOLATION_AUTO, ExecutionCancelled
+from runner.graph_index import GraphIndex
+from runner.bundle import load_bundle, load_component_class
+from runner.metrics import NODE_DURATION
 from components.base import GlobalVariableContext
 from runner.expression_engine import ExpressionEngine
 
 
-def build_execution_graph(nodes, graph_data):
+def build_execution_graph(nodes, graph_index):
     # 找出所有循环节点
     loop_nodes = {nid for nid, n in nodes.items() if n.get("is_loop_node") or n.get("is_iterate_node")}
 
@@ -35,12 +39,11 @@ def build_execution_graph(nodes, graph_data):
     graph = defaultdict(list)
     in_degree = {nid: 0 for nid in executable_nodes}
 
-    for conn in graph_data["connections"]:
-        out_node_id = conn["out"][0]
-        in_node_id = conn["in"][0]
-        if out_node_id in executable_nodes and in_node_id in executable_nodes:
-            graph[out_node_id].append(in_node_id)
-            in_degree[in_node_id] += 1
+    for out_node_id in executable_nodes:
+        for in_node_id, _, _ in graph_index.outputs_of(out_node_id):
+            if in_node_id in executable_nodes:
+                graph[out_node_id].append(in_node_id)
+                in_degree[in_node_id] += 1
 
     queue = deque([nid for nid in executable_nodes if in_degree[nid] == 0])
     order = []
@@ -55,16 +58,16 @@ def build_execution_graph(nodes, graph_data):
     return order, loop_nodes, internal_nodes
 
 
-def build_internal_graph(internal_nodes, graph_data):
+def build_internal_graph(internal_nodes, graph_index):
     """构建循环体内部的拓扑排序"""
     graph = defaultdict(list)
     in_degree = {nid: 0 for nid in internal_nodes}
 
-    for conn in graph_data["connections"]:
-        out_id, in_id = conn["out"][0], conn["in"][0]
-        if out_id in internal_nodes and in_id in internal_nodes:
-            graph[out_id].append(in_id)
-            in_degree[in_id] += 1
+    for out_id in internal_nodes:
+        for in_id, _, _ in graph_index.outputs_of(out_id):
+            if in_id in internal_nodes:
+                graph[out_id].append(in_id)
+                in_degree[in_id] += 1
 
     # Kahn 算法
     queue = deque([nid for nid in internal_nodes if in_degree[nid] == 0])
@@ -82,24 +85,33 @@ def build_internal_graph(internal_nodes, graph_data):
     return order
 
 
-def build_node_inputs(node, graph_data, internal_outputs):
+def build_node_inputs(node, graph_index, internal_outputs):
     """构建节点输入"""
     inputs = {}
     inputs.update(node.get("input_values", {}))
 
-    for conn in graph_data["connections"]:
-        if conn["in"][0] == node["node_id"]:
-            out_nid, out_port = conn["out"]
-            in_port = conn["in"][1]
-            val = None
-            if out_nid in internal_outputs:
-                val = internal_outputs[out_nid].get(out_port)
-            if val is not None:
-                inputs[in_port] = val
+    for out_nid, out_port, in_port in graph_index.inputs_of(node["node_id"]):
+        val = None
+        if out_nid in internal_outputs:
+            val = internal_outputs[out_nid].get(out_port)
+        if val is not None:
+            inputs[in_port] = val
     return inputs
 
 
-def execute_loop_node(loop_node, all_nodes, graph_data, input_data, runtime_data, type="loop"):
+def collect_proxy_outputs(output_proxy_id, graph_index, internal_outputs):
+    """收集连接到输出代理节点的内部输出"""
+    values = []
+    for out_nid, out_port, _ in graph_index.inputs_of(output_proxy_id):
+        if out_nid in internal_outputs:
+            val = internal_outputs[out_nid].get(out_port)
+            if val is not None:
+                values.append(val)
+    return values[0] if len(values) == 1 else values
+
+
+def execute_loop_node(loop_node, all_nodes, graph_index, input_data, runtime_data, type="loop",
+                      isolation=ISOLATION_AUTO, cancel_event=None):
     # 修复点：仅当 input_data 为空时，才使用预制参数
     if not input_data:
         input_data = loop_node["input_values"].get("inputs", [])
@@ -128,7 +140,7 @@ def execute_loop_node(loop_node, all_nodes, graph_data, input_data, runtime_data
         raise ValueError("循环体缺少输入/输出代理节点")
 
     # 4. 构建内部拓扑图
-    internal_order = build_internal_graph(execute_nodes, graph_data)
+    internal_order = build_internal_graph(execute_nodes, graph_index)
 
     # 5. 循环执行
     if type == "loop":
@@ -140,26 +152,21 @@ def execute_loop_node(loop_node, all_nodes, graph_data, input_data, runtime_data
 
             # 执行内部节点
             for nid in internal_order:
+                _check_cancelled(cancel_event)
                 n = execute_nodes[nid]
-                node_inputs = build_node_inputs(n, graph_data, internal_outputs)
-                output = run_component_in_subprocess(
+                node_inputs = build_node_inputs(n, graph_index, internal_outputs)
+                output = run_component(
                     comp_class=n["class"],
                     file_path=n["file_path"],
                     params=n["params"],
                     inputs=node_inputs,
-                    python_executable=runtime_data.get("environment_exe", sys.executable)
+                    python_executable=runtime_data.get("environment_exe", sys.executable),
+                    isolation=isolation,
+                    cancel_event=cancel_event
                 )
                 internal_outputs[nid] = output or {}
 
-            input_port_values = []
-            for conn in graph_data["connections"]:
-                if conn["in"][0] == output_proxy["node_id"]:
-                    out_nid, out_port = conn["out"]
-                    if out_nid in internal_outputs:
-                        val = internal_outputs[out_nid].get(out_port)
-                        if val is not None:
-                            input_port_values.append(val)
-            results.append(input_port_values[0] if len(input_port_values) == 1 else input_port_values)
+            results.append(collect_proxy_outputs(output_proxy["node_id"], graph_index, internal_outputs))
     else:
         loop_nums = loop_node["params"].get("loop_nums", 5)
         for i in range(loop_nums):
@@ -169,36 +176,36 @@ def execute_loop_node(loop_node, all_nodes, graph_data, input_data, runtime_data
 
             # 构建内部拓扑图
             # 优化：缓存内部拓扑图，避免重复计算
-            # internal_order = build_internal_graph(execute_nodes, graph_data)  # 这里注释掉，因为已经在外面计算了
+            # internal_order = build_internal_graph(execute_nodes, graph_index)  # 这里注释掉，因为已经在外面计算了
 
             # 执行内部节点
             for nid in internal_order:
+                _check_cancelled(cancel_event)
                 n = execute_nodes[nid]
-                node_inputs = build_node_inputs(n, graph_data, internal_outputs)
-                output = run_component_in_subprocess(
+                node_inputs = build_node_inputs(n, graph_index, internal_outputs)
+                output = run_component(
                     comp_class=n["class"],
                     file_path=n["file_path"],
                     params=n["params"],
                     inputs=node_inputs,
-                    python_executable=runtime_data.get("environment_exe", sys.executable)
+                    python_executable=runtime_data.get("environment_exe", sys.executable),
+                    isolation=isolation,
+                    cancel_event=cancel_event
                 )
                 internal_outputs[nid] = output or {}
 
-            input_port_values = []
-            for conn in graph_data["connections"]:
-                if conn["in"][0] == output_proxy["node_id"]:
-                    out_nid, out_port = conn["out"]
-                    if out_nid in internal_outputs:
-                        val = internal_outputs[out_nid].get(out_port)
-                        if val is not None:
-                            input_port_values.append(val)
-            input_data = input_port_values[0] if len(input_port_values) == 1 else input_port_values
+            input_data = collect_proxy_outputs(output_proxy["node_id"], graph_index, internal_outputs)
 
         results = input_data
 
     return {"outputs": results}
 
 
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ExecutionCancelled("工作流执行已取消")
+
+
 def execute_branch_node(branch_node, input_data, expr_engine):
     # 2. 准备局部变量
     local_vars = {"input": input_data[0] if isinstance(input_data, (list, tuple)) and input_data else input_data}
@@ -237,28 +244,12 @@ def execute_branch_node(branch_node, input_data, expr_engine):
     return selected_port, output_dict  # 例如: {"branch_true": 42} 或 {"else": [1,2,3]}
 
 
-def get_downstream_nodes(start_node_id, connections, all_node_ids, downstream_cache=None):
+def get_downstream_nodes(start_node_id, graph_index, all_node_ids, downstream_cache=None):
     """获取从指定节点开始的所有下游节点（包括间接连接的）"""
     if downstream_cache is not None and start_node_id in downstream_cache:
         return downstream_cache[start_node_id]
 
-    downstream = set()
-    visited = set()
-    queue = deque([start_node_id])
-
-    while queue:
-        current = queue.popleft()
-        if current in visited:
-            continue
-        visited.add(current)
-
-        # 找到所有从此节点输出的连接
-        for conn in connections:
-            if conn["out"][0] == current and conn["in"][0] in all_node_ids:
-                target_node = conn["in"][0]
-                if target_node not in visited:
-                    downstream.add(target_node)
-                    queue.append(target_node)
+    downstream = graph_index.downstream(start_node_id, all_node_ids)
 
     # 缓存结果
     if downstream_cache is not None:
@@ -291,23 +282,91 @@ def evaludate_model_inputs(engine, inputs, params):
     return inputs, params
 
 
+# 已解析的工作流（执行包或 JSON + 组件扫描结果），按文件签名缓存，同一进程内的后续请求无需重新解析
+_workflow_cache = {}
+_workflow_cache_lock = Lock()
+
+
+def _file_signature(path: Path):
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_workflow(workflow_path: Path, logger=loguru.logger):
+    """
+    加载工作流定义：优先使用导出时生成的执行包（bundle/plan.pkl，仅导入所用组件），
+    否则解析 model.workflow.json 并扫描 components 目录
+
+    :return: (graph_data, runtime_data, project_spec, component_map, file_map)，调用方不得原地修改
+    """
+    workflow_path = Path(workflow_path)
+    project_dir = workflow_path.parent.absolute()
+    spec_path = project_dir / "project_spec.json"
+    cache_key = (str(workflow_path.absolute()), _file_signature(workflow_path), _file_signature(spec_path))
+    with _workflow_cache_lock:
+        cached = _workflow_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        project_spec = {}
+        if spec_path.exists():
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                project_spec = json.load(f)
+
+        plan = load_bundle(project_dir, logger=logger)
+        if plan is not None:
+            graph_data, runtime_data = plan["graph"], plan["runtime"]
+            component_map, file_map = {}, {}
+            for full_path, meta in plan["components"].items():
+                try:
+                    component_map[full_path] = load_component_class(project_dir, meta)
+                    file_map[full_path] = (project_dir / meta["file"]).resolve()
+                except Exception as e:
+                    logger.error(f"组件加载失败 {full_path}: {e}")
+        else:
+            with open(workflow_path, 'r', encoding='utf-8') as f:
+                full_data = json.load(f)
+            graph_data = full_data["graph"]
+            runtime_data = full_data.get("runtime", {})
+            component_map, file_map = scan_components(components_dir=project_dir / "components", logger=logger)
+
+        loaded = (graph_data, runtime_data, project_spec, component_map, file_map)
+        # 只保留每个工作流的最新版本
+        for key in [k for k in _workflow_cache if k[0] == cache_key[0]]:
+            del _workflow_cache[key]
+        _workflow_cache[cache_key] = loaded
+        return loaded
+
+
 def execute_workflow(file_path, external_inputs=None, python_executable=None, **kwargs):
     """
     执行工作流（支持 project_spec.json 定义的接口）
 
     :param file_path: model.workflow.json 路径
     :param external_inputs: {"input_0": "hello", "input_1": 5}
+    :param isolation: 组件执行隔离策略（kwargs），auto / subprocess / inprocess
+    :param on_event: 执行进度回调（kwargs），接收 node_started / node_partial / node_finished / node_skipped 事件
+    :param cancel_event: threading.Event（kwargs），置位后在节点间中止执行并终止正在运行的组件子进程
     :return: {"output_0": ..., "output_1": ...}
     """
     global logger
     logger = kwargs.get("logger", loguru.logger)
+    isolation = kwargs.get("isolation", ISOLATION_AUTO)
+    on_event = kwargs.get("on_event")
+    cancel_event = kwargs.get("cancel_event")
+
+    def emit(event):
+        if on_event is not None:
+            try:
+                on_event(event)
+            except Exception as e:
+                logger.warning(f"进度回调失败: {e}")
+
     workflow_path = Path(file_path)
-    project_dir = workflow_path.parent.absolute()
-    # 1. 加载工作流
-    with open(workflow_path, 'r', encoding='utf-8') as f:
-        full_data = json.load(f)
-    graph_data = full_data["graph"]
-    runtime_data = full_data.get("runtime", {})
+    # 1. 加载工作流（执行包 / JSON、project_spec 与组件，进程内缓存）
+    graph_data, runtime_data, project_spec, component_map, file_map = load_workflow(workflow_path, logger=logger)
     global_variable = runtime_data.get("global_variable", {})
     # 1. 反序列化全局变量
     global_ctx = GlobalVariableContext()
@@ -315,15 +374,6 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
     # print(global_variable)  # 移除调试打印
     expr_engine = ExpressionEngine(global_vars_context=global_ctx)
 
-    # 2. 加载 project_spec（如果有）
-    spec_path = project_dir / "project_spec.json"
-    project_spec = {}
-    if spec_path.exists():
-        with open(spec_path, 'r', encoding='utf-8') as f:
-            project_spec = json.load(f)
-
-    # 3. 扫描组件
-    component_map, file_map = scan_components(components_dir=project_dir / "components", logger=logger)
     # 4. 构建节点执行数据（使用原始 node.id）
     nodes = {}  # key: node.id
     node_outputs = {}
@@ -343,9 +393,9 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
         is_loop_node = (node_data.get("type_") == "control_flow.ControlFlowLoopNode")
         is_iterate_node = (node_data.get("type_") == "control_flow.ControlFlowIterateNode")
         is_branch_node = (node_data.get("type_") == "control_flow.ControlFlowBranchNode")
-        # 直接使用 workflow 中的 params 和 input_values
-        params = node_data["custom"].get("params", {})
-        input_values = node_data["custom"].get("input_values", {})
+        # 浅拷贝 workflow 中的 params 和 input_values：定义被缓存复用，外部输入覆盖不能写回共享数据
+        params = dict(node_data["custom"].get("params", {}))
+        input_values = dict(node_data["custom"].get("input_values", {}))
 
         nodes[node_id] = {
             "node_id": node_id,
@@ -375,8 +425,15 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
                     else:  # 组件输入
                         nodes[node_id]["input_values"][cfg["port_name"]] = value
 
-    # 6. 构建执行顺序
-    execution_order, loop_nodes, internal_nodes = build_execution_graph(nodes, graph_data)
+    # project_spec 中标记为 streamable 的中间输出：node_id -> [(key, output_name)]
+    stream_targets = defaultdict(list)
+    for stream_key, stream_cfg in project_spec.get("streamable", {}).items():
+        stream_targets[stream_cfg["node_id"]].append((stream_key, stream_cfg["output_name"]))
+
+    # 6. 构建连接索引与执行顺序
+    graph_index = GraphIndex(graph_data["connections"])
+    all_node_ids = set(nodes.keys())
+    execution_order, loop_nodes, internal_nodes = build_execution_graph(nodes, graph_index)
     outputs_lock = Lock()
 
     # 7. 执行节点 - 跟踪已激活的分支
@@ -392,6 +449,7 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
         # 检查当前节点是否应该被跳过
         if node_id in skip_nodes:
             logger.info(f"跳过节点: {node['name']} (因为连接到未激活的分支)")
+            emit({"event": "node_skipped", "node_id": node_id, "name": node["name"]})
             continue
 
         # 构建输入字典（支持多输入端口聚合）
@@ -412,39 +470,39 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
         input_port_values = defaultdict(list)
         upstream_branch_nodes = []  # 记录上游分支节点信息，用于优化判断
 
-        for conn in graph_data["connections"]:
-            if conn["in"][0] == node_id:
-                out_nid, out_port = conn["out"]
-                in_port = conn["in"][1]
-
-                # 检查上游节点是否是分支节点且当前端口未被激活
-                if out_nid in active_branch_outputs:
-                    # 这个上游节点是分支节点，检查其输出端口是否被激活
-                    active_port = active_branch_outputs[out_nid]
-                    if out_port != active_port:
-                        # 该端口未被激活，跳过当前节点
-                        logger.info(f"节点 {node['name']} 连接到未激活的分支端口 {out_port}，跳过执行")
-                        # 获取所有从这个连接的目标节点开始的下游节点，并加入跳过列表
-                        downstream_nodes = get_downstream_nodes(
-                            node_id, graph_data["connections"], set(nodes.keys()), downstream_cache)
-                        skip_nodes.update(downstream_nodes)
-                        skip_nodes.add(node_id)
-                        upstream_branch_nodes = []  # 清空，因为已经决定跳过
-                        break  # 跳出连接循环，跳过整个节点
-                    else:
-                        # 这个分支端口是激活的，记录用于后续处理
-                        upstream_branch_nodes.append((out_nid, out_port))
-
-                with outputs_lock:
-                    if out_nid in node_outputs:
-                        val = node_outputs[out_nid].get(out_port)
-                        if val is not None:
-                            input_port_values[in_port].append(val)
+        for out_nid, out_port, in_port in graph_index.inputs_of(node_id):
+            # 检查上游节点是否是分支节点且当前端口未被激活
+            if out_nid in active_branch_outputs:
+                # 这个上游节点是分支节点，检查其输出端口是否被激活
+                active_port = active_branch_outputs[out_nid]
+                if out_port != active_port:
+                    # 该端口未被激活，跳过当前节点
+                    logger.info(f"节点 {node['name']} 连接到未激活的分支端口 {out_port}，跳过执行")
+                    # 获取所有从这个连接的目标节点开始的下游节点，并加入跳过列表
+                    downstream_nodes = get_downstream_nodes(node_id, graph_index, all_node_ids, downstream_cache)
+                    skip_nodes.update(downstream_nodes)
+                    skip_nodes.add(node_id)
+                    upstream_branch_nodes = []  # 清空，因为已经决定跳过
+                    break  # 跳出连接循环，跳过整个节点
+                else:
+                    # 这个分支端口是激活的，记录用于后续处理
+                    upstream_branch_nodes.append((out_nid, out_port))
+
+            with outputs_lock:
+                if out_nid in node_outputs:
+                    val = node_outputs[out_nid].get(out_port)
+                    if val is not None:
+                        input_port_values[in_port].append(val)
 
         # 如果当前节点被标记为跳过，继续下一个节点
         if node_id in skip_nodes:
+            emit({"event": "node_skipped", "node_id": node_id, "name": node["name"]})
             continue
 
+        _check_cancelled(cancel_event)
+        emit({"event": "node_started", "node_id": node_id, "name": node["name"]})
+        node_start = time.perf_counter()
+
         # 合并：如果一个端口有多个输入，用列表；否则用单个值
         for port, vals in input_port_values.items():
             if len(vals) == 1:
@@ -455,11 +513,13 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
         if node["is_loop_node"]:
             # ✅ 执行循环节点
             output = execute_loop_node(
-                node, nodes, graph_data, [item for item in node_inputs.values()][0], runtime_data, type="loop")
+                node, nodes, graph_index, [item for item in node_inputs.values()][0], runtime_data, type="loop",
+                isolation=isolation, cancel_event=cancel_event)
             node_outputs[node_id] = output
         elif node["is_iterate_node"]:
             output = execute_loop_node(
-                node, nodes, graph_data, [item for item in node_inputs.values()][0], runtime_data, type="iterate")
+                node, nodes, graph_index, [item for item in node_inputs.values()][0], runtime_data, type="iterate",
+                isolation=isolation, cancel_event=cancel_event)
             node_outputs[node_id] = output
         elif node["is_branch_node"]:
             # 提取输入值（假设只有一个输入端口）
@@ -477,8 +537,7 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
                 logger.info(f"分支节点 {node['name']} 没有激活任何端口")
 
                 # 没有激活任何端口，跳过所有下游节点
-                downstream_nodes = get_downstream_nodes(
-                    node_id, graph_data["connections"], set(nodes.keys()), downstream_cache)
+                downstream_nodes = get_downstream_nodes(node_id, graph_index, all_node_ids, downstream_cache)
                 skip_nodes.update(downstream_nodes)
         else:
             node_inputs, node_params = evaludate_model_inputs(expr_engine, node_inputs, node["params"])
@@ -486,20 +545,44 @@ def execute_workflow(file_path, external_inputs=None, python_executable=None, **
             try:
                 logger.info(f"执行节点: {node['name']}")
                 logger.info(f"输入: {node_inputs}")
-                output = run_component_in_subprocess(
+                output = run_component(
                     comp_class=node["class"],
                     file_path=node["file_path"],
                     params=node["params"],
                     inputs=node_inputs,
                     global_variable=global_variable,
                     python_executable=python_executable or runtime_data.get("environment_exe"),
-                    logger=logger
+                    isolation=isolation,
+                    logger=logger,
+                    cancel_event=cancel_event,
+                    partial_callback=(
+                        lambda output_name, chunk, nid=node_id, name=node["name"]: emit({
+                            "event": "node_partial", "node_id": nid, "name": name,
+                            "output": output_name, "chunk": chunk
+                        })
+                    ) if on_event is not None else None
                 )
                 node_outputs[node_id] = output or {}
+            except ExecutionCancelled:
+                logger.warning(f"节点执行已取消: {node['name']}")
+                raise
             except Exception as e:
                 logger.error(f"节点执行失败 {node['name']}: {e}")
                 raise e
 
+        node_elapsed = time.perf_counter() - node_start
+        NODE_DURATION.observe(node_elapsed, component=getattr(node["class"], "name", node["name"]), phase="total")
+        emit({
+            "event": "node_finished",
+            "node_id": node_id,
+            "name": node["name"],
+            "elapsed": round(node_elapsed, 4),
+            "outputs": {
+                stream_key: node_outputs.get(node_id, {}).get(output_name)
+                for stream_key, output_name in stream_targets.get(node_id, [])
+            }
+        })
+
     # 8. ✅ 按 project_spec 提取最终输出
     final_outputs = {}
     if "outputs" in project_spec:
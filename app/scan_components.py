@@ -1,12 +1,14 @@
-import importlib.util
-import inspect
+import hashlib
 import os
 import sys
+import threading
 from pathlib import Path
 from typing import Tuple, Dict, Type
 
 from loguru import logger
 
+from app.runner.component_registry import ComponentRegistry, MetadataCache
+
 
 def resource_path(relative_path):
     """获取打包后资源文件的绝对路径"""
@@ -20,12 +22,46 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+# 组件元数据磁盘缓存
+METADATA_CACHE_PATH = resource_path(".cache/component_metadata.json")
+
+# 进程级注册表：{组件目录: ComponentRegistry}，所有画布共享
+_registries: Dict[Path, ComponentRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_component_registry(comp_path: Path) -> ComponentRegistry:
+    """获取组件目录对应的进程级注册表，首次调用时加载磁盘元数据缓存"""
+    with _registries_lock:
+        registry = _registries.get(comp_path)
+        if registry is None:
+            from app.components import base
+
+            cache_path = Path(METADATA_CACHE_PATH)
+            if comp_path != Path(resource_path("app/components")).resolve():
+                cache_path = cache_path.with_name(f"component_metadata_{hashlib.md5(str(comp_path).encode()).hexdigest()[:12]}.json")
+            registry = _registries[comp_path] = ComponentRegistry(
+                comp_path,
+                metadata_cache=MetadataCache(cache_path, dependencies=[comp_path / "base.py"]),
+                enum_types={
+                    enum_type.__name__: enum_type
+                    for enum_type in (base.ArgumentType, base.ConnectionType, base.PropertyType)
+                },
+                skip_empty_name=True,
+            )
+        return registry
+
+
 def scan_components(components_dir: str = resource_path("app/components"), logger=logger) -> Tuple[Dict[str, Type], Dict[str, Path]]:
     """
     扫描指定目录下的所有 .py 文件，动态加载其中满足条件的组件类。
 
     支持任意文件系统路径（绝对或相对），无需该目录是 Python 包或在 sys.path 中。
 
+    组件类的 name / category 为字面量时只解析 AST，返回惰性代理（LazyComponent），
+    首次实例化或访问其他属性时才导入模块；否则立即导入该文件。
+    扫描结果由进程级注册表缓存，元数据与端口定义持久化在磁盘缓存中，只重新解析有变化的文件。
+
     要求：
       - 每个 .py 文件应能独立导入（无未满足的顶层导入错误）
       - 组件类需满足：
@@ -44,38 +80,5 @@ def scan_components(components_dir: str = resource_path("app/components"), logge
     if not comp_path.exists():
         raise ValueError(f"components_dir does not exist: {comp_path}")
 
-    comp_map = {}
-    file_map = {}
-
-    for py_file in comp_path.rglob("*.py"):
-        if py_file.name == "__init__.py" or py_file.name == "base.py":
-            continue
-
-        try:
-            # 动态从文件加载模块
-            module_name = f"dynamic_component_{py_file.stem}_{hash(py_file)}"
-            spec = importlib.util.spec_from_file_location(module_name, py_file)
-            if spec is None or spec.loader is None:
-                logger.warning(f"⚠️ Cannot load spec for {py_file}")
-                continue
-
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            # 遍历模块中的所有类
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                # 排除 BaseComponent 本身，且要求是其子类（更安全）
-                if getattr(obj, 'category', None) is not None:
-                    component_name = getattr(obj, 'name', obj.__name__)
-                    if len(component_name) == 0:
-                        continue
-                    obj._source_file = py_file  # 动态加属性
-                    full_path = f"{getattr(obj, 'category', None)}/{component_name}"
-                    comp_map[full_path] = obj
-                    file_map[full_path] = py_file
-
-        except Exception as e:
-            import traceback
-            logger.error(f"⚠️ Failed to load {py_file}: {e}\n{traceback.format_exc()}")
-
-    return comp_map, file_map
\ No newline at end of file
+    # 元数据经 AST 提取（或读取磁盘缓存），组件模块在首次使用时才导入
+    return get_component_registry(comp_path).scan(logger)
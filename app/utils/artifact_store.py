@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+工作流运行数据的旁路存储
+
+节点的输入 / 输出值不再内联进 .workflow.json，而是写入同名的 <画布名>.artifacts 目录：
+- DataFrame → Parquet（未安装 pyarrow 或列类型不支持时退回 pickle），ndarray → .npy，其他对象 → pickle（协议 5）
+- 文件名为内容的 sha256，工作流 JSON 中只保存 {"__artifact__": 文件名, "type": ..., "shape": ...}
+- 相同内容只存一份；内容未变的文件不会重写，保存完成后删除不再被引用的文件
+字符串、数字等简单值仍内联在 JSON 中。
+
+打开工作流时节点数据按需加载：节点持有 LazyValueDict，只保存引用，
+属性面板查看、下游节点运行或导出读取某个端口时才读取文件，读取结果放在全局 LRU 缓存中，
+每次读取返回缓存值的副本，调用方原地修改不会影响缓存及其他引用相同内容的节点。
+"""
+import copy
+import hashlib
+import importlib.util
+import io
+import os
+import pickle
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+from app.utils.utils import serialize_for_json, deserialize_from_json
+
+ARTIFACT_KEY = "__artifact__"
+_INLINE_TYPES = (str, int, float, bool, type(None))
+
+# 已读取的旁路数据缓存上限（按文件大小估算）
+VALUE_CACHE_BYTES = 512 * 1024 * 1024
+VALUE_CACHE_ENTRIES = 256
+
+_has_pyarrow = None
+
+
+def _parquet_available():
+    global _has_pyarrow
+    if _has_pyarrow is None:
+        _has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+    return _has_pyarrow
+
+
+def artifact_dir_for(workflow_path) -> Path:
+    """与预览图一致，按画布名（去掉 .workflow.json）命名旁路目录"""
+    workflow_path = Path(workflow_path)
+    return workflow_path.parent / f"{workflow_path.stem.split('.')[0]}.artifacts"
+
+
+def copy_artifacts(src_workflow, dest_workflow):
+    src_dir = artifact_dir_for(src_workflow)
+    if src_dir.is_dir():
+        shutil.copytree(src_dir, artifact_dir_for(dest_workflow), dirs_exist_ok=True)
+
+
+def remove_artifacts(workflow_path):
+    shutil.rmtree(artifact_dir_for(workflow_path), ignore_errors=True)
+    with _stores_lock:
+        _stores.pop(str(artifact_dir_for(workflow_path).resolve()), None)
+
+
+class ValueCache:
+    """已读取旁路数据的 LRU 缓存，键为 (旁路目录, 文件名)"""
+
+    def __init__(self, max_bytes: int = VALUE_CACHE_BYTES, max_entries: int = VALUE_CACHE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._items = OrderedDict()  # {键: (值, 大小)}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, value, size: int):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._items[key] = (value, size)
+            self._size += size
+            while len(self._items) > 1 and (self._size > self.max_bytes or len(self._items) > self.max_entries):
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+VALUE_CACHE = ValueCache()
+
+
+def _contains_ref(obj) -> bool:
+    if isinstance(obj, dict):
+        return ARTIFACT_KEY in obj or any(_contains_ref(v) for v in obj.values())
+    if isinstance(obj, list):
+        return any(_contains_ref(v) for v in obj)
+    return False
+
+
+class _Pending:
+    """尚未还原的端口值（保存的 JSON 结构）"""
+    __slots__ = ("raw", "has_ref")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.has_ref = _contains_ref(raw)
+
+    def __repr__(self):
+        return f"<未加载 {self.raw.get('type', '数据') if isinstance(self.raw, dict) else '数据'}>"
+
+
+class LazyValueDict(dict):
+    """
+    按需还原的节点输入 / 输出字典：读取某个端口时才还原对应的值
+    - 引用旁路文件的值每次经 VALUE_CACHE 读取副本，不常驻在节点上，内存由 LRU 上限控制；
+      原地修改读取结果不会写回，需要修改时重新赋值该端口
+    - 旧格式内联在 JSON 中的值首次读取时反序列化并替换占位
+    写入与普通 dict 相同；保存时未读取过的端口直接沿用原引用，不会因保存而加载数据
+    """
+
+    def __init__(self, store: "ArtifactStore", data):
+        super().__init__()
+        self.store = store
+        for key, raw in data.items():
+            # 简单值直接还原，其余延迟
+            dict.__setitem__(self, key, _Pending(raw) if isinstance(raw, (dict, list)) else raw)
+
+    def _resolve(self, key, value):
+        if not isinstance(value, _Pending):
+            return value
+        resolved = self.store.load(value.raw)
+        if not value.has_ref:
+            dict.__setitem__(self, key, resolved)
+        return resolved
+
+    def __getitem__(self, key):
+        return self._resolve(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        # 显式定义 __iter__，使 dict(d) / {**d} 走 keys() + __getitem__，而不是直接复制占位对象
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def pop(self, key, *default):
+        value = dict.pop(self, key, *default)
+        return self._resolve(key, value)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            dict.__setitem__(self, key, default)
+        return self[key]
+
+    def copy(self):
+        return dict(self.items())
+
+    def raw_items(self):
+        """[(键, 已还原的值或 _Pending)]"""
+        return list(dict.items(self))
+
+    def is_loaded(self, key) -> bool:
+        return not isinstance(dict.get(self, key), _Pending)
+
+
+class ArtifactStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        # DataFrame 内容指纹 → 引用字典：内容未变时跳过 Parquet 编码；按内容而非对象标识，原地修改后指纹随之变化
+        self._memo = {}
+        self._referenced = set()
+
+    # ---------------------------- 保存 ----------------------------
+    def dump(self, value):
+        """转换为可写入 JSON 的结构，大对象写入旁路文件并替换为引用"""
+        if isinstance(value, LazyValueDict) and value.store is self:
+            # 未读取过的端口沿用原有引用
+            result = {}
+            for key, item in value.raw_items():
+                if isinstance(item, _Pending):
+                    self._collect_refs(item.raw)
+                    result[key] = item.raw
+                else:
+                    result[key] = self.dump(item)
+            return result
+        if isinstance(value, dict):
+            return {k: self.dump(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.dump(v) for v in value]
+        if isinstance(value, _INLINE_TYPES) or not self._should_externalize(value):
+            return serialize_for_json(value)
+        try:
+            ref = self._write(value)
+        except Exception as e:
+            logger.warning(f"节点数据写入旁路文件失败，改为内联保存: {e}")
+            return serialize_for_json(value)
+        self._referenced.add(ref[ARTIFACT_KEY])
+        return ref
+
+    def _collect_refs(self, raw):
+        if isinstance(raw, dict):
+            if ARTIFACT_KEY in raw:
+                self._referenced.add(raw[ARTIFACT_KEY])
+                return
+            for v in raw.values():
+                self._collect_refs(v)
+        elif isinstance(raw, list):
+            for v in raw:
+                self._collect_refs(v)
+
+    @staticmethod
+    def _should_externalize(value):
+        np = sys.modules.get("numpy")
+        if np is not None and isinstance(value, np.generic):
+            return False
+        # 自带 serialize() 的对象（如枚举）保持原有的内联方式
+        return not callable(getattr(value, "serialize", None))
+
+    @staticmethod
+    def _fingerprint(value):
+        """DataFrame 的廉价内容指纹（逐行哈希），比编码为 Parquet 快得多；无法计算时返回 None"""
+        pd = sys.modules.get("pandas")
+        if pd is None or not isinstance(value, pd.DataFrame):
+            return None
+        try:
+            row_hashes = pd.util.hash_pandas_object(value, index=True).values
+        except (TypeError, ValueError):
+            return None  # 含列表 / 字典等不可哈希单元格
+        header = repr((list(value.columns), [str(t) for t in value.dtypes], value.shape)).encode("utf-8")
+        return hashlib.sha256(header + row_hashes.tobytes()).hexdigest()
+
+    def _write(self, value):
+        fingerprint = self._fingerprint(value)
+        memo = self._memo.get(fingerprint) if fingerprint is not None else None
+        if memo is not None and (self.root / memo[ARTIFACT_KEY]).exists():
+            return memo
+
+        data, ext, meta = self._encode(value)
+        name = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        path = self.root / name
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        ref = {ARTIFACT_KEY: name, **meta}
+        if fingerprint is not None:
+            self._memo[fingerprint] = ref
+        return ref
+
+    @staticmethod
+    def _encode(value):
+        """返回 (字节, 扩展名, 元信息)"""
+        pd = sys.modules.get("pandas")
+        np = sys.modules.get("numpy")
+        if pd is not None and isinstance(value, pd.DataFrame):
+            meta = {"type": "DataFrame", "shape": list(value.shape)}
+            if _parquet_available():
+                try:
+                    buffer = io.BytesIO()
+                    value.to_parquet(buffer)
+                    return buffer.getvalue(), "parquet", meta
+                except Exception:
+                    pass  # 混合类型列 / 非字符串列名等 Parquet 不支持的情况
+            return pickle.dumps(value, protocol=5), "pkl", meta
+        if np is not None and isinstance(value, np.ndarray):
+            meta = {"type": "ndarray", "shape": list(value.shape), "dtype": str(value.dtype)}
+            if value.dtype != object:
+                buffer = io.BytesIO()
+                np.save(buffer, value, allow_pickle=False)
+                return buffer.getvalue(), "npy", meta
+            return pickle.dumps(value, protocol=5), "pkl", meta
+        meta = {"type": type(value).__name__}
+        if hasattr(value, "shape"):
+            try:
+                meta["shape"] = list(value.shape)
+            except TypeError:
+                pass
+        return pickle.dumps(value, protocol=5), "pkl", meta
+
+    def commit(self):
+        """一次保存结束：删除本次保存未引用的旁路文件"""
+        referenced, self._referenced = self._referenced, set()
+        self._memo = {k: ref for k, ref in self._memo.items() if ref[ARTIFACT_KEY] in referenced}
+        if not self.root.is_dir():
+            return
+        for path in self.root.iterdir():
+            if path.is_file() and path.name not in referenced:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    # ---------------------------- 加载 ----------------------------
+    def load(self, obj):
+        """还原 dump() 的结果：旁路引用读取文件，内联值按原有格式反序列化"""
+        if isinstance(obj, dict):
+            if ARTIFACT_KEY in obj:
+                return self.load_ref(obj)
+            if "__type__" in obj:
+                return deserialize_from_json(obj)
+            return {k: self.load(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self.load(v) for v in obj]
+        return obj
+
+    def load_lazy(self, obj) -> LazyValueDict:
+        """节点输入 / 输出字典的按需加载版本"""
+        return LazyValueDict(self, obj if isinstance(obj, dict) else {})
+
+    def load_ref(self, ref):
+        name = ref[ARTIFACT_KEY]
+        path = self.root / name
+        cache_key = (str(self.root), name)
+        value = VALUE_CACHE.get(cache_key)
+        if value is not None:
+            return self._copy(value)
+        try:
+            if name.endswith(".parquet"):
+                import pandas as pd
+
+                value = pd.read_parquet(path)
+            elif name.endswith(".npy"):
+                import numpy as np
+
+                value = np.load(path, allow_pickle=False)
+            else:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"读取节点数据 {path} 失败: {e}")
+            return None
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        VALUE_CACHE.put(cache_key, value, size)
+        return self._copy(value)
+
+    @staticmethod
+    def _copy(value):
+        """缓存值的副本：DataFrame / ndarray 用自身的 copy()，其他对象深拷贝，无法拷贝时返回原对象"""
+        if callable(getattr(value, "copy", None)) and hasattr(value, "shape"):
+            return value.copy()
+        try:
+            return copy.deepcopy(value)
+        except Exception:
+            return value
+
+
+# 同一画布的保存 / 加载共享一个存储对象（复用 DataFrame 内容指纹缓存）
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(workflow_path) -> ArtifactStore:
+    root = artifact_dir_for(workflow_path)
+    key = str(root.resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ArtifactStore(root)
+        return store
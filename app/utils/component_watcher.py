@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+组件目录文件监视器
+
+监视组件目录下的 .py 文件，修改 / 新增 / 删除后只重新解析变化的文件并更新进程级注册表，
+再通过 components_changed 信号通知各画布就地刷新对应的节点类型。
+"""
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from loguru import logger
+
+from app.scan_components import get_component_registry, resource_path
+
+
+class ComponentWatcher(QObject):
+    # {"removed": {full_path: 文件}, "updated": {full_path: (组件类, 文件)}}
+    components_changed = pyqtSignal(dict)
+
+    _instance = None
+
+    # 编辑器保存时可能连续触发多次事件，合并后再处理
+    DEBOUNCE_MS = 150
+
+    @classmethod
+    def get_instance(cls) -> "ComponentWatcher":
+        if cls._instance is None:
+            cls._instance = cls(resource_path("app/components"))
+        return cls._instance
+
+    def __init__(self, components_dir):
+        super().__init__()
+        self.comp_path = Path(components_dir).resolve()
+        self.registry = get_component_registry(self.comp_path)
+        self._pending = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        self._known_files = set()
+        self._watch_tree()
+
+    def notify_file_changed(self, file_path):
+        """保存组件文件后主动通知，不依赖文件系统事件（部分平台 / 网络盘上事件可能丢失）"""
+        self._on_path_changed(str(Path(file_path).resolve()))
+
+    def _watch_tree(self):
+        directories = [str(self.comp_path)] + [str(p) for p in self.comp_path.rglob("*") if p.is_dir()]
+        files = {
+            str(p) for p in self.comp_path.rglob("*.py")
+            if p.name not in ("__init__.py", "base.py") and "__pycache__" not in p.parts
+        }
+        watched = set(self._watcher.directories()) | set(self._watcher.files())
+        new_paths = [p for p in directories + sorted(files) if p not in watched]
+        if new_paths:
+            self._watcher.addPaths(new_paths)
+        self._known_files = files
+
+    def _on_path_changed(self, path):
+        self._pending.add(path)
+        self._timer.start(self.DEBOUNCE_MS)
+
+    def _on_directory_changed(self, directory):
+        # 目录事件只说明有文件新增 / 删除 / 重命名，与已知文件集合比对找出具体文件
+        directory = Path(directory)
+        current = {str(p) for p in directory.glob("*.py") if p.name not in ("__init__.py", "base.py")}
+        known = {p for p in self._known_files if Path(p).parent == directory}
+        self._pending.update(current ^ known)
+        self._timer.start(self.DEBOUNCE_MS)
+
+    def _flush(self):
+        paths, self._pending = self._pending, set()
+        # 编辑器"写临时文件再替换"的保存方式会使文件脱离监视，重新登记
+        self._watch_tree()
+        changes = self.registry.refresh_files(paths, logger)
+        if changes["removed"] or changes["updated"]:
+            logger.info(
+                f"组件热更新: 更新 {len(changes['updated'])} 个，移除 {len(changes['removed'])} 个"
+            )
+            self.components_changed.emit(changes)
@@ -98,6 +98,9 @@ class Settings(QConfig):
     canvas_grid_size = ConfigItem("Canvas", "GridSize", 20, RangeValidator(10, 30))
     canvas_auto_save = ConfigItem("Canvas", "AutoSave", True, BoolValidator())
     canvas_auto_save_interval = ConfigItem("Canvas", "AutoSaveInterval", 60, RangeValidator(60, 120))
+    # 工作流文件：默认紧凑 JSON，可选缩进格式化 / zstd 压缩
+    canvas_pretty_json = ConfigItem("Canvas", "PrettyJson", False, BoolValidator())
+    canvas_compress_workflow = ConfigItem("Canvas", "CompressWorkflow", False, BoolValidator())
     canvas_pipelayout = OptionsConfigItem("Canvas", "PipeLayout", "折线",
                                             OptionsValidator(["直线", "曲线", "折线"]))
     canvas_direction = OptionsConfigItem("Canvas", "Direction", "水平",
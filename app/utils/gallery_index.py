@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+画廊元数据索引：工作流 / 导出项目的名称、时间、大小、节点数与预览图路径持久化在 SQLite（cache/gallery_index.db）
+
+- 打开画廊时直接查询上次的索引，不必等目录扫描完成
+- sync_* 在后台线程执行：列出目录后只比较 (mtime_ns, size)，变化的条目才重新读取节点数，消失的条目删除
+- 搜索 / 排序 / 分页都是带索引的 SQL 查询，画廊只为当前页取数据
+- 目录变化由画廊页的 QFileSystemWatcher 触发增量同步
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.utils import workflow_io
+
+GALLERY_INDEX_PATH = Path("cache") / "gallery_index.db"
+
+KIND_WORKFLOW = "workflow"
+KIND_PROJECT = "project"
+
+WORKFLOW_SUFFIX = ".workflow.json"
+PROJECT_WORKFLOW = "model.workflow.json"
+PROJECT_PREVIEW = "preview.png"
+
+# 排序字段 → 列名
+SORT_COLUMNS = {"mtime": "mtime", "ctime": "ctime", "name": "name_key"}
+
+# 每处理多少个变化的条目提交一次，首次建立索引时画廊可以先看到一部分
+COMMIT_EVERY = 200
+
+
+def read_node_count(workflow_path) -> Optional[int]:
+    """只解析到 graph 字段为止（runtime 不读取），文件损坏时返回 None"""
+    try:
+        for key, value in workflow_io.iter_workflow_sections(workflow_path):
+            if key == "graph":
+                return len((value or {}).get("nodes", {}))
+    except Exception as e:
+        logger.debug(f"读取节点数失败 {workflow_path}: {e}")
+        return None
+    return 0
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class GalleryIndex:
+    def __init__(self, path=GALLERY_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 同步（后台线程）与查询（GUI 线程）各用一个连接，WAL 下读写互不阻塞
+        self._write_conn = self._connect()
+        self._read_conn = self._connect()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._create_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_schema(self):
+        with self._write_lock:
+            self._write_conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    kind TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    name_key TEXT NOT NULL,
+                    ctime REAL NOT NULL,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    signature TEXT NOT NULL,
+                    node_count INTEGER,
+                    thumbnail TEXT,
+                    PRIMARY KEY (kind, path)
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_mtime ON entries(kind, folder, mtime);
+                CREATE INDEX IF NOT EXISTS idx_entries_ctime ON entries(kind, folder, ctime);
+                CREATE INDEX IF NOT EXISTS idx_entries_name ON entries(kind, folder, name_key);
+            """)
+            self._write_conn.commit()
+
+    # ================== 同步 ==================
+
+    def sync_workflows(self, folder, should_stop: Callable[[], bool] = None) -> bool:
+        """同步 folder 下的 *.workflow.json；返回索引是否有变化，should_stop() 为真时中途放弃"""
+
+        def list_entries():
+            for entry in os.scandir(folder):
+                if entry.name.endswith(WORKFLOW_SUFFIX) and entry.is_file():
+                    stat = entry.stat()
+                    name = entry.name[:-len(WORKFLOW_SUFFIX)].split(".")[0]
+                    yield entry.path, name, stat, stat, os.path.join(folder, f"{name}.png")
+
+        return self._sync(KIND_WORKFLOW, folder, list_entries, should_stop)
+
+    def sync_projects(self, folder, should_stop: Callable[[], bool] = None) -> bool:
+        """同步 folder 下包含 model.workflow.json 的项目目录；时间取自项目目录，变化判断取自 model.workflow.json"""
+
+        def list_entries():
+            for entry in os.scandir(folder):
+                if not entry.is_dir():
+                    continue
+                try:
+                    stat = os.stat(os.path.join(entry.path, PROJECT_WORKFLOW))
+                    dir_stat = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, entry.name, stat, dir_stat, os.path.join(entry.path, PROJECT_PREVIEW)
+
+        return self._sync(KIND_PROJECT, folder, list_entries, should_stop)
+
+    def _sync(self, kind, folder, list_entries, should_stop) -> bool:
+        # 路径与画廊中的写法一致（str(Path(目录) / 文件名)）
+        folder = str(folder)
+        if not os.path.isdir(folder):
+            return False
+        with self._read_lock:
+            known = {
+                row["path"]: row["signature"] for row in self._read_conn.execute(
+                    "SELECT path, signature FROM entries WHERE kind=? AND folder=?", (kind, folder))
+            }
+
+        seen = set()
+        pending = []
+        changed = False
+        # list_entries 产出 (路径, 名称, 工作流文件 stat, 取时间的 stat, 预览图路径)
+        for path, name, file_stat, time_stat, thumbnail in list_entries():
+            if should_stop and should_stop():
+                return changed
+            signature = f"{file_stat.st_mtime_ns}:{file_stat.st_size}"
+            seen.add(path)
+            if known.get(path) == signature:
+                continue
+            workflow_file = path if kind == KIND_WORKFLOW else os.path.join(path, PROJECT_WORKFLOW)
+            pending.append((
+                kind, folder, path, name, name.lower(), time_stat.st_ctime, time_stat.st_mtime,
+                file_stat.st_size, signature, read_node_count(workflow_file), thumbnail,
+            ))
+            if len(pending) >= COMMIT_EVERY:
+                self._upsert(pending)
+                pending = []
+                changed = True
+        if pending:
+            self._upsert(pending)
+            changed = True
+
+        removed = [(kind, path) for path in known.keys() - seen]
+        if removed:
+            with self._write_lock:
+                self._write_conn.executemany("DELETE FROM entries WHERE kind=? AND path=?", removed)
+                self._write_conn.commit()
+            changed = True
+        return changed
+
+    def _upsert(self, rows):
+        with self._write_lock:
+            self._write_conn.executemany(
+                "INSERT OR REPLACE INTO entries (kind, folder, path, name, name_key, ctime, mtime, size, "
+                "signature, node_count, thumbnail) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._write_conn.commit()
+
+    def remove(self, kind, path):
+        """文件已由界面删除 / 重命名，不等下一次同步"""
+        with self._write_lock:
+            self._write_conn.execute("DELETE FROM entries WHERE kind=? AND path=?", (kind, str(path)))
+            self._write_conn.commit()
+
+    # ================== 查询 ==================
+
+    @staticmethod
+    def _where(kind, folder, text):
+        sql = "WHERE kind=? AND folder=?"
+        params = [kind, str(folder)]
+        if text:
+            sql += " AND name_key LIKE ? ESCAPE '\\'"
+            params.append(f"%{_escape_like(text.lower())}%")
+        return sql, params
+
+    def count(self, kind, folder, text: str = "") -> int:
+        where, params = self._where(kind, folder, text)
+        with self._read_lock:
+            return self._read_conn.execute(f"SELECT COUNT(*) FROM entries {where}", params).fetchone()[0]
+
+    def query(self, kind, folder, text: str = "", sort: str = "mtime", ascending: bool = False,
+              offset: int = 0, limit: int = 12) -> List[Dict]:
+        """按名称子串过滤、按 sort 排序后取 [offset, offset + limit) 的条目"""
+        where, params = self._where(kind, folder, text)
+        order = "ASC" if ascending else "DESC"
+        column = SORT_COLUMNS.get(sort, "mtime")
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                f"SELECT path, name, ctime, mtime, size, node_count, thumbnail FROM entries {where} "
+                f"ORDER BY {column} {order}, path {order} LIMIT ? OFFSET ?",
+                params + [max(0, limit), max(0, offset)]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_index = None
+_index_failed = False
+_index_lock = threading.Lock()
+
+
+def get_gallery_index() -> Optional[GalleryIndex]:
+    """进程级画廊索引，首次使用时打开；cache 目录不可写时改用临时目录中的索引"""
+    global _index, _index_failed
+    if _index is None and not _index_failed:
+        with _index_lock:
+            if _index is None and not _index_failed:
+                try:
+                    _index = GalleryIndex()
+                except Exception as e:
+                    logger.warning(f"打开画廊索引失败，改用临时索引: {e}")
+                    try:
+                        _index = GalleryIndex(Path(tempfile.gettempdir()) / f"gallery_index_{os.getpid()}.db")
+                    except Exception as e:
+                        _index_failed = True
+                        logger.error(f"打开临时画廊索引失败: {e}")
+    return _index
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+运行日志库：所有节点 / 项目运行的日志按行写入 SQLite（logs/log_store.db）
+
+- 每行记录 run_id、node_id、级别、时间戳，按 (node_id, id) / (run_id, id) 建索引，尾部读取只取最后 N 行
+- 全文检索使用 FTS5（优先 trigram 分词以支持中文子串），SQLite 不支持 FTS5 时退化为 LIKE
+- 写入由后台线程批量提交，日志回调不等待磁盘；读取前 flush() 保证能读到刚写入的行
+- 保留策略：超过 max_age_days 天或总行数超过 max_rows 时删除最旧的记录
+"""
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+LOG_STORE_PATH = Path("logs") / "log_store.db"
+# 保留策略
+LOG_RETENTION_DAYS = 7
+LOG_RETENTION_ROWS = 1_000_000
+# 每写入多少行检查一次保留策略
+PRUNE_EVERY = 20000
+
+# 节点日志格式 "[2025-01-01 00:00:00] func-1 INFO: ..."，loguru 默认格式 "2025-01-01 00:00:00.000 | INFO | ..."
+_TIME_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})')
+_LEVEL_PATTERN = re.compile(r'\b(TRACE|DEBUG|INFO|SUCCESS|WARNING|ERROR|CRITICAL)\b')
+
+
+def parse_log_lines(text: str, default_level: str = "INFO", now: float = None):
+    """
+    拆分为 [(时间戳, 级别, 行文本)]；没有时间 / 级别的行（如 traceback 续行）沿用上一行的值
+    """
+    now = time.time() if now is None else now
+    ts, level = now, default_level
+    records = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        # 只在行首附近查找，避免把消息正文里的单词当成级别
+        head = line[:80]
+        time_match = _TIME_PATTERN.search(head)
+        if time_match:
+            try:
+                ts = datetime.strptime(time_match.group(1).replace("T", " "), "%Y-%m-%d %H:%M:%S").timestamp()
+            except ValueError:
+                pass
+            level_match = _LEVEL_PATTERN.search(head, time_match.end())
+            if level_match:
+                level = level_match.group(1)
+        records.append((ts, level, line))
+    return records
+
+
+class LogStore:
+    def __init__(self, path=LOG_STORE_PATH, max_age_days: float = LOG_RETENTION_DAYS,
+                 max_rows: int = LOG_RETENTION_ROWS):
+        self.path = Path(path)
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._write_conn = self._connect()
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.fts_tokenizer = self._create_schema(self._write_conn)
+
+        self._queue = queue.Queue()
+        self._since_prune = 0
+        self.prune()
+        self._writer = threading.Thread(target=self._writer_loop, name="log-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _create_schema(conn) -> Optional[str]:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY,
+                ts REAL NOT NULL,
+                run_id TEXT NOT NULL DEFAULT '',
+                node_id TEXT NOT NULL,
+                level TEXT NOT NULL,
+                message TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_node ON logs(node_id, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_run ON logs(run_id, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(ts)")
+        conn.commit()
+
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name='logs_fts'").fetchone()
+        if row:
+            return "trigram" if "trigram" in row[0] else "unicode61"
+        # trigram 需要 SQLite 3.34+；再不行则不建全文索引
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                conn.execute(
+                    f"CREATE VIRTUAL TABLE logs_fts USING fts5("
+                    f"message, content='logs', content_rowid='id', tokenize='{tokenizer}')"
+                )
+            except sqlite3.OperationalError:
+                continue
+            conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS logs_ai AFTER INSERT ON logs BEGIN
+                    INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message);
+                END;
+                CREATE TRIGGER IF NOT EXISTS logs_ad AFTER DELETE ON logs BEGIN
+                    INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                END;
+            """)
+            conn.execute("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')")
+            conn.commit()
+            return tokenizer
+        logger.warning("SQLite 不支持 FTS5，日志检索退化为 LIKE 查询")
+        return None
+
+    # ---------------------------- 写入 ----------------------------
+    def append(self, node_id: str, text: str, run_id: str = "", default_level: str = "INFO"):
+        """追加一段日志文本（可含多行），由后台线程批量写入"""
+        if not text:
+            return
+        records = parse_log_lines(text, default_level)
+        if records:
+            self._queue.put([(ts, run_id or "", node_id, level, line) for ts, level, line in records])
+
+    def flush(self):
+        """等待已提交的日志全部写入"""
+        self._queue.join()
+
+    def _writer_loop(self):
+        while True:
+            batches = [self._queue.get()]
+            # 合并短时间内到达的写入，一次事务提交
+            deadline = time.monotonic() + 0.05
+            while time.monotonic() < deadline:
+                try:
+                    batches.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            rows = [row for batch in batches for row in batch]
+            try:
+                with self._write_lock:
+                    self._write_conn.executemany(
+                        "INSERT INTO logs (ts, run_id, node_id, level, message) VALUES (?, ?, ?, ?, ?)", rows
+                    )
+                    self._write_conn.commit()
+                self._since_prune += len(rows)
+                if self._since_prune >= PRUNE_EVERY:
+                    self.prune()
+            except Exception as e:
+                print(f"⚠️ 日志写入日志库失败: {e}")
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    def prune(self):
+        """按保留期与最大行数删除最旧的日志"""
+        self._since_prune = 0
+        conn = self._write_conn
+        try:
+            with self._write_lock:
+                if self.max_age_days:
+                    conn.execute("DELETE FROM logs WHERE ts < ?", (time.time() - self.max_age_days * 86400,))
+                if self.max_rows:
+                    row = conn.execute(
+                        "SELECT id FROM logs ORDER BY id DESC LIMIT 1 OFFSET ?", (self.max_rows,)
+                    ).fetchone()
+                    if row:
+                        conn.execute("DELETE FROM logs WHERE id <= ?", (row[0],))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"清理日志库失败: {e}")
+
+    def delete_node(self, node_id: str):
+        self.flush()
+        with self._write_lock:
+            self._write_conn.execute("DELETE FROM logs WHERE node_id=?", (node_id,))
+            self._write_conn.commit()
+
+    # ---------------------------- 读取 ----------------------------
+    def _query(self, sql, params=()):
+        self.flush()
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def tail(self, node_id: str = None, run_id: str = None, limit: int = 5000) -> str:
+        """最近 limit 行（按写入顺序），可按节点 / 运行过滤"""
+        where, params = self._filters(node_id, run_id)
+        rows = self._query(f"SELECT message FROM logs {where} ORDER BY id DESC LIMIT ?", params + [limit])
+        return "\n".join(row[0] for row in reversed(rows))
+
+    def search(self, text: str, node_id: str = None, run_id: str = None, level: str = None,
+               limit: int = 1000) -> List[Dict]:
+        """全文检索（跨运行），结果按时间倒序"""
+        where, params = self._filters(node_id, run_id, level, alias="l.")
+        text = text.strip()
+        # trigram 至少需要 3 个字符才能走索引
+        use_fts = self.fts_tokenizer and text and not (self.fts_tokenizer == "trigram" and len(text) < 3)
+        if use_fts:
+            match = '"' + text.replace('"', '""') + '"'
+            where = f"{where} AND" if where else "WHERE"
+            sql = (f"SELECT l.id, l.ts, l.run_id, l.node_id, l.level, l.message FROM logs_fts "
+                   f"CROSS JOIN logs l ON l.id = logs_fts.rowid {where} logs_fts MATCH ? ORDER BY l.id DESC LIMIT ?")
+            params = params + [match, limit]
+        else:
+            if text:
+                where = f"{where} AND" if where else "WHERE"
+                where = f"{where} l.message LIKE ? ESCAPE '\\'"
+                params = params + ["%" + re.sub(r"([%_\\])", r"\\\1", text) + "%"]
+            sql = f"SELECT l.id, l.ts, l.run_id, l.node_id, l.level, l.message FROM logs l {where} ORDER BY l.id DESC LIMIT ?"
+            params = params + [limit]
+        keys = ("id", "ts", "run_id", "node_id", "level", "message")
+        return [dict(zip(keys, row)) for row in self._query(sql, params)]
+
+    def runs(self, node_id: str = None, limit: int = 100) -> List[Dict]:
+        """各次运行的概要（起止时间、行数、错误行数），最近的在前"""
+        where, params = self._filters(node_id)
+        rows = self._query(
+            f"SELECT run_id, MIN(ts), MAX(ts), COUNT(*), SUM(level IN ('ERROR', 'CRITICAL')) FROM logs {where} "
+            f"GROUP BY run_id ORDER BY MAX(id) DESC LIMIT ?",
+            params + [limit]
+        )
+        keys = ("run_id", "started_at", "finished_at", "lines", "errors")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def latest_run_id(self, node_id: str) -> Optional[str]:
+        rows = self._query("SELECT run_id FROM logs WHERE node_id=? ORDER BY id DESC LIMIT 1", (node_id,))
+        return rows[0][0] if rows else None
+
+    @staticmethod
+    def _filters(node_id=None, run_id=None, level=None, alias=""):
+        clauses, params = [], []
+        if node_id is not None:
+            clauses.append(f"{alias}node_id=?")
+            params.append(node_id)
+        if run_id is not None:
+            clauses.append(f"{alias}run_id=?")
+            params.append(run_id)
+        if level is not None:
+            clauses.append(f"{alias}level=?")
+            params.append(level)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+_store = None
+_store_lock = threading.Lock()
+_store_failed = False
+
+
+def get_log_store() -> Optional[LogStore]:
+    """进程级日志库，首次使用时打开；打开失败返回 None，调用方退回读写日志文件"""
+    global _store, _store_failed
+    if _store is None and not _store_failed:
+        with _store_lock:
+            if _store is None and not _store_failed:
+                try:
+                    _store = LogStore()
+                except Exception as e:
+                    _store_failed = True
+                    logger.warning(f"打开日志库失败，改用日志文件: {e}")
+    return _store
@@ -1,11 +1,335 @@
 # -*- coding: utf-8 -*-
+import os
+import weakref
+from collections import OrderedDict, deque
+
 from loguru import logger
 import threading
 from pathlib import Path
 
+from app.utils.log_store import get_log_store
+
 # 假设这些常量已定义
 LOG_ROOT = Path("logs") / "nodes"  # 示例路径
 MAX_LOG_LINES = 5000
+# 文件行数超过 MAX_LOG_LINES * COMPACT_FACTOR 时压缩为最近 MAX_LOG_LINES 行
+COMPACT_FACTOR = 2
+# 节点内存中实时日志的上限（行数 / 字节数，任一超出即丢弃最旧的片段）
+REALTIME_LOG_MAX_LINES = 2000
+REALTIME_LOG_MAX_BYTES = 1024 * 1024
+# 所有节点实时日志合计的内存预算，超出时整体清空最久未写入的节点缓冲
+REALTIME_LOG_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+class RingLogFile:
+    """
+    追加写入的节点日志文件，保持"只保留最近 max_lines 行"的语义
+
+    - 写入：只追加新行，不再每行读写整个文件
+    - 压缩：行数超过 max_lines * compact_factor 时用最近 max_lines 行重写文件，均摊到每行为 O(1)
+    - 读取：内存中维护最近 max_lines 行的起始偏移，直接 seek 到尾部读取
+    """
+
+    def __init__(self, path: Path, max_lines: int = MAX_LOG_LINES, compact_factor: int = COMPACT_FACTOR):
+        self.path = Path(path)
+        self.max_lines = max_lines
+        self.compact_factor = compact_factor
+        self._offsets = deque(maxlen=max_lines)  # 最近 max_lines 行在文件中的起始偏移
+        self._line_count = 0  # 文件中的总行数（含已超出 max_lines 的旧行）
+        self._size = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._index_loaded = False
+
+    def _load_index(self):
+        """首次使用时扫描已有文件建立偏移索引（文件最多 max_lines * compact_factor 行）"""
+        self._index_loaded = True
+        if not self.path.exists():
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                self._offsets.append(offset)
+                offset += len(line)
+                self._line_count += 1
+        self._size = offset
+
+    def _sync(self):
+        """登记其他进程（组件子进程）追加到文件末尾的行；文件被外部截断 / 替换时重建索引"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size == self._size:
+            return
+        if size < self._size:
+            self._offsets.clear()
+            self._line_count = 0
+            self._size = 0
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if size == 0:
+                return
+        with open(self.path, "rb") as f:
+            f.seek(self._size)
+            offset = self._size
+            for line in f:
+                self._offsets.append(offset)
+                offset += len(line)
+                self._line_count += 1
+        self._size = offset
+
+    def append(self, text: str):
+        data = text.encode("utf-8")
+        with self._lock:
+            if not self._index_loaded:
+                self._load_index()
+            self._sync()
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab")
+            # 一条记录可能包含多行，逐行登记偏移
+            start = 0
+            while start < len(data):
+                end = data.find(b"\n", start)
+                end = len(data) if end < 0 else end + 1
+                self._offsets.append(self._size + start)
+                self._line_count += 1
+                start = end
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            if self._line_count > self.max_lines * self.compact_factor:
+                self._compact()
+
+    def _compact(self):
+        keep_from = self._offsets[0]
+        self._file.close()
+        self._file = None
+        with open(self.path, "rb") as f:
+            f.seek(keep_from)
+            data = f.read()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self._offsets = deque((offset - keep_from for offset in self._offsets), maxlen=self.max_lines)
+        self._line_count = len(self._offsets)
+        self._size = len(data)
+
+    def read_tail(self, max_lines: int = None) -> str:
+        """读取最近 max_lines 行（默认 self.max_lines）"""
+        with self._lock:
+            if not self._index_loaded:
+                self._load_index()
+            self._sync()
+            if not self._offsets:
+                return ""
+            count = min(max_lines or self.max_lines, len(self._offsets))
+            start = self._offsets[-count]
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                data = f.read(self._size - start)
+        return data.decode("utf-8", errors="replace")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def delete(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path.unlink(missing_ok=True)
+            self._offsets.clear()
+            self._line_count = 0
+            self._size = 0
+
+
+# 同一节点的多个处理器共享一个日志文件对象
+_log_files = {}
+_log_files_lock = threading.Lock()
+
+
+def get_ring_log_file(path: Path) -> RingLogFile:
+    key = str(Path(path).resolve())
+    with _log_files_lock:
+        log_file = _log_files.get(key)
+        if log_file is None:
+            log_file = _log_files[key] = RingLogFile(path)
+        return log_file
+
+
+class LogMemoryBudget:
+    """
+    全局实时日志内存预算：按最近写入时间排序登记各节点缓冲，
+    合计超出 max_bytes 时从最久未写入的缓冲开始整体清空（完整日志仍保留在日志文件中）
+    """
+
+    def __init__(self, max_bytes: int = REALTIME_LOG_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self._buffers = OrderedDict()  # {id(buffer): [weakref(buffer), 字节数]}，越靠前越久未写入
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def set_limit(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._evict(None)
+
+    def charge(self, buffer: "RealtimeLogBuffer", size: int):
+        """登记 buffer 当前大小并记为最近写入，超出预算时淘汰其他缓冲"""
+        with self._lock:
+            key = id(buffer)
+            entry = self._buffers.get(key)
+            if entry is None:
+                entry = self._buffers[key] = [weakref.ref(buffer, lambda _, k=key: self._forget(k)), 0]
+            else:
+                self._buffers.move_to_end(key)
+            self._total += size - entry[1]
+            entry[1] = size
+        self._evict(buffer)
+
+    def release(self, buffer: "RealtimeLogBuffer"):
+        self._forget(id(buffer))
+
+    def _forget(self, key):
+        # 缓冲被清空或回收时不再占用预算
+        with self._lock:
+            entry = self._buffers.pop(key, None)
+            if entry is not None:
+                self._total -= entry[1]
+
+    def _evict(self, keep):
+        while True:
+            with self._lock:
+                if self._total <= self.max_bytes:
+                    return
+                victim = None
+                for ref, _ in self._buffers.values():
+                    candidate = ref()
+                    if candidate is not None and candidate is not keep:
+                        victim = candidate
+                        break
+                if victim is None:
+                    return
+            victim.clear()
+
+
+LOG_MEMORY_BUDGET = LogMemoryBudget()
+
+
+class RealtimeLogBuffer:
+    """
+    节点实时日志的有界内存缓冲：每条消息作为一个片段存入 deque，
+    超过 max_lines 行或 max_bytes 字节时丢弃最旧的片段，大小计入全局 LogMemoryBudget
+    （字节数按字符数近似计算）
+    """
+
+    def __init__(self, max_lines: int = REALTIME_LOG_MAX_LINES, max_bytes: int = REALTIME_LOG_MAX_BYTES,
+                 budget: LogMemoryBudget = LOG_MEMORY_BUDGET):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.budget = budget
+        self._chunks = deque()  # [(文本, 行数)]
+        self._lines = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._bytes
+
+    @property
+    def line_count(self) -> int:
+        return self._lines
+
+    def append(self, text: str):
+        if not text:
+            return
+        if len(text) > self.max_bytes:
+            text = text[-self.max_bytes:]
+        with self._lock:
+            self._chunks.append((text, text.count("\n")))
+            self._lines += self._chunks[-1][1]
+            self._bytes += len(text)
+            while len(self._chunks) > 1 and (self._lines > self.max_lines or self._bytes > self.max_bytes):
+                old_text, old_lines = self._chunks.popleft()
+                self._lines -= old_lines
+                self._bytes -= len(old_text)
+            size = self._bytes
+        if self.budget is not None:
+            self.budget.charge(self, size)
+
+    def getvalue(self) -> str:
+        with self._lock:
+            return "".join(text for text, _ in self._chunks)
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._lines = 0
+            self._bytes = 0
+        if self.budget is not None:
+            self.budget.release(self)
+
+
+class LogRouter:
+    """
+    节点日志分发器：全局只注册一个 loguru sink（一个队列 / 线程），
+    按 record["extra"]["node_id"] 查表分发给订阅的节点处理器；
+    处理器订阅 / 退订不改动 loguru 的 handler 列表，开销与画布节点数无关
+    """
+
+    def __init__(self, level="INFO"):
+        self.level = level
+        self._routes = {}  # {node_id: (handler, ...)}，写时复制，分发时无需加锁
+        self._lock = threading.Lock()
+        self._sink_id = None
+
+    def subscribe(self, node_id, handler):
+        with self._lock:
+            self._routes[node_id] = self._routes.get(node_id, ()) + (handler,)
+            if self._sink_id is None:
+                self._sink_id = logger.add(
+                    self._dispatch,
+                    level=self.level,
+                    enqueue=True,  # 启用队列，实现异步日志处理
+                    filter=lambda r: "node_id" in r["extra"]
+                )
+
+    def unsubscribe(self, node_id, handler):
+        with self._lock:
+            handlers = tuple(h for h in self._routes.get(node_id, ()) if h is not handler)
+            if handlers:
+                self._routes[node_id] = handlers
+            else:
+                self._routes.pop(node_id, None)
+
+    def _dispatch(self, message):
+        record = message.record
+        handlers = self._routes.get(record["extra"].get("node_id"))
+        if not handlers:
+            return
+        timestamp = record["time"].strftime("%Y-%m-%d %H:%M:%S")
+        formatted_msg = f"[{timestamp}] {record['function']}-{record['line']} {record['level'].name}: {record['message']}"
+        for handler in handlers:
+            try:
+                handler._log_sink(formatted_msg)
+                if handler.use_file_logging:
+                    handler._file_sink(formatted_msg + "\n")
+            except Exception as e:
+                # 单个节点的处理异常不影响其他节点
+                print(f"Error dispatching node log: {e}")
+
+
+LOG_ROUTER = LogRouter()
 
 
 class NodeLogHandler:
@@ -15,14 +339,15 @@ class NodeLogHandler:
         self.node_id = node_id
         self.log_callback = log_callback
         self.use_file_logging = use_file_logging
-        self.handler_id = None
-        self.file_handler_id = None
+        self.run_id = ""  # 当前运行 ID，写入日志库用于按运行检索
+        self._subscribed = False
         self.log_window = None  # 新增：存储 LogMessageBox 实例
         self._lock = threading.Lock()  # 新增：线程锁，保护 log_window 的读写
 
         # 持久化日志路径
         safe_node_id = "".join(c if c.isalnum() or c in "._-" else "_" for c in str(node_id))
         self.log_file_path = LOG_ROOT / f"node_{safe_node_id}.log"
+        self.log_file = get_ring_log_file(self.log_file_path)
 
         self.logger = logger.bind(node_id=self.node_id)
         self.add_handler()
@@ -38,14 +363,8 @@ class NodeLogHandler:
             if self.log_window == log_window:
                 self.log_window = None
 
-    def _log_sink(self, message):
+    def _log_sink(self, formatted_msg):
         """UI 回调日志接收器"""
-        record = message.record
-        if record["extra"].get("node_id") != self.node_id:
-            return
-        timestamp = record["time"].strftime("%Y-%m-%d %H:%M:%S")
-        formatted_msg = f"[{timestamp}] {record['function']}-{record['line']} {record['level'].name}: {record['message']}"
-
         # 调用原有的 UI 回调
         self.log_callback(self.node_id, formatted_msg)
 
@@ -60,78 +379,74 @@ class NodeLogHandler:
                     print(f"Error sending log to window: {e}")
         # ---
 
-    def _file_sink(self, message):
-        """持久化文件日志接收器（带行数限制）"""
-        record = message.record
-        if record["extra"].get("node_id") != self.node_id:
-            return
-
-        timestamp = record["time"].strftime("%Y-%m-%d %H:%M:%S")
-        formatted_msg = f"[{timestamp}] {record['function']}-{record['line']} {record['level'].name}: {record['message']}\n"
-
+    def _file_sink(self, formatted_msg):
+        """持久化文件日志接收器（带行数限制），同时写入日志库"""
         try:
-            # 1. 读取现有日志（最多 MAX_LOG_LINES - 1 行）
-            existing_lines = []
-            if self.log_file_path.exists():
-                with open(self.log_file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    # 保留最后 (MAX_LOG_LINES - 1) 行
-                    existing_lines = lines[-(MAX_LOG_LINES - 1):]
-
-            # 2. 添加新日志
-            all_lines = existing_lines + [formatted_msg]
-
-            # 3. 写回（最多 MAX_LOG_LINES 行）
-            with open(self.log_file_path, 'w', encoding='utf-8') as f:
-                f.writelines(all_lines[-MAX_LOG_LINES:])
-
+            self.log_file.append(formatted_msg)
         except Exception as e:
             # 避免日志写入失败导致组件崩溃
             print(f"⚠️ 日志写入失败 ({self.log_file_path}): {e}")
+        self.ingest(formatted_msg)
+
+    def begin_run(self, run_id: str):
+        """开始一次新的运行，之后的日志都记在该 run_id 下"""
+        self.run_id = run_id
+
+    def ingest(self, text: str):
+        """写入日志库（组件子进程直接写日志文件，由执行方读取新增内容后调用）"""
+        store = get_log_store()
+        if store is not None:
+            store.append(self.node_id, text, self.run_id)
 
     def get_logger(self):
         return self.logger
 
     def add_handler(self):
-        self.handler_id = logger.add(
-            self._log_sink,
-            level="INFO",
-            enqueue=True,  # 启用队列，实现异步日志处理
-            filter=lambda r: r["extra"].get("node_id") == self.node_id
-        )
-
-        if self.use_file_logging:
-            self.file_handler_id = logger.add(
-                self._file_sink,
-                level="INFO",
-                enqueue=True,
-                filter=lambda r: r["extra"].get("node_id") == self.node_id
-            )
+        if not self._subscribed:
+            LOG_ROUTER.subscribe(self.node_id, self)
+            self._subscribed = True
 
     def remove_handler(self):
-        if self.handler_id is not None:
-            logger.remove(self.handler_id)
-        if self.file_handler_id is not None:
-            logger.remove(self.file_handler_id)
+        if self._subscribed:
+            LOG_ROUTER.unsubscribe(self.node_id, self)
+            self._subscribed = False
 
     def get_log_file_path(self):
         return str(self.log_file_path)
 
     def read_log_file(self):
-        if self.log_file_path.exists():
+        """最近 5000 行：优先查询日志库，库中没有该节点的记录（如旧版本日志）时读取日志文件"""
+        store = get_log_store()
+        if store is not None:
             try:
-                with open(self.log_file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                # 返回最近 5000 行
-                return ''.join(lines[-5000:])
-            except Exception:
-                return ""
-        return ""
+                content = store.tail(self.node_id, limit=MAX_LOG_LINES)
+                if content:
+                    return content + "\n"
+            except Exception as e:
+                logger.warning(f"查询日志库失败: {e}")
+        try:
+            return self.log_file.read_tail(MAX_LOG_LINES)
+        except Exception:
+            return ""
+
+    def search_logs(self, text: str, limit: int = 1000) -> str:
+        """在该节点所有运行的日志中检索，返回按时间排列的匹配行（带运行 ID）"""
+        store = get_log_store()
+        if store is None:
+            return "\n".join(line for line in self.read_log_file().splitlines() if text in line)
+        rows = store.search(text, node_id=self.node_id, limit=limit)
+        return "\n".join(f"[{row['run_id'] or '-'}] {row['message']}" for row in reversed(rows))
 
     def cleanup(self):
         """清理日志文件（谨慎使用）"""
+        self.remove_handler()
         try:
-            self.log_file_path.unlink(missing_ok=True)
+            self.log_file.delete()
         except Exception:
             pass
-        self.remove_handler()
+        store = get_log_store()
+        if store is not None:
+            try:
+                store.delete_node(self.node_id)
+            except Exception:
+                pass
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析（python main.py --profile-startup）
+
+- 导入耗时：在 sys.meta_path 最前面挂一个计时 finder，记录每个模块的自身耗时与累计耗时（口径同 -X importtime）
+- 阶段耗时：section() 记录各界面 / 控件的初始化耗时
+- 时间点：mark() 记录窗口显示、首次绘制等相对进程启动的时间
+未启用时 section() / mark() 直接返回；finish() 输出报告到日志并写入 startup_profile.txt
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# 本模块在 main.py 中最先导入，作为启动时间基准
+_PROCESS_START = time.perf_counter()
+
+
+class _ImportTimer:
+    """sys.meta_path finder：委托其余 finder 查找模块，并为模块执行计时"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+
+        loader = spec.loader
+        # BuiltinImporter / FrozenImporter 以类本身作为 loader，不能替换其方法
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        original_exec = loader.exec_module
+        profiler = self.profiler
+
+        def exec_module(module):
+            frame = profiler._enter()
+            try:
+                original_exec(module)
+            finally:
+                profiler._exit(fullname, frame)
+
+        try:
+            loader.exec_module = exec_module
+        except (AttributeError, TypeError):
+            pass
+        return spec
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.imports = []  # [(模块名, 自身耗时, 累计耗时, 嵌套深度)]
+        self.sections = []  # [(阶段名, 耗时, 嵌套深度)]
+        self.marks = []  # [(时间点, 相对进程启动的秒数)]
+        self._local = threading.local()
+        self._finder = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self):
+        frame = [time.perf_counter(), 0.0]  # [开始时间, 子模块累计耗时]
+        self._stack().append(frame)
+        return frame
+
+    def _exit(self, fullname, frame):
+        stack = self._stack()
+        stack.pop()
+        elapsed = time.perf_counter() - frame[0]
+        if stack:
+            stack[-1][1] += elapsed
+        self.imports.append((fullname, elapsed - frame[1], elapsed, len(stack)))
+
+    @contextmanager
+    def section(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        depth = getattr(self._local, "section_depth", 0)
+        self._local.section_depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.section_depth = depth
+            self.sections.append((name, time.perf_counter() - start, depth))
+
+    def mark(self, name: str):
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - _PROCESS_START))
+
+    def report(self, top: int = 30) -> str:
+        lines = ["========== 启动耗时分析 =========="]
+        for name, at in self.marks:
+            lines.append(f"{name:<24}{at * 1000:>10.1f} ms")
+
+        total_import = sum(item[2] for item in self.imports if item[3] == 0)
+        lines.append("")
+        lines.append(f"模块导入: {len(self.imports)} 个，合计 {total_import * 1000:.1f} ms；累计耗时最高的 {top} 个:")
+        lines.append(f"{'自身(ms)':>10}{'累计(ms)':>10}  模块")
+        for name, self_time, cumulative, depth in sorted(self.imports, key=lambda item: -item[2])[:top]:
+            lines.append(f"{self_time * 1000:>10.1f}{cumulative * 1000:>10.1f}  {'  ' * depth}{name}")
+
+        lines.append("")
+        lines.append("界面初始化:")
+        # 按完成顺序记录，嵌套阶段先于外层完成；按深度缩进展示
+        for name, elapsed, depth in self.sections:
+            lines.append(f"{elapsed * 1000:>10.1f} ms  {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+    def finish(self, output_path="startup_profile.txt"):
+        """移除导入计时并输出报告"""
+        if not self.enabled:
+            return
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        report = self.report()
+        from loguru import logger
+
+        logger.info("\n" + report)
+        try:
+            Path(output_path).write_text(report, encoding="utf-8")
+        except OSError:
+            pass
+
+
+PROFILER = StartupProfiler()
@@ -1,66 +1,18 @@
 # -*- coding: utf-8 -*-
 import asyncio
-import json
 import os
 from pathlib import Path
 from urllib.request import urlopen
 
-import aiohttp
-import requests
-from PyQt5.QtCore import QObject, pyqtSignal, QThread, QRectF, Qt
-from PyQt5.QtGui import QPainter, QImage
+from PyQt5.QtCore import QObject, pyqtSignal, QThread
 from loguru import logger
 
 
-class ThumbnailGenerator(QThread):
-    """异步生成缩略图的线程类"""
-    finished = pyqtSignal(str)  # 发送生成的文件路径
-
-    def __init__(self, graph, workflow_path):
-        super().__init__()
-        self.graph = graph
-        self.workflow_path = workflow_path
-
-    def run(self):
-        """在后台线程中生成缩略图"""
-        try:
-            # 构造预览图路径：xxx.workflow.json → xxx.png
-            base_name = os.path.splitext(os.path.splitext(self.workflow_path)[0])[0]  # 去掉 .workflow.json
-            png_path = base_name + ".png"
-
-            # 获取场景和边界
-            scene = self.graph.viewer().scene()
-            rect = QRectF()
-            for node in self.graph.all_nodes():
-                item_rect = node.view.sceneBoundingRect()
-                rect = rect.united(item_rect)
-
-            if rect.isEmpty():
-                # 如果没有节点，创建一个空白图
-                image = QImage(800, 600, QImage.Format_ARGB32)
-                image.fill(Qt.white)
-            else:
-                # 扩展一点边距，避免裁剪
-                rect.adjust(-100, -100, 90, 90)
-                image = QImage(rect.size().toSize(), QImage.Format_ARGB32)
-                image.fill(Qt.white)  # 背景设为白色（可选）
-
-                painter = QPainter(image)
-                # 将场景渲染到 QImage
-                scene.render(painter, target=QRectF(image.rect()), source=rect)
-                painter.end()
-
-            # 保存图像
-            image.save(png_path, "PNG")
-            self.finished.emit(png_path)
-        except Exception as e:
-            logger.error(f"缩略图生成失败: {str(e)}")
-            self.finished.emit("")
-
-
 class WorkflowLoader(QThread):
     """异步加载工作流的线程类"""
-    finished = pyqtSignal(dict, dict, dict, dict)  # graph_data, runtime_data, node_status_data
+    # 以 object 传递，避免 dict 签名在跨线程时转换为 QVariantMap 并整体复制
+    graph_loaded = pyqtSignal(object, object)  # graph_data, global_variable
+    finished = pyqtSignal(object, object, object, object)  # graph_data, runtime_data, node_status_data, global_variable
     progress = pyqtSignal(str)  # 添加进度信号
 
     def __init__(self, file_path, graph, node_type_map):
@@ -68,17 +20,54 @@ class WorkflowLoader(QThread):
         self.file_path = file_path
         self.graph = graph
         self.node_type_map = node_type_map
+        # 编辑日志重放结果：恢复的修改条数、{节点 id: 文件中的节点 id}、文件中的全部节点 id
+        self.recovered_entries = 0
+        self.node_origin = {}
+        self.file_node_ids = []
+        self.error = None
+
+    def _apply_journal(self, graph_data, global_variable):
+        """在文件内容上重放编辑日志（上次未压缩 / 异常退出时留下的修改）"""
+        from app.utils.workflow_journal import read_journal, replay_journal
+
+        self.file_node_ids = list(graph_data.get("nodes", {}))
+        self.node_origin = {n_id: n_id for n_id in self.file_node_ids}
+        journal = read_journal(self.file_path)
+        if journal is None or not journal[1]:
+            return graph_data, global_variable
+        header, entries = journal
+        graph_data, global_variable, self.node_origin = replay_journal(graph_data, global_variable, header, entries)
+        self.recovered_entries = len(entries)
+        logger.info(f"已从编辑日志恢复 {len(entries)} 条修改: {self.file_path}")
+        return graph_data, global_variable
 
     def run(self):
         """在后台线程中加载工作流"""
         try:
-            self.progress.emit("正在读取工作流文件...")
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                full_data = json.load(f)
+            from app.utils.workflow_io import iter_workflow_sections
 
-            graph_data = full_data.get("graph", {})
+            self.progress.emit("正在读取工作流文件...")
+            # 逐个解析顶层字段：graph 与 global_variable 就绪后立即通知界面创建节点，runtime 继续在后台解析
+            full_data = {}
+            graph_emitted = False
+            for key, value in iter_workflow_sections(self.file_path):
+                full_data[key] = value
+                if not graph_emitted and "graph" in full_data and "global_variable" in full_data:
+                    full_data["graph"], full_data["global_variable"] = self._apply_journal(
+                        full_data["graph"], full_data["global_variable"]
+                    )
+                    self.graph_loaded.emit(full_data["graph"], full_data["global_variable"])
+                    graph_emitted = True
+
+            if not graph_emitted:
+                full_data["graph"], full_data["global_variable"] = self._apply_journal(
+                    full_data.get("graph", {}), full_data.get("global_variable", {})
+                )
+            graph_data = full_data["graph"]
             runtime_data = full_data.get("runtime", {})
-            global_variable = full_data.get("global_variable", {})
+            global_variable = full_data["global_variable"]
+            if not graph_emitted:
+                self.graph_loaded.emit(graph_data, global_variable)
             # 准备节点状态数据
             node_status_data = {}
             nodes_data = graph_data.get("nodes", {})
@@ -86,31 +75,37 @@ class WorkflowLoader(QThread):
             
             self.progress.emit(f"正在处理 {total_nodes} 个节点...")
             
+            # 节点类型 -> 组件路径（反查表只建一次；同一类型对应多个路径时取第一个）
+            path_by_type = {}
+            for path, node_type_name in self.node_type_map.items():
+                path_by_type.setdefault(node_type_name, path)
+            status_keys = [key for key in runtime_data if key not in ("environment", "environment_exe", "node_id2stable_key")]
+
             for index, (node_id, node_data) in enumerate(nodes_data.items()):
                 # 发送进度更新
                 if index % 10 == 0:  # 每10个节点更新一次进度
                     self.progress.emit(f"正在处理节点 {index}/{total_nodes}...")
-                    
-                node_type = node_data.get("type_", "")
-                if node_type in self.node_type_map.values():
-                    # 找到对应的 full_path
-                    full_path = None
-                    for path, node_type_name in self.node_type_map.items():
-                        if node_type_name == node_type:
-                            full_path = path
-                            break
-
-                    if full_path:
-                        node_name = node_data.get("name", "Unknown")
-                        stable_key = f"{full_path}||{node_name}"
-                        node_status_data[stable_key] = {
-                            key: value.get(stable_key)
-                            for key, value in runtime_data.items() if key not in ("environment", "environment_exe", "node_id2stable_key")
-                        }| {"custom_property": node_data.get("custom", {})}
+
+                full_path = path_by_type.get(node_data.get("type_", ""))
+                if full_path:
+                    node_name = node_data.get("name", "Unknown")
+                    stable_key = f"{full_path}||{node_name}"
+                    node_status_data[stable_key] = {
+                        key: runtime_data[key].get(stable_key) for key in status_keys
+                    } | {"custom_property": node_data.get("custom", {})}
+
+            # 节点数据按需加载：此处只包装引用，端口值在被读取时才读取旁路文件 / 反序列化
+            from app.utils.artifact_store import get_artifact_store
+
+            artifact_store = get_artifact_store(self.file_path)
+            for node_status in node_status_data.values():
+                for key in ("node_inputs", "node_outputs"):
+                    node_status[key] = artifact_store.load_lazy(node_status.get(key) or {})
 
             self.progress.emit("节点处理完成，准备加载...")
             self.finished.emit(graph_data, runtime_data, node_status_data, global_variable)
         except Exception as e:
+            self.error = str(e)
             logger.error(f"工作流加载失败: {str(e)}")
             self.finished.emit({}, {}, {}, {})
 
@@ -159,6 +154,8 @@ class DownloadThread(QThread):
         self.file_path = file_path
         self.headers = {"Authorization": token} if token else {}
         self.is_canceled = False  # 取消标志位
+        import requests
+
         self.session = requests.Session()  # 使用 Session 以便关闭连接
 
     def run(self):
@@ -191,6 +188,13 @@ class DownloadThread(QThread):
             self.session.close()  # 确保释放网络资源
 
 
+def _client_session(headers):
+    # aiohttp 导入较慢，推迟到更新检查线程中
+    import aiohttp
+
+    return aiohttp.ClientSession(headers=headers)
+
+
 class AsyncUpdateChecker(QThread):
     finished = pyqtSignal(object)  # 返回 latest_release 或 None
     error = pyqtSignal(str)
@@ -208,7 +212,7 @@ class AsyncUpdateChecker(QThread):
         }
         headers = headers | {"Authorization": f"token {self.token}"} if self.token else headers
         url = f"https://api.github.com/repos/{self.repo}/releases/latest"
-        async with aiohttp.ClientSession(headers=headers) as session:
+        async with _client_session(headers) as session:
             async with session.get(url, timeout=10) as resp:
                 if resp.status == 200:
                     print("GitHub API 响应:", await resp.json())
@@ -221,7 +225,7 @@ class AsyncUpdateChecker(QThread):
     async def fetch_gitee(self):
         headers = {"Authorization": self.token} if self.token else {}
         url = f"https://gitee.com/api/v5/repos/{self.repo}/releases/latest"
-        async with aiohttp.ClientSession(headers=headers) as session:
+        async with _client_session(headers) as session:
             async with session.get(url, timeout=10) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -232,7 +236,7 @@ class AsyncUpdateChecker(QThread):
     async def fetch_gitcode(self):
         headers = {"Authorization": self.token} if self.token else {}
         url = f"https://gitcode.com/api/v5/repos/{self.repo}/releases/latest"
-        async with aiohttp.ClientSession(headers=headers) as session:
+        async with _client_session(headers) as session:
             async with session.get(url, timeout=10) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+画布预览图
+
+- 预览图按目标分辨率（不超过 THUMBNAIL_MAX_SIZE）渲染，不再按场景实际尺寸分配整张图
+- 场景只能在 GUI 线程访问：ThumbnailGenerator 在 GUI 线程按横条分片渲染，每片之间让出事件循环
+- 节点几何 / 连线的哈希写入 PNG 文本块，保存时哈希未变则跳过渲染
+- 画廊卡片读取预览图时按卡片尺寸解码，并按 (路径, 修改时间, 尺寸) 缓存在 QPixmapCache 中
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QRectF, QSize, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPainter, QPixmap, QPixmapCache
+from loguru import logger
+
+THUMBNAIL_MAX_SIZE = QSize(1280, 800)
+# 每片渲染的目标高度（像素）
+THUMBNAIL_BAND_HEIGHT = 160
+THUMBNAIL_HASH_KEY = "graph_hash"
+# 卡片预览缓存上限（KB）
+PREVIEW_CACHE_KB = 64 * 1024
+
+
+def thumbnail_path_for(workflow_path) -> Path:
+    """xxx.workflow.json → xxx.png"""
+    workflow_path = Path(workflow_path)
+    return workflow_path.parent / f"{workflow_path.stem.split('.')[0]}.png"
+
+
+def _stable_key(node) -> str:
+    """与运行数据一致的稳定键（FULL_PATH||名称）；node.id 每次加载都会重新生成，不能参与哈希"""
+    return f"{getattr(node, 'FULL_PATH', 'unknown')}||{node.name()}"
+
+
+def graph_geometry_hash(graph) -> str:
+    """影响预览图的内容：节点名称、位置、尺寸、颜色与连线（连线两端按稳定键标识）"""
+    digest = hashlib.sha1()
+    nodes = sorted(graph.all_nodes(), key=lambda n: (_stable_key(n), tuple(n.view.xy_pos)))
+    for node in nodes:
+        view = node.view
+        digest.update(repr((
+            _stable_key(node), node.type_, tuple(view.xy_pos), view.width, view.height,
+            tuple(node.color()), node.disabled(),
+        )).encode("utf-8"))
+        edges = sorted(
+            f"{port.name()}>{_stable_key(connected.node())}.{connected.name()};"
+            for port in (node.output_ports() if hasattr(node, "output_ports") else [])
+            for connected in port.connected_ports()
+        )
+        digest.update("".join(edges).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_thumbnail_hash(png_path) -> str:
+    """只读取 PNG 文本块，不解码图像"""
+    if not os.path.exists(png_path):
+        return ""
+    return QImageReader(str(png_path)).text(THUMBNAIL_HASH_KEY)
+
+
+def nodes_bounding_rect(nodes) -> QRectF:
+    rect = QRectF()
+    for node in nodes:
+        rect = rect.united(node.view.sceneBoundingRect())
+    return rect
+
+
+def scaled_target_size(rect: QRectF, max_size: QSize = THUMBNAIL_MAX_SIZE) -> QSize:
+    """按比例缩小到 max_size 以内（不放大）"""
+    scale = min(1.0, max_size.width() / rect.width(), max_size.height() / rect.height())
+    return QSize(max(1, int(rect.width() * scale)), max(1, int(rect.height() * scale)))
+
+
+def render_scene_image(scene, rect: QRectF, max_size: QSize = THUMBNAIL_MAX_SIZE) -> QImage:
+    """一次性把场景中的 rect 区域渲染为不超过 max_size 的图像（用于选中节点等小范围预览）"""
+    image = QImage(scaled_target_size(rect, max_size), QImage.Format_ARGB32)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+    scene.render(painter, target=QRectF(image.rect()), source=rect)
+    painter.end()
+    return image
+
+
+def load_preview_pixmap(path, width: int, height: int):
+    """按卡片尺寸解码预览图（拉伸填满），结果缓存；文件不存在或无法解码时返回 None"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if QPixmapCache.cacheLimit() < PREVIEW_CACHE_KB:
+        QPixmapCache.setCacheLimit(PREVIEW_CACHE_KB)
+    key = f"preview|{path}|{mtime}|{width}x{height}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+    reader = QImageReader(str(path))
+    reader.setScaledSize(QSize(width, height))
+    image = reader.read()
+    if image.isNull():
+        return None
+    pixmap = QPixmap.fromImage(image)
+    QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+class ThumbnailGenerator(QObject):
+    """在 GUI 线程分片生成画布预览图，接口与原线程类一致：start() 后通过 finished 返回文件路径（失败为空串）"""
+    finished = pyqtSignal(str)
+
+    def __init__(self, graph, workflow_path, parent=None):
+        super().__init__(parent)
+        self.graph = graph
+        self.workflow_path = workflow_path
+        self.png_path = str(thumbnail_path_for(workflow_path))
+        self.skipped = False
+        self._image = None
+        self._bands = []
+        self._cancelled = False
+
+    def start(self):
+        try:
+            graph_hash = graph_geometry_hash(self.graph)
+            if read_thumbnail_hash(self.png_path) == graph_hash:
+                # 画布外观没有变化，沿用已有预览图
+                self.skipped = True
+                self.finished.emit(self.png_path)
+                return
+
+            rect = nodes_bounding_rect(self.graph.all_nodes())
+            if rect.isEmpty():
+                # 如果没有节点，创建一个空白图
+                self._image = QImage(800, 600, QImage.Format_ARGB32)
+                self._image.fill(Qt.white)
+            else:
+                # 扩展一点边距，避免裁剪
+                rect.adjust(-100, -100, 90, 90)
+                self._image = QImage(scaled_target_size(rect), QImage.Format_ARGB32)
+                self._image.fill(Qt.white)
+                # 按目标图像切成横条，源区域按相同比例切分
+                scale = rect.height() / self._image.height()
+                for top in range(0, self._image.height(), THUMBNAIL_BAND_HEIGHT):
+                    height = min(THUMBNAIL_BAND_HEIGHT, self._image.height() - top)
+                    target = QRectF(0, top, self._image.width(), height)
+                    source = QRectF(rect.left(), rect.top() + top * scale, rect.width(), height * scale)
+                    self._bands.append((target, source))
+            self._image.setText(THUMBNAIL_HASH_KEY, graph_hash)
+            QTimer.singleShot(0, self._render_next)
+        except Exception as e:
+            logger.error(f"缩略图生成失败: {str(e)}")
+            self.finished.emit("")
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _render_next(self):
+        if self._cancelled:
+            return
+        try:
+            if self._bands:
+                target, source = self._bands.pop(0)
+                painter = QPainter(self._image)
+                painter.setRenderHint(QPainter.Antialiasing)
+                painter.setRenderHint(QPainter.SmoothPixmapTransform)
+                self.graph.viewer().scene().render(painter, target=target, source=source)
+                painter.end()
+            if self._bands:
+                QTimer.singleShot(0, self._render_next)
+                return
+            # 先写临时文件再替换，画廊不会读到写了一半的图片
+            tmp_path = self.png_path + ".tmp"
+            if not self._image.save(tmp_path, "PNG"):
+                raise OSError(f"无法写入 {tmp_path}")
+            os.replace(tmp_path, self.png_path)
+            self._image = None
+            self.finished.emit(self.png_path)
+        except Exception as e:
+            logger.error(f"缩略图生成失败: {str(e)}")
+            self.finished.emit("")
@@ -7,8 +7,6 @@ import sys
 from pathlib import Path
 from typing import Any
 
-import numpy as np
-import pandas as pd
 from PyQt5 import QtGui, QtCore
 from PyQt5.QtGui import QIcon
 from loguru import logger
@@ -127,11 +125,14 @@ def get_icon(icon_name):
 
 def serialize_for_json(obj):
     """递归将对象转换为 JSON 可序列化格式"""
+    # numpy / pandas 未被导入时不可能出现其对象，避免启动时为此导入
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
     if isinstance(obj, dict):
         return {k: serialize_for_json(v) for k, v in obj.items()}
     elif isinstance(obj, (list, tuple)):
         return [serialize_for_json(v) for v in obj]
-    elif isinstance(obj, pd.DataFrame):
+    elif pd is not None and isinstance(obj, pd.DataFrame):
         # 方案1: 转为 records（列表 of 字典）
         try:
             return {
@@ -143,7 +144,7 @@ def serialize_for_json(obj):
         except Exception:
             # 如果包含不支持的类型（如 object），降级为字符串
             return f"<DataFrame {obj.shape}> (无法序列化)"
-    elif isinstance(obj, pd.Series):
+    elif pd is not None and isinstance(obj, pd.Series):
         try:
             return {
                 "__type__": "Series",
@@ -152,7 +153,7 @@ def serialize_for_json(obj):
             }
         except Exception:
             return f"<Series {len(obj)}> (无法序列化)"
-    elif isinstance(obj, np.ndarray):
+    elif np is not None and isinstance(obj, np.ndarray):
         try:
             return {
                 "__type__": "ndarray",
@@ -161,11 +162,11 @@ def serialize_for_json(obj):
             }
         except Exception:
             return f"<ndarray {obj.shape} {obj.dtype}> (无法序列化)"
-    elif isinstance(obj, np.integer):
+    elif np is not None and isinstance(obj, np.integer):
         return int(obj)
-    elif isinstance(obj, np.floating):
+    elif np is not None and isinstance(obj, np.floating):
         return float(obj)
-    elif isinstance(obj, np.bool_):
+    elif np is not None and isinstance(obj, np.bool_):
         return bool(obj)
     elif hasattr(obj, 'serialize') and callable(getattr(obj, 'serialize')):
         # 如果对象自己有 serialize 方法（如你的 ArgumentType）
@@ -195,6 +196,8 @@ def deserialize_from_json(obj):
     if isinstance(obj, dict):
         if obj.get("__type__") == "DataFrame":
             try:
+                import pandas as pd
+
                 df = pd.DataFrame(obj["data"], columns=obj["columns"])
                 df.index = obj["index"]
                 return df
@@ -202,6 +205,8 @@ def deserialize_from_json(obj):
                 return obj  # 降级
         elif obj.get("__type__") == "ndarray":
             try:
+                import numpy as np
+
                 return np.array(obj["data"], dtype=obj["dtype"])
             except Exception:
                 return obj
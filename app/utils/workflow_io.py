@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+画布工作流文件的读写
+
+- JSON 后端可插拔：安装了 orjson 时使用 orjson，否则使用标准库 json
+- 默认紧凑输出，且每个顶层字段单独占一行（紧凑 JSON 的字符串中不会出现原始换行），
+  读取时可以逐行解析，先拿到 graph 再解析体积最大的 runtime；pretty=True 时按 indent=2 输出
+- compress=True 时用 zstd 压缩（需安装 zstandard），读取时按文件头自动识别，文件名不变
+旧版 indent=2 格式的文件按顶层字段依次解析，同样先返回 graph。
+"""
+import importlib
+import importlib.util
+import io
+import json
+import math
+import os
+from pathlib import Path
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class _StdlibBackend:
+    name = "json"
+
+    @staticmethod
+    def dumps(obj, pretty=False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+def _has_non_finite(obj) -> bool:
+    """是否含有 NaN / ±Infinity（orjson 会写成 null，标准库写成 NaN / Infinity）"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+class _OrjsonBackend:
+    name = "orjson"
+
+    def __init__(self, orjson):
+        self.orjson = orjson
+        self.options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, pretty=False) -> bytes:
+        if _has_non_finite(obj):
+            # 与标准库后端保持同样的文件内容，非有限浮点数不能丢失为 null
+            return _StdlibBackend.dumps(obj, pretty)
+        options = self.options | self.orjson.OPT_INDENT_2 if pretty else self.options
+        try:
+            return self.orjson.dumps(obj, option=options)
+        except TypeError:
+            # orjson 不支持的值（如超出 64 位的整数）交给标准库处理
+            return _StdlibBackend.dumps(obj, pretty)
+
+    def loads(self, data):
+        try:
+            return self.orjson.loads(data)
+        except self.orjson.JSONDecodeError:
+            # NaN / Infinity 等标准库可写出而 orjson 不接受的内容
+            return json.loads(data)
+
+
+def _load_backend(name=None):
+    candidates = [name] if name else ["orjson", "json"]
+    for candidate in candidates:
+        if candidate == "orjson":
+            try:
+                return _OrjsonBackend(importlib.import_module("orjson"))
+            except ImportError:
+                continue
+        if candidate == "json":
+            return _StdlibBackend()
+    raise ValueError(f"不支持的 JSON 后端: {name}")
+
+
+BACKEND = _load_backend()
+
+
+def set_backend(name=None):
+    """切换 JSON 后端（"orjson" / "json"，None 为自动选择），主要用于基准测试"""
+    global BACKEND
+    BACKEND = _load_backend(name)
+    return BACKEND
+
+
+def zstd_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def dumps_workflow(data: dict, pretty: bool = False) -> bytes:
+    if pretty:
+        return BACKEND.dumps(data, pretty=True)
+    members = [BACKEND.dumps(key) + b":" + BACKEND.dumps(value) for key, value in data.items()]
+    return b"{\n" + b",\n".join(members) + b"\n}\n"
+
+
+def write_workflow(path, data: dict, pretty: bool = False, compress: bool = False):
+    """原子写入工作流文件；compress=True 但未安装 zstandard 时不压缩"""
+    payload = dumps_workflow(data, pretty)
+    if compress and zstd_available():
+        import zstandard
+
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _open_workflow(path):
+    f = open(path, "rb")
+    if f.read(4) == _ZSTD_MAGIC:
+        import zstandard
+
+        f.seek(0)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f, closefd=True))
+    f.seek(0)
+    return f
+
+
+def iter_workflow_sections(path):
+    """按文件中的顺序逐个产出 (顶层字段名, 值)"""
+    with _open_workflow(path) as f:
+        first = f.readline()
+        second = f.readline()
+        if first.strip() == b"{" and second.startswith(b'"'):
+            line = second
+            while line:
+                member = line.rstrip().rstrip(b",")
+                if member and member != b"}":
+                    yield from BACKEND.loads(b"{" + member + b"}").items()
+                line = f.readline()
+            return
+        text = (first + second + f.read()).decode("utf-8")
+    yield from _iter_members(text)
+
+
+def _iter_members(text):
+    """旧格式：用标准库解码器依次解析顶层对象的每个成员"""
+    decoder = json.JSONDecoder()
+    whitespace = " \t\r\n"
+    index = len(text) - len(text.lstrip(whitespace))
+    if text[index:index + 1] != "{":
+        raise ValueError("工作流文件格式错误：顶层不是 JSON 对象")
+    index += 1
+    while True:
+        while text[index] in whitespace:
+            index += 1
+        if text[index] == "}":
+            return
+        key, index = json.decoder.scanstring(text, index + 1)
+        while text[index] in whitespace:
+            index += 1
+        index += 1  # ':'
+        while text[index] in whitespace:
+            index += 1
+        value, index = decoder.raw_decode(text, index)
+        yield key, value
+        while text[index] in whitespace:
+            index += 1
+        if text[index] == ",":
+            index += 1
+
+
+def read_workflow(path) -> dict:
+    return dict(iter_workflow_sections(path))
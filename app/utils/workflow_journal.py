@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+工作流编辑日志（追加写入的增量自动保存）
+
+画布上的修改按节点记录到同名的 <画布名>.journal，每行一条紧凑 JSON：
+- 第一行为基准 {"op": "base", "token": [文件大小, 修改时间], "ids": {内存节点 id: 文件节点 id}}，
+  表示日志记录的是相对哪一版工作流文件的修改（打开工作流后节点 id 会重新生成，ids 用于对应）
+- {"op": "node", "id": ..., "data": 节点序列化数据（含 inputs / outputs 连线）}：节点新增或变化后的完整状态
+- {"op": "remove", "id": ...}：节点被删除
+- {"op": "globals", "data": ...}：全局变量
+自动保存只追加变化的节点，定期压缩（整体写回工作流文件并清空日志）；
+程序异常退出后再次打开工作流时，在文件内容上重放日志即可恢复未保存的修改。
+基准与文件不一致（文件已被其他方式改写）的日志视为过期并丢弃。
+"""
+import os
+from pathlib import Path
+
+from loguru import logger
+
+from app.utils import workflow_io
+
+# 日志超过任一上限时立即压缩
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+JOURNAL_COMPACT_ENTRIES = 5000
+
+
+def journal_path_for(workflow_path) -> Path:
+    """与预览图、旁路目录一致，按画布名（去掉 .workflow.json）命名"""
+    workflow_path = Path(workflow_path)
+    return workflow_path.parent / f"{workflow_path.stem.split('.')[0]}.journal"
+
+
+def remove_journal(workflow_path):
+    try:
+        journal_path_for(workflow_path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def file_token(workflow_path):
+    """工作流文件的版本标识（大小 + 纳秒修改时间），文件不存在时为 None"""
+    try:
+        stat = os.stat(workflow_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class WorkflowJournal:
+    """单个工作流的编辑日志写入端"""
+
+    def __init__(self, workflow_path):
+        self.workflow_path = Path(workflow_path)
+        self.path = journal_path_for(workflow_path)
+        self.entries = 0
+        self._file = None
+
+    @property
+    def size(self) -> int:
+        return self._file.tell() if self._file else 0
+
+    def reset(self, ids=None):
+        """以当前的工作流文件为基准重新开始记录（保存 / 压缩 / 打开工作流之后调用）"""
+        self.close()
+        self._file = open(self.path, "wb")
+        self.entries = 0
+        self._write([{"op": "base", "token": file_token(self.workflow_path), "ids": ids or {}}])
+        self.sync()
+
+    def append(self, entries):
+        """追加若干条记录；写入操作系统缓冲即返回，程序崩溃不会丢失，断电保护依赖 sync()"""
+        if not entries or self._file is None:
+            return
+        self._write(entries)
+        self.entries += len(entries)
+
+    def _write(self, entries):
+        self._file.write(b"".join(workflow_io.BACKEND.dumps(entry) + b"\n" for entry in entries))
+        self._file.flush()
+
+    def sync(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """关闭并删除日志（修改已写回工作流文件或被放弃）"""
+        self.close()
+        self.entries = 0
+        remove_journal(self.workflow_path)
+
+
+def read_journal(workflow_path):
+    """
+    读取工作流的编辑日志，返回 (基准, [记录])；没有日志或日志已过期时返回 None。
+    异常退出时最后一行可能只写了一半，解析失败的行之后的内容全部忽略。
+    """
+    path = journal_path_for(workflow_path)
+    try:
+        with open(path, "rb") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(workflow_io.BACKEND.loads(line))
+        except ValueError:
+            break
+    if not records or records[0].get("op") != "base":
+        return None
+    header, entries = records[0], records[1:]
+    if header.get("token") != file_token(workflow_path):
+        logger.warning(f"编辑日志与工作流文件版本不一致，已丢弃: {path}")
+        remove_journal(workflow_path)
+        return None
+    return header, entries
+
+
+def _node_links(node_id, node_data):
+    """与 NodeGraph._serialize 相同：从节点数据中取出 inputs / outputs 并转换为连线"""
+    links = []
+    for pname, conn_data in (node_data.pop("inputs", None) or {}).items():
+        for conn_id, port_names in conn_data.items():
+            links.extend((node_id, pname, conn_id, conn_port) for conn_port in port_names)
+    for pname, conn_data in (node_data.pop("outputs", None) or {}).items():
+        for conn_id, port_names in conn_data.items():
+            links.extend((conn_id, conn_port, node_id, pname) for conn_port in port_names)
+    return links
+
+
+def replay_journal(graph_data: dict, global_variable: dict, header: dict, entries: list):
+    """
+    在工作流文件的 graph / global_variable 上重放日志，返回 (graph_data, global_variable, origin)。
+    重放后节点以记录日志时的内存 id 为键；origin 为 {节点 id: 文件中的节点 id}，只包含文件中原有且未被删除的节点。
+    """
+    # 文件中的节点 id 换成记录日志时的内存 id
+    rename = {file_id: mem_id for mem_id, file_id in header.get("ids", {}).items()}
+    nodes = {rename.get(n_id, n_id): n_data for n_id, n_data in graph_data.get("nodes", {}).items()}
+    origin = {rename.get(n_id, n_id): n_id for n_id in graph_data.get("nodes", {})}
+
+    # 连线：{(输入节点, 输入端口, 输出节点, 输出端口): None} 保持原有顺序，并按节点建立索引以便整体替换
+    links = {}
+    links_by_node = {}
+
+    def add_link(link):
+        if link in links:
+            return
+        links[link] = None
+        links_by_node.setdefault(link[0], set()).add(link)
+        links_by_node.setdefault(link[2], set()).add(link)
+
+    def drop_links(node_id):
+        for link in links_by_node.pop(node_id, ()):
+            links.pop(link, None)
+            other = link[2] if link[0] == node_id else link[0]
+            if other in links_by_node:
+                links_by_node[other].discard(link)
+
+    for conn in graph_data.get("connections", []):
+        (in_id, in_port), (out_id, out_port) = conn["in"], conn["out"]
+        add_link((rename.get(in_id, in_id), in_port, rename.get(out_id, out_id), out_port))
+
+    for entry in entries:
+        op = entry.get("op")
+        if op == "node":
+            node_id, node_data = entry["id"], dict(entry["data"])
+            new_links = _node_links(node_id, node_data)
+            nodes[node_id] = node_data
+            drop_links(node_id)
+            for link in new_links:
+                add_link(link)
+        elif op == "remove":
+            nodes.pop(entry["id"], None)
+            origin.pop(entry["id"], None)
+            drop_links(entry["id"])
+        elif op == "globals":
+            global_variable = entry["data"]
+
+    graph_data = dict(graph_data)
+    graph_data["nodes"] = nodes
+    graph_data["connections"] = [
+        {"in": [in_id, in_port], "out": [out_id, out_port]}
+        for in_id, in_port, out_id, out_port in links
+        if in_id in nodes and out_id in nodes
+    ]
+    return graph_data, global_variable, origin
@@ -15,6 +15,7 @@ from qfluentwidgets import (
 )
 
 from app.utils.service_manager import SERVICE_MANAGER
+from app.utils.thumbnail import load_preview_pixmap
 from app.widgets.dialog_widget.service_request_dialog import ServiceRequestDialog
 
 
@@ -39,10 +40,11 @@ class ClickableLabel(BodyLabel):
 
 
 class ProjectCard(CardWidget):
-    def __init__(self, project_path, parent=None):
+    def __init__(self, project_path, parent=None, ctime_ts=None):
         super().__init__(parent)
         self.project_path = project_path
         self.project_name = os.path.basename(project_path)
+        self._ctime_ts = ctime_ts  # 画廊索引中的创建时间，没有时读取目录
         self.home = parent  # 用于回调
         self._setup_ui()
         # ✅ 点击卡片任意位置 = 打开文件夹
@@ -62,24 +64,22 @@ class ProjectCard(CardWidget):
             QLabel.projectMetaVal { color: #333; }
         """)
 
-        # 预览图
-        preview_path = os.path.join(self.project_path, "preview.png")
-        if os.path.exists(preview_path):
-            self.image_label = ImageLabel(preview_path, self)
-            self.image_label.setFixedSize(340, 150)
-            self.image_label.setBorderRadius(8, 8, 8, 8)
-        else:
-            self.image_label = BodyLabel("无预览图")
-            self.image_label.setFixedSize(300, 150)
-            self.image_label.setAlignment(Qt.AlignCenter)
-            self.image_label.setStyleSheet("""
-                color: #999;
-                background-color: #fafafa;
-                border-radius: 8px;
-                border: 1px dashed #e0e0e0;
-                font-size: 12px;
-            """)
-        main_layout.addWidget(self.image_label, 0, Qt.AlignCenter)
+        # 预览图（卡片被画廊复用时在两者之间切换）
+        self.preview_label = ImageLabel(self)
+        self.preview_label.setBorderRadius(8, 8, 8, 8)
+        self.placeholder_label = BodyLabel("无预览图")
+        self.placeholder_label.setFixedSize(300, 150)
+        self.placeholder_label.setAlignment(Qt.AlignCenter)
+        self.placeholder_label.setStyleSheet("""
+            color: #999;
+            background-color: #fafafa;
+            border-radius: 8px;
+            border: 1px dashed #e0e0e0;
+            font-size: 12px;
+        """)
+        main_layout.addWidget(self.preview_label, 0, Qt.AlignCenter)
+        main_layout.addWidget(self.placeholder_label, 0, Qt.AlignCenter)
+        self._update_preview()
 
         # 项目名称
         self.name_label = BodyLabel(self.project_name)
@@ -169,6 +169,31 @@ class ProjectCard(CardWidget):
             pass
         super().leaveEvent(event)
 
+    def _update_preview(self):
+        preview = load_preview_pixmap(os.path.join(self.project_path, "preview.png"), 340, 150)
+        if preview is not None:
+            self.preview_label.setImage(preview)
+            self.preview_label.setFixedSize(340, 150)
+            self.image_label = self.preview_label
+        else:
+            self.image_label = self.placeholder_label
+        self.preview_label.setVisible(preview is not None)
+        self.placeholder_label.setVisible(preview is None)
+
+    def set_project(self, project_path, ctime_ts=None):
+        """画廊翻页 / 排序时复用卡片，换成另一个项目的内容"""
+        self.project_path = project_path
+        self.project_name = os.path.basename(project_path)
+        self._ctime_ts = ctime_ts
+        self.name_label.setText(self.project_name)
+        self._update_preview()
+        while self.meta_grid.count():
+            item = self.meta_grid.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
+        self._populate_meta_grid()
+        self._update_service_button()
+
     def _populate_meta_grid(self):
         def add_row(r, key, val):
             k = BodyLabel(key)
@@ -191,8 +216,8 @@ class ProjectCard(CardWidget):
                 pass
 
         try:
-            stat = os.stat(self.project_path)
-            create_time = datetime.fromtimestamp(stat.st_ctime).strftime("%Y-%m-%d")
+            ctime_ts = self._ctime_ts if self._ctime_ts is not None else os.stat(self.project_path).st_ctime
+            create_time = datetime.fromtimestamp(ctime_ts).strftime("%Y-%m-%d")
             add_row(row, "创建", create_time); row += 1
         except Exception:
             pass
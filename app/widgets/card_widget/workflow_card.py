@@ -8,6 +8,8 @@ from PyQt5.QtGui import QFont, QPixmap
 from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QGridLayout, QWidget, QLabel
 from qfluentwidgets import CardWidget, BodyLabel, FluentIcon, TransparentToolButton, ImageLabel
 
+from app.utils.thumbnail import load_preview_pixmap
+
 
 class WorkflowCard(CardWidget):
     def __init__(
@@ -106,11 +108,7 @@ class WorkflowCard(CardWidget):
         self.image_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.image_label, 0, Qt.AlignCenter)
 
-        preview_path = self._get_preview_path()
-        if preview_path.exists():
-            self._load_and_scale_preview(preview_path)
-        else:
-            self._create_placeholder()
+        self.refresh_preview()
 
         # 信息栏
         bottom_layout = QHBoxLayout()
@@ -119,26 +117,16 @@ class WorkflowCard(CardWidget):
         meta_grid.setVerticalSpacing(8)
         meta_grid.setHorizontalSpacing(8)
 
-        if self._file_info:
-            create_time = self._file_info.get('ctime', '未知')
-            change_time = self._file_info.get('mtime', '未知')
-        else:
-            try:
-                stat = self.file_path.stat()
-                create_time = datetime.fromtimestamp(stat.st_ctime).strftime("%Y-%m-%d %H:%M")
-                change_time = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                create_time = change_time = "未知"
-
         k1 = BodyLabel("创建")
-        v1 = BodyLabel(create_time)
+        self.ctime_label = BodyLabel()
         k2 = BodyLabel("修改")
-        v2 = BodyLabel(change_time)
+        self.mtime_label = BodyLabel()
+        self._update_meta()
 
         meta_grid.addWidget(k1, 0, 0)
-        meta_grid.addWidget(v1, 0, 1)
+        meta_grid.addWidget(self.ctime_label, 0, 1)
         meta_grid.addWidget(k2, 1, 0)
-        meta_grid.addWidget(v2, 1, 1)
+        meta_grid.addWidget(self.mtime_label, 1, 1)
         bottom_layout.addLayout(meta_grid)
 
         # 按钮区域（仅保留编辑、复制、删除）
@@ -165,20 +153,46 @@ class WorkflowCard(CardWidget):
         bottom_layout.addLayout(btn_layout)
         layout.addLayout(bottom_layout)
 
+    def _update_meta(self):
+        if self._file_info:
+            create_time = self._file_info.get('ctime', '未知')
+            change_time = self._file_info.get('mtime', '未知')
+        else:
+            try:
+                stat = self.file_path.stat()
+                create_time = datetime.fromtimestamp(stat.st_ctime).strftime("%Y-%m-%d %H:%M")
+                change_time = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
+            except Exception:
+                create_time = change_time = "未知"
+        self.ctime_label.setText(create_time)
+        self.mtime_label.setText(change_time)
+
+        tooltip = []
+        if self._file_info and self._file_info.get('node_count') is not None:
+            tooltip.append(f"{self._file_info['node_count']} 个节点")
+        if self._file_info and 'size_kb' in self._file_info:
+            tooltip.append(f"{self._file_info['size_kb']} KB")
+        self.setToolTip(" · ".join(tooltip))
+
+    def set_workflow(self, file_path: Path, file_info: Optional[Dict[str, Any]] = None):
+        """画廊翻页 / 排序时复用卡片，换成另一个工作流的内容"""
+        self.file_path = file_path
+        self._file_info = file_info
+        self.workflow_name = file_path.stem.split(".")[0]
+        self.name_label.setText(self.workflow_name)
+        self._update_meta()
+        self.refresh_preview()
+
     def _load_and_scale_preview(self, preview_path: Path):
-        """加载并缩放预览图到统一尺寸（300x180）"""
+        """按统一尺寸（330x220）解码预览图，同一文件的结果在卡片重建时复用"""
         try:
-            pixmap = QPixmap(str(preview_path))
-            if pixmap.isNull():
+            scaled_pixmap = load_preview_pixmap(preview_path, 330, 220)
+            if scaled_pixmap is None:
                 self._create_placeholder()
                 return
 
-            # 保持宽高比，居中裁剪（或用 Qt.KeepAspectRatio）
-            scaled_pixmap = pixmap.scaled(330, 220, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-
-            # 如果你想强制填满（可能变形），用：
-            # scaled_pixmap = pixmap.scaled(target_width, target_height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-
+            self.image_label.setText("")
+            self.image_label.setStyleSheet("")
             self.image_label.setPixmap(scaled_pixmap)
             self.image_label.setFixedSize(scaled_pixmap.width(), scaled_pixmap.height())
         except Exception:
@@ -186,6 +200,7 @@ class WorkflowCard(CardWidget):
 
     def _create_placeholder(self):
         """创建“无预览图”占位"""
+        self.image_label.setPixmap(QPixmap())
         self.image_label.setText("无预览图")
         self.image_label.setStyleSheet("""
             color: #999;
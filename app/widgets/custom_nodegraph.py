@@ -1,10 +1,61 @@
 import json
+import re
+from itertools import chain
 
 from NodeGraphQt import NodeGraph, BaseNode
 from NodeGraphQt.base.commands import PortConnectedCmd
 
+from app.widgets.node_widget.custom_node_item import CustomNodeItem
+
 
 class CustomNodeGraph(NodeGraph):
+    # 批量加载期间已使用的节点名，为 None 表示不在批量加载中
+    _bulk_names = None
+    # 批量加载进度回调 progress_callback(已创建节点数, 节点总数)
+    _bulk_progress = None
+    # 批量加载结果 {数据中的节点 id: 新建节点的 id}
+    _bulk_ids = None
+
+    def bulk_deserialize_session(self, layout_data, progress_callback=None):
+        """
+        打开工作流时批量加载会话，结果与 deserialize_session 一致：
+        - 节点绘制推迟到全部节点创建之后统一进行
+        - 节点名用集合判重，节点不逐个压入撤销栈
+        - progress_callback 每创建一个节点调用一次，由调用方自行节流
+        返回 {数据中的节点 id: 新建节点的 id}（节点 id 在创建时重新生成）
+        """
+        self.clear_session()
+        self._bulk_names = set()
+        self._bulk_progress = progress_callback
+        self._bulk_ids = {}
+        try:
+            self._deserialize(layout_data)
+            node_ids = self._bulk_ids
+        finally:
+            self._bulk_names = None
+            self._bulk_progress = None
+            self._bulk_ids = None
+        self.clear_selection()
+        self._undo_stack.clear()
+        return node_ids
+
+    def get_unique_name(self, name):
+        """批量加载期间用集合判重，避免每添加一个节点都遍历全部节点名；命名规则与 NodeGraph 相同"""
+        if self._bulk_names is None:
+            return super().get_unique_name(name)
+        name = ' '.join(name.split())
+        if name not in self._bulk_names:
+            unique_name = name
+        else:
+            search = re.search(r'\w+ (\d+)$', name)
+            if search:
+                name = name[:len(search.group(1)) * -1].strip()
+            index = 1
+            while '{} {}'.format(name, index) in self._bulk_names:
+                index += 1
+            unique_name = '{} {}'.format(name, index)
+        self._bulk_names.add(unique_name)
+        return unique_name
 
     def _deserialize(self, data, relative_pos=False, pos=None, adjust_graph_style=True):
         """
@@ -70,60 +121,50 @@ class CustomNodeGraph(NodeGraph):
                 else:
                     non_backdrop_nodes_data[n_id] = n_data
 
-            # 先构建非 backdrop 节点
+            # 先构建非 backdrop 节点，backdrop 节点放到最后
             nodes = {}
-
-            # 处理非 backdrop 节点
-            for n_id, n_data in non_backdrop_nodes_data.items():
-                identifier = n_data['type_']
-                node = self._node_factory.create_node_instance(identifier)
-                if node:
-                    node.NODE_NAME = n_data.get('name', node.NODE_NAME)
-                    # set properties.
-                    for prop in node.model.properties.keys():
-                        if prop in n_data.keys():
-                            node.model.set_property(prop, n_data[prop])
-                    self.add_node(node, n_data.get('pos'), inherite_graph_style=adjust_graph_style)
-                    # set custom properties.
-                    for prop, val in n_data.get('custom', {}).items():
-                        node.model.set_property(prop, val)
-                        if isinstance(node, BaseNode):
-                            if prop in node.view.widgets:
-                                node.view.widgets[prop].set_value(val)
-
-                    nodes[n_id] = node
-
-                    if n_data.get('port_deletion_allowed', None):
-                        node.set_ports({
-                            'input_ports': n_data['input_ports'],
-                            'output_ports': n_data['output_ports']
-                        })
-
-            # 处理 backdrop 节点（放到最后）
-            for n_id, n_data in backdrop_nodes_data.items():
-                identifier = n_data['type_']
-                node = self._node_factory.create_node_instance(identifier)
-                if node:
-                    node.NODE_NAME = n_data.get('name', node.NODE_NAME)
-                    # set properties.
-                    for prop in node.model.properties.keys():
-                        if prop in n_data.keys():
-                            node.model.set_property(prop, n_data[prop])
-                    self.add_node(node, n_data.get('pos'), inherite_graph_style=adjust_graph_style)
-                    # set custom properties.
-                    for prop, val in n_data.get('custom', {}).items():
-                        node.model.set_property(prop, val)
-                        if isinstance(node, BaseNode):
-                            if prop in node.view.widgets:
-                                node.view.widgets[prop].set_value(val)
-
-                    nodes[n_id] = node
-
-                    if n_data.get('port_deletion_allowed', None):
-                        node.set_ports({
-                            'input_ports': n_data['input_ports'],
-                            'output_ports': n_data['output_ports']
-                        })
+            bulk = self._bulk_names is not None
+            total = len(nodes_data)
+            # 创建期间推迟节点绘制，全部创建后每个节点只绘制一次，之后再建立连线
+            with CustomNodeItem.defer_draw():
+                for n_id, n_data in chain(non_backdrop_nodes_data.items(), backdrop_nodes_data.items()):
+                    identifier = n_data['type_']
+                    node = self._node_factory.create_node_instance(identifier)
+                    if node:
+                        node.NODE_NAME = n_data.get('name', node.NODE_NAME)
+                        # set properties.
+                        for prop in node.model.properties.keys():
+                            if prop in n_data.keys():
+                                node.model.set_property(prop, n_data[prop])
+                        if bulk:
+                            # 批量加载：不逐个压入撤销栈，加载结束后撤销栈会被清空
+                            self.add_node(node, n_data.get('pos'), selected=False, push_undo=False,
+                                          inherite_graph_style=adjust_graph_style)
+                        else:
+                            self.add_node(node, n_data.get('pos'), inherite_graph_style=adjust_graph_style)
+                        # set custom properties.
+                        for prop, val in n_data.get('custom', {}).items():
+                            node.model.set_property(prop, val)
+                            if isinstance(node, BaseNode):
+                                if prop in node.view.widgets:
+                                    node.view.widgets[prop].set_value(val)
+
+                        nodes[n_id] = node
+                        if bulk:
+                            self._bulk_ids[n_id] = node.id
+
+                        if n_data.get('port_deletion_allowed', None):
+                            node.set_ports({
+                                'input_ports': n_data['input_ports'],
+                                'output_ports': n_data['output_ports']
+                            })
+                    if self._bulk_progress is not None:
+                        self._bulk_progress(len(nodes), total)
+
+            # 节点尺寸在统一绘制后才确定，同步到 model（add_node 时记录的是绘制前的尺寸）
+            for node in nodes.values():
+                node.model.width = node.view.width
+                node.model.height = node.view.height
 
             # build the connections.
             for connection in data.get('connections', []):
@@ -146,9 +187,12 @@ class CustomNodeGraph(NodeGraph):
                     allow_connection = any([not in_port.model.connected_ports,
                                             in_port.model.multi_connection])
                     if allow_connection:
-                        self._undo_stack.push(
-                            PortConnectedCmd(in_port, out_port, emit_signal=False)
-                        )
+                        command = PortConnectedCmd(in_port, out_port, emit_signal=False)
+                        if bulk:
+                            # 批量加载：与节点一样不压入撤销栈，直接执行连线
+                            command.redo()
+                        else:
+                            self._undo_stack.push(command)
 
                     # Run on_input_connected to ensure connections are fully set up
                     # after deserialization.
@@ -1,8 +1,65 @@
 import re
+from collections import deque
 
-from PyQt5.QtCore import QTimer, QMutex, QMutexLocker
-from PyQt5.QtGui import QTextCursor, QTextCharFormat, QColor
-from qfluentwidgets import MessageBoxBase, SubtitleLabel, TextEdit
+from PyQt5.QtCore import QTimer, QMutex, QMutexLocker, Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor, QFont
+from PyQt5.QtWidgets import QAbstractItemView, QListView
+from qfluentwidgets import MessageBoxBase, SubtitleLabel, SearchLineEdit
+
+# 一次匹配所有日志级别，取行内最先出现的级别
+LEVEL_PATTERN = re.compile(r'\b(DEBUG|INFO|WARNING|WARN|ERROR|CRITICAL)\b', re.IGNORECASE)
+
+
+class LogRecordModel(QAbstractListModel):
+    """
+    有界日志记录模型：每条记录在入队时解析一次级别颜色，
+    超过 max_lines 时丢弃最旧的记录；配合 QListView 只绘制可见行
+    """
+
+    def __init__(self, level_colors, max_lines=5000, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._records = []  # [(文本, QBrush 或 None)]
+        self._colors = {level.upper(): QBrush(QColor(color)) for level, color in level_colors.items()}
+
+    def parse(self, line):
+        match = LEVEL_PATTERN.search(line.replace('&nbsp;', ' '))
+        return line, self._colors.get(match.group(1).upper()) if match else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._records[index.row()][0]
+        if role == Qt.ForegroundRole:
+            return self._records[index.row()][1]
+        return None
+
+    def lines(self):
+        return [text for text, _ in self._records]
+
+    def set_lines(self, lines):
+        self.beginResetModel()
+        self._records = [self.parse(line) for line in lines[-self.max_lines:]]
+        self.endResetModel()
+
+    def append_lines(self, lines):
+        """批量追加，超出上限时先整体移除最旧的记录"""
+        if not lines:
+            return
+        lines = lines[-self.max_lines:]
+        overflow = len(self._records) + len(lines) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            del self._records[:overflow]
+            self.endRemoveRows()
+        start = len(self._records)
+        self.beginInsertRows(QModelIndex(), start, start + len(lines) - 1)
+        self._records.extend(self.parse(line) for line in lines)
+        self.endInsertRows()
 
 
 class LogMessageBox(MessageBoxBase):
@@ -12,26 +69,39 @@ class LogMessageBox(MessageBoxBase):
         'WARNING': '#ffcb6b',
         'WARN': '#ffcb6b',
         'ERROR': '#f44747',
-        'Error': '#f44747',
         'CRITICAL': '#f44747',
     }
+    # 窗口内最多保留的日志行数
+    MAX_LINES = 5000
+    # 队列刷新间隔（毫秒），每次刷新批量插入
+    FLUSH_INTERVAL = 50
 
-    def __init__(self, log_content="", parent=None):
+    def __init__(self, log_content="", parent=None, search_callback=None):
         super().__init__(parent)
-        # --- 新增：去重缓存 ---
-        self.dedupe_cache = []
+        # search_callback(关键字) -> 匹配的日志文本，用于跨运行检索；为 None 时不显示搜索框
+        self.search_callback = search_callback
+        self._searching = False
+        self._restore_lines = []  # 检索期间保存的原有内容
+        # --- 去重缓存：最近 dedupe_cache_size 行，集合判重 O(1) ---
         self.dedupe_cache_size = 50
+        self.dedupe_cache = deque()
+        self._dedupe_set = set()
         # ---
         self.titleLabel = SubtitleLabel('模型日志', self)
         self._isDraggable = True
         self.setSizeGripEnabled(True)  # 显示大小调整手柄（在右下角）
 
-        # 使用支持富文本的TextEdit
-        self.logTextEdit = TextEdit(self)
-        self.logTextEdit.setReadOnly(True)
-        self.logTextEdit.setLineWrapMode(TextEdit.NoWrap)  # 禁用自动换行
-        self.logTextEdit.setStyleSheet("""
-            TextEdit {
+        # 模型 / 视图：只绘制可见行，日志量再大也不会拖慢界面
+        self.log_model = LogRecordModel(self.LEVEL_COLORS, self.MAX_LINES, self)
+        self.logView = QListView(self)
+        self.logView.setModel(self.log_model)
+        self.logView.setUniformItemSizes(True)
+        self.logView.setWordWrap(False)
+        self.logView.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.logView.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.logView.setFont(QFont("Consolas", 12))
+        self.logView.setStyleSheet("""
+            QListView {
                 background-color: #1e1e1e;
                 border-radius: 4px;
                 border: 1px solid #E1E1E1;
@@ -51,79 +121,72 @@ class LogMessageBox(MessageBoxBase):
             except:
                 min_height = 500  # 默认高度
 
-        self.logTextEdit.setMinimumHeight(min_height)
-        self.logTextEdit.setMinimumWidth(1100)
-
-        # --- 初始化 text_document 属性 ---
-        self.text_document = self.logTextEdit.document()
-        # ---
+        self.logView.setMinimumHeight(min_height)
+        self.logView.setMinimumWidth(1100)
 
         # 设置初始日志内容（带颜色解析）
         self.set_log_content(log_content)
 
         # 将内容控件添加到布局
         self.viewLayout.addWidget(self.titleLabel)
-        self.viewLayout.addWidget(self.logTextEdit)
+        if self.search_callback is not None:
+            self.searchEdit = SearchLineEdit(self)
+            self.searchEdit.setPlaceholderText("检索该节点所有运行的日志")
+            self.searchEdit.searchSignal.connect(self.search_logs)
+            self.searchEdit.clearSignal.connect(self.clear_search)
+            self.viewLayout.addWidget(self.searchEdit)
+        self.viewLayout.addWidget(self.logView)
 
         # 创建按钮
         self.yesButton.hide()
         self.cancelButton.setText('关闭')
 
         # 延迟滚动到底部（确保内容渲染完成）
-        QTimer.singleShot(50, self.scroll_to_bottom)
+        QTimer.singleShot(50, lambda: self.scroll_to_bottom(force=True))
 
         # --- 实时更新相关 ---
         self.log_queue = []  # 日志队列
         self.log_queue_mutex = QMutex()  # 保护队列的互斥锁
         self.update_timer = QTimer(self)
         self.update_timer.timeout.connect(self.process_log_queue)
-        self.update_timer.start(100)  # 每100ms检查一次队列
-
-        # --- 用于直接操作文档 ---
-        self._last_cursor_position = 0  # 记录上次光标位置，用于优化滚动
+        self.update_timer.start(self.FLUSH_INTERVAL)
 
     def set_log_content(self, log_content):
-        """设置初始日志内容（带颜色解析）"""
-        if log_content:
-            # 直接操作 QTextDocument，更高效
-            # 使用传入的 self.text_document
-            cursor = QTextCursor(self.text_document)
-            # cursor.movePosition(QTextCursor.End) # 移动到文档末尾 (对于初始内容，应该是开头)
-            # 清空现有内容 (可选，因为这是初始化)
-            cursor.select(QTextCursor.Document)
-            cursor.removeSelectedText()
-
-            lines = log_content.split('\n')
-            for line in lines:
-                # 为了匹配日志级别，临时将 &nbsp; 替换回空格
-                line_for_level_check = line.replace('&nbsp;', ' ')
-
-                format_found = False
-                for level, color_hex in self.LEVEL_COLORS.items():
-                    if re.search(rf'\b{level}\b', line_for_level_check, re.IGNORECASE):
-                        char_format = QTextCharFormat()
-                        char_format.setForeground(QColor(color_hex))
-                        cursor.setCharFormat(char_format)
-                        format_found = True
-                        break
-
-                if not format_found:
-                    cursor.setCharFormat(QTextCharFormat())
-
-                # 插入原始的、可能包含 &nbsp; 的行
-                cursor.insertText(line)
-                cursor.insertBlock()  # 插入一个新段落
-        else:
-            # 如果没有内容，可以清空文档或不操作
-            # self.text_document.setPlainText('') # 或者 self.text_document.setHtml('')
-            pass
-        # --- 新增：将初始内容也加入去重缓存 ---
-        # 注意：如果初始内容非常大，可能需要更智能的处理，例如只缓存最后几行
-        # 这里简单地将所有初始行加入缓存
-        if log_content:
-            initial_lines = [line for line in log_content.split('\n') if line.strip()]
-            # 保留最新的几行作为缓存
-            self.dedupe_cache = initial_lines[-self.dedupe_cache_size:]
+        """设置初始日志内容（带颜色解析），一次性重置模型"""
+        lines = log_content.split('\n') if log_content else []
+        if lines and lines[-1] == '':
+            lines.pop()
+        self.log_model.set_lines(lines)
+        # --- 将初始内容的最后几行加入去重缓存 ---
+        self.dedupe_cache.clear()
+        self._dedupe_set.clear()
+        for line in [line for line in lines if line.strip()][-self.dedupe_cache_size:]:
+            self._is_duplicate(line)
+
+    def search_logs(self, text):
+        """显示检索结果；检索期间暂停实时追加，清空搜索框后恢复"""
+        text = text.strip()
+        if not text:
+            self.clear_search()
+            return
+        try:
+            result = self.search_callback(text)
+        except Exception as e:
+            result = f"ERROR: 日志检索失败: {e}"
+        if not self._searching:
+            self._restore_lines = self.log_model.lines()
+            self._searching = True
+        lines = result.split('\n') if result else ["未找到匹配的日志"]
+        self.log_model.set_lines(lines)
+        self.logView.scrollToBottom()
+
+    def clear_search(self):
+        if not self._searching:
+            return
+        self._searching = False
+        # 恢复检索前的内容，并接上检索期间到达的日志
+        self.log_model.set_lines(self._restore_lines)
+        self.scroll_to_bottom(force=True)
 
     def add_log_entry(self, log_line):
         """线程安全地添加单条日志到队列"""
@@ -133,78 +196,52 @@ class LogMessageBox(MessageBoxBase):
         with QMutexLocker(self.log_queue_mutex):
             self.log_queue.append(log_line)
 
-    def _deduplicate_and_add(self, line):
-        """检查并添加单行日志，避免重复"""
-        # 检查当前行是否已经在缓存中
-        if line.strip() in self.dedupe_cache:
-            return  # 如果是重复的，直接返回，不添加
-
-        # 如果不是重复的，添加到文档和缓存
-        # 为了匹配日志级别，临时将 &nbsp; 替换回空格
-        line_for_level_check = line.replace('&nbsp;', ' ')
-
-        format_found = False
-        for level, color_hex in self.LEVEL_COLORS.items():
-            if re.search(rf'\b{level}\b', line_for_level_check, re.IGNORECASE):
-                char_format = QTextCharFormat()
-                char_format.setForeground(QColor(color_hex))
-                self.logTextEdit.setCurrentCharFormat(char_format)
-                format_found = True
-                break
-
-        if not format_found:
-            # 清除之前的格式
-            self.logTextEdit.setCurrentCharFormat(QTextCharFormat())
-
-        # 插入原始的、可能包含 &nbsp; 的行
-        self.logTextEdit.append(line.rstrip('\n'))  # append 会自动换行，所以先去掉行尾的 \n
-
-        # 更新缓存
-        self.dedupe_cache.append(line.strip())
-        # 保持缓存大小
+    def _is_duplicate(self, line):
+        """检查单行日志是否为空行或与最近的日志重复，不重复则记入缓存"""
+        key = line.strip()
+        if not key or key in self._dedupe_set:
+            return True
+        # 缓存中的条目互不重复，淘汰最旧条目时可直接从集合中删除
+        self.dedupe_cache.append(key)
+        self._dedupe_set.add(key)
         if len(self.dedupe_cache) > self.dedupe_cache_size:
-            self.dedupe_cache.pop(0)  # 移除最旧的条目
+            self._dedupe_set.discard(self.dedupe_cache.popleft())
+        return False
 
     def process_log_queue(self):
-        """定时器槽函数，处理日志队列中的内容"""
+        """定时器槽函数，批量处理日志队列中的内容"""
         # 快速获取队列内容，减少锁持有时间
-        entries_to_process = []
         with QMutexLocker(self.log_queue_mutex):
-            if self.log_queue:
-                entries_to_process = self.log_queue[:]
-                self.log_queue.clear()  # 清空队列
-
-        if not entries_to_process:
-            return  # 队列为空，无需处理
-
-        # 将队列中的日志合并为一个字符串进行处理
-        combined_log = "".join(entries_to_process)
-
-        # 分割行并逐行处理（去重）
-        lines = combined_log.split('\n')
-        for line in lines:
-            # 可能需要过滤掉纯空行，取决于您的具体需求
-            self._deduplicate_and_add(line)
-
-        # 滚动到底部
-        self.scroll_to_bottom()
-
-    def scroll_to_bottom(self):
-        """滚动到日志最底部"""
-        # 优化：如果光标已经在底部，则不重复滚动
-        cursor = self.logTextEdit.textCursor()
-        if cursor.position() >= self._last_cursor_position:
-            self.logTextEdit.moveCursor(QTextCursor.End)
-            self.logTextEdit.ensureCursorVisible()
-        else:
-            # 如果用户滚动到了中间，则不自动滚动
-            pass
-        # 更新记录的位置为当前文档末尾
-        temp_cursor = QTextCursor(self.text_document)
-        temp_cursor.movePosition(QTextCursor.End)
-        self._last_cursor_position = temp_cursor.position()
+            if not self.log_queue:
+                return  # 队列为空，无需处理
+            entries_to_process = self.log_queue
+            self.log_queue = []
+
+        # 将队列中的日志合并后分割为行，去重后一次性插入
+        lines = "".join(entries_to_process).split('\n')
+        if lines and lines[-1] == '':
+            lines.pop()
+        new_lines = [line for line in lines if not self._is_duplicate(line)]
+        if not new_lines:
+            return
+        if self._searching:
+            self._restore_lines = (self._restore_lines + new_lines)[-self.MAX_LINES:]
+            return
+
+        scroll_bar = self.logView.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        self.log_model.append_lines(new_lines)
+        # 用户滚动到中间查看时不自动滚动
+        if at_bottom:
+            self.scroll_to_bottom(force=True)
+
+    def scroll_to_bottom(self, force=False):
+        """滚动到日志最底部；force=False 时仅在视图已处于底部时滚动"""
+        scroll_bar = self.logView.verticalScrollBar()
+        if force or scroll_bar.value() >= scroll_bar.maximum():
+            self.logView.scrollToBottom()
 
     def closeEvent(self, event):
         """窗口关闭时停止定时器"""
         self.update_timer.stop()
-        super().closeEvent(event)
\ No newline at end of file
+        super().closeEvent(event)
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QVBoxLayout, QSplitter, QWidget
-from qfluentwidgets import MessageBoxBase, SubtitleLabel, LineEdit, ComboBox, BodyLabel, PlainTextEdit, TextEdit
+from PyQt5.QtWidgets import QVBoxLayout, QSplitter, QWidget, QHBoxLayout
+from qfluentwidgets import MessageBoxBase, SubtitleLabel, LineEdit, ComboBox, BodyLabel, PlainTextEdit, TextEdit, \
+    SwitchButton, SpinBox
 
 
 class CustomInputDialog(MessageBoxBase):
@@ -92,10 +93,12 @@ class CustomComboDialog(MessageBoxBase):
 
 
 class ProjectExportDialog(MessageBoxBase):
-    """项目导出配置对话框：项目名 + requirements 预览 + README 编辑"""
+    """项目导出配置对话框：项目名 + requirements 预览 + README 编辑 + 服务缓存配置"""
 
-    def __init__(self, project_name: str = "", requirements: str = "", readme: str = "", parent=None):
+    def __init__(self, project_name: str = "", requirements: str = "", readme: str = "", cache_settings: dict = None,
+                 parent=None):
         super().__init__(parent)
+        cache_settings = cache_settings or {}
         self.titleLabel = SubtitleLabel("导出为独立项目")
         self.project_name_edit = LineEdit()
         self.project_name_edit.setText(project_name)
@@ -112,10 +115,40 @@ class ProjectExportDialog(MessageBoxBase):
         self.readme_edit = TextEdit()
         self.readme_edit.setPlainText(readme)
 
+        # 服务结果缓存配置（写入 project_spec.json 的 cache 字段）
+        self.cache_switch = SwitchButton()
+        self.cache_switch.setOnText("启用结果缓存")
+        self.cache_switch.setOffText("关闭结果缓存")
+        self.cache_switch.setChecked(cache_settings.get("enabled", False))
+        self.cache_ttl_spin = self._create_spin(1, 86400, cache_settings.get("ttl", 300))
+        self.cache_memory_spin = self._create_spin(1, 65536, cache_settings.get("max_memory_mb", 256))
+        self.cache_disk_spin = self._create_spin(0, 1048576, cache_settings.get("max_disk_mb", 0))
+        self.cache_switch.checkedChanged.connect(self._on_cache_toggled)
+        self._on_cache_toggled(self.cache_switch.isChecked())
+        # 请求合并与缓存相互独立；非确定性工作流（如大模型调用）不应开启
+        self.coalesce_switch = SwitchButton()
+        self.coalesce_switch.setOnText("合并相同请求")
+        self.coalesce_switch.setOffText("不合并请求")
+        self.coalesce_switch.setChecked(cache_settings.get("coalesce", False))
+
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(self.cache_switch)
+        cache_layout.addSpacing(12)
+        cache_layout.addWidget(BodyLabel("有效期(秒)"))
+        cache_layout.addWidget(self.cache_ttl_spin)
+        cache_layout.addWidget(BodyLabel("内存上限(MB)"))
+        cache_layout.addWidget(self.cache_memory_spin)
+        cache_layout.addWidget(BodyLabel("磁盘上限(MB)"))
+        cache_layout.addWidget(self.cache_disk_spin)
+        cache_layout.addSpacing(12)
+        cache_layout.addWidget(self.coalesce_switch)
+        cache_layout.addStretch()
+
         # 布局
         top_layout = QVBoxLayout()
         top_layout.addWidget(self.titleLabel)
         top_layout.addWidget(self.project_name_edit)
+        top_layout.addLayout(cache_layout)
 
         # 中间区域：左右分栏
         splitter = QSplitter(Qt.Horizontal)
@@ -156,4 +189,24 @@ class ProjectExportDialog(MessageBoxBase):
         return self.readme_edit.toPlainText()
 
     def get_requirements(self):
-        return self.req_edit.toPlainText()
\ No newline at end of file
+        return self.req_edit.toPlainText()
+
+    def get_cache_settings(self):
+        return {
+            "enabled": self.cache_switch.isChecked(),
+            "ttl": self.cache_ttl_spin.value(),
+            "max_memory_mb": self.cache_memory_spin.value(),
+            "max_disk_mb": self.cache_disk_spin.value(),
+            "coalesce": self.coalesce_switch.isChecked(),
+        }
+
+    @staticmethod
+    def _create_spin(minimum, maximum, value):
+        spin = SpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(int(value))
+        return spin
+
+    def _on_cache_toggled(self, checked):
+        for spin in (self.cache_ttl_spin, self.cache_memory_spin, self.cache_disk_spin):
+            spin.setEnabled(checked)
\ No newline at end of file
@@ -11,7 +11,6 @@ from qfluentwidgets import (
     PrimaryPushButton, BodyLabel, StrongBodyLabel,
     CardWidget, VBoxLayout, TextEdit, setFont
 )
-import requests
 
 
 # === 异步任务封装 ===
@@ -24,6 +23,9 @@ class RequestWorker(QRunnable):
         self.signals = RequestSignals()
 
     def run(self):
+        # requests 在工作线程中导入，不拖慢启动
+        import requests
+
         try:
             response = requests.post(
                 self.url,
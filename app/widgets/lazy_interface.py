@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+from app.utils.startup_profiler import PROFILER
+
+
+class LazyInterface(QWidget):
+    """
+    导航页面占位控件：注册到导航栏时不创建真实页面，
+    首次显示或首次调用 widget() 时才导入并创建（由 factory 负责导入），避免拖慢启动
+    """
+
+    def __init__(self, object_name: str, factory, parent=None):
+        super().__init__(parent)
+        self.setObjectName(object_name)
+        self._factory = factory
+        self._widget = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def is_created(self) -> bool:
+        return self._widget is not None
+
+    def widget(self):
+        if self._widget is None:
+            with PROFILER.section(f"延迟创建 {self.objectName()}"):
+                self._widget = self._factory()
+            self._layout.addWidget(self._widget)
+        return self._widget
+
+    def showEvent(self, event):
+        self.widget()
+        super().showEvent(event)
@@ -1,8 +1,6 @@
 from NodeGraphQt import NodeBaseWidget
 from qtpy import QtCore
 
-from app.widgets.code_editer import CodeEditorWidget
-
 
 class CodeEditorWidgetWrapper(NodeBaseWidget):
     valueChanged = QtCore.Signal(str)
@@ -11,6 +9,9 @@ class CodeEditorWidgetWrapper(NodeBaseWidget):
         super().__init__(parent)
         self.set_name(name)
         self.set_label(label)
+        # spyder / jedi 导入较慢，首次打开调试编辑器时再导入
+        from app.widgets.code_editer import CodeEditorWidget
+
         self._editor = CodeEditorWidget(parent=window, python_exe=window.get_current_python_exe())
         self._editor.code_changed.connect(
             lambda: self.valueChanged.emit(self._editor.get_code())
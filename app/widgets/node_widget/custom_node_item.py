@@ -1,9 +1,53 @@
+from contextlib import contextmanager
+
 from NodeGraphQt.qgraphics.node_base import NodeItem
 from Qt import QtCore
 
 
 class CustomNodeItem(NodeItem):
     _align = None
+    # 批量创建节点期间待绘制的节点（dict 作有序集合），为 None 时立即绘制
+    _deferred_draws = None
+    # 首次绘制时调用的回调（节点控件推迟到首次显示时构建），为 None 表示无需处理
+    on_first_paint = None
+
+    @classmethod
+    def is_drawing_deferred(cls):
+        return cls._deferred_draws is not None
+
+    @classmethod
+    @contextmanager
+    def defer_draw(cls):
+        """
+        推迟期间 draw_node 只做登记（添加控件 / 端口时不再反复计算尺寸与布局），
+        退出时每个节点统一绘制一次
+        """
+        if cls._deferred_draws is not None:
+            yield
+            return
+        cls._deferred_draws = {}
+        try:
+            yield
+        finally:
+            pending, cls._deferred_draws = cls._deferred_draws, None
+            for item in pending:
+                try:
+                    item.draw_node()
+                except RuntimeError:
+                    # 底层 C++ 对象已被删除（节点创建失败或已移除）
+                    continue
+
+    def draw_node(self):
+        if CustomNodeItem._deferred_draws is not None:
+            CustomNodeItem._deferred_draws[self] = None
+            return
+        super().draw_node()
+
+    def paint(self, painter, option, widget):
+        if self.on_first_paint is not None:
+            # 绘制过程中不能增删子项，回调放到事件循环下一轮（回调需可重复调用）
+            QtCore.QTimer.singleShot(0, self.on_first_paint)
+        super().paint(painter, option, widget)
 
     def remove_widget(self, widget):
         widget = self._widgets.pop(widget.get_name(), None)
@@ -16,6 +16,7 @@ from qfluentwidgets import (
     TreeWidget, RoundMenu, Action, InfoBar, InfoBarPosition, MessageBox
 )
 
+from app.runner.component_registry import resolve_component
 from app.scan_components import scan_components
 from app.widgets.dialog_widget.new_component_dialog import NewComponentDialog
 
@@ -192,7 +193,7 @@ class ComponentTreeWidget(TreeWidget):
         full_path = item.data(0, Qt.UserRole + 1)
         comp_cls = self._components.get(full_path)
         if comp_cls:
-            self._copied_component = copy.deepcopy(comp_cls)
+            self._copied_component = copy.deepcopy(resolve_component(comp_cls))
             self._show_success("组件已复制 (Ctrl+C)")
         else:
             self._show_warning("无法复制该组件")
@@ -234,7 +235,7 @@ class ComponentTreeWidget(TreeWidget):
             return
 
         try:
-            source = inspect.getsource(comp_cls)
+            source = inspect.getsource(resolve_component(comp_cls))
             default_name = f"{comp_cls.name}.py"
             file_path, _ = QFileDialog.getSaveFileName(
                 self, "导出组件", default_name, "Python Files (*.py)"
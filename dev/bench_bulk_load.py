@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+大工作流批量加载基准测试：生成 N 个组件节点（动态节点，带文本 / 布尔 / 下拉 / 长文本属性）、链式 + 随机连线的会话数据
+
+对比：
+- 原实现：NodeGraph.deserialize_session（逐个节点 / 连线压入撤销栈，节点名逐个遍历判重），且每个节点创建时即构建属性控件
+- bulk_deserialize_session：推迟绘制、集合判重、节点与连线都不经撤销栈，属性控件推迟到节点首次显示时构建
+另外给出首屏（--visible 个节点）显示时构建控件的耗时
+    python dev/bench_bulk_load.py --nodes 1000 --fan-in 2
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from Qt import QtWidgets
+
+from app.components.base import BaseComponent, ConnectionType, PortDefinition, PropertyDefinition, PropertyType
+from app.nodes.execute_node import create_node_class
+from app.widgets.custom_nodegraph import CustomNodeGraph
+
+
+class BenchComponent(BaseComponent):
+    name = "节点"
+    category = "基准"
+    inputs = [
+        PortDefinition(name="in_0", label="输入0", connection=ConnectionType.MULTIPLE),
+        PortDefinition(name="in_1", label="输入1", connection=ConnectionType.MULTIPLE),
+        PortDefinition(name="in_2", label="输入2", connection=ConnectionType.MULTIPLE),
+    ]
+    outputs = [
+        PortDefinition(name="out_0", label="输出0"),
+        PortDefinition(name="out_1", label="输出1"),
+        PortDefinition(name="out_2", label="输出2"),
+    ]
+    properties = {
+        "param": PropertyDefinition(type=PropertyType.TEXT, default="value", label="参数"),
+        "enabled": PropertyDefinition(type=PropertyType.BOOL, default=True, label="启用"),
+        "mode": PropertyDefinition(type=PropertyType.CHOICE, default="a", choices=["a", "b", "c"], label="模式"),
+        "prompt": PropertyDefinition(type=PropertyType.LONGTEXT, default="", label="提示词"),
+    }
+
+    def run(self, params, inputs=None):
+        return {}
+
+
+BenchNode = create_node_class(BenchComponent, "基准/节点", __file__)
+
+
+def make_session(num_nodes, fan_in, seed=0):
+    rng = random.Random(seed)
+    node_type = f"{BenchNode.__identifier__}.{BenchNode.__name__}"
+    nodes = {
+        f"0x{i:08x}": {
+            "type_": node_type,
+            "name": f"节点 {i}",
+            "pos": [(i % 40) * 260.0, (i // 40) * 180.0],
+            "custom": {"param": f"value {i}"},
+        }
+        for i in range(num_nodes)
+    }
+    node_ids = list(nodes)
+    connections = []
+    for i in range(1, num_nodes):
+        for k in range(min(fan_in, i)):
+            src = node_ids[i - 1] if k == 0 else node_ids[rng.randrange(0, i)]
+            connections.append({"out": [src, f"out_{k % 3}"], "in": [node_ids[i], f"in_{k % 3}"]})
+    return {"graph": {}, "nodes": nodes, "connections": connections}
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def build_all_widgets(graph):
+    for node in graph.all_nodes():
+        node.build_parms_widgets()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--fan-in", type=int, default=2)
+    parser.add_argument("--visible", type=int, default=30)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    graph = CustomNodeGraph()
+    graph.register_node(BenchNode)
+    session = make_session(args.nodes, args.fan_in)
+    print(f"节点 {args.nodes}，连线 {len(session['connections'])}")
+
+    # 先测批量加载：原实现留下的大量待删除控件会拖慢之后的场景操作
+    bulk = timed(lambda: graph.bulk_deserialize_session(session))
+    nodes = graph.all_nodes()
+    assert len(nodes) == args.nodes
+    assert graph.undo_stack().count() == 0
+    assert not any(node.view.widgets for node in nodes)
+    assert sorted(node.get_property("param") for node in nodes) == sorted(f"value {i}" for i in range(args.nodes))
+    visible = timed(lambda: [node.build_parms_widgets() for node in nodes[:args.visible]])
+    assert nodes[0].get_widget("param").get_value() == nodes[0].get_property("param")
+    graph.clear_session()
+    app.processEvents()
+
+    legacy = timed(lambda: (graph.deserialize_session(session), build_all_widgets(graph)))
+    assert len(graph.all_nodes()) == args.nodes
+    print(f"deserialize_session + 控件:  {legacy * 1000:9.1f} ms")
+    print(f"bulk_deserialize_session:   {bulk * 1000:9.1f} ms  ({legacy / bulk:.1f}x)")
+    print(f"首屏 {args.visible} 个节点构建控件: {visible * 1000:9.1f} ms")
+    graph.clear_session()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
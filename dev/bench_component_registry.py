@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+组件注册表启动耗时基准测试
+
+生成 N 个合成组件（模块顶层用 sleep 模拟 pandas / openai 等重量级导入），对比：
+- eager：逐个导入模块（原 scan_components 行为）
+- cold：首次启动，AST 解析 + 写入磁盘缓存，创建节点时导入组件并记录端口定义
+- warm：再次启动，元数据与端口定义全部来自磁盘缓存
+- reopen：同一进程内新建画布，复用进程级注册表
+    python dev/bench_component_registry.py --components 250 --import-delay 5
+"""
+import argparse
+import inspect
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "runner"))
+
+from component_registry import ComponentRegistry, MetadataCache, load_module
+
+
+class _Logger:
+    def error(self, msg):
+        print(msg)
+
+
+COMPONENT_TEMPLATE = '''# -*- coding: utf-8 -*-
+import time
+from enum import Enum
+
+time.sleep({delay})
+
+
+class ConnectionType(str, Enum):
+    SINGLE = "单输入"
+
+
+class PropertyType(str, Enum):
+    TEXT = "文本"
+
+
+class Component:
+    name = "组件{index}"
+    category = "分类{category}"
+    description = "合成组件 {index}"
+    requirements = ""
+
+    @classmethod
+    def get_inputs(cls):
+        return [("input_{{}}".format(i), "输入{{}}".format(i), ConnectionType.SINGLE) for i in range(3)]
+
+    @classmethod
+    def get_outputs(cls):
+        return [("output", "输出")]
+
+    @classmethod
+    def get_properties(cls):
+        return {{"prop_{{}}".format(i): {{"type": PropertyType.TEXT, "default": ""}} for i in range(5)}}
+'''
+
+
+def make_components(root: Path, count: int, delay_ms: float):
+    for index in range(count):
+        category_dir = root / f"分类{index % 10}"
+        category_dir.mkdir(parents=True, exist_ok=True)
+        (category_dir / f"component_{index}.py").write_text(
+            COMPONENT_TEMPLATE.format(delay=delay_ms / 1000, index=index, category=index % 10),
+            encoding="utf-8"
+        )
+
+
+def eager_scan(root: Path):
+    comp_map = {}
+    for py_file in root.rglob("*.py"):
+        module = load_module(py_file)
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            if getattr(obj, "category", None) is not None:
+                comp_map[f"{obj.category}/{obj.name}"] = obj
+    return comp_map
+
+
+def open_canvas(comp_map):
+    """模拟创建节点：读取每个组件的端口与属性定义"""
+    for comp_class in comp_map.values():
+        comp_class.get_inputs()
+        comp_class.get_outputs()
+        comp_class.get_properties()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--components", type=int, default=250)
+    parser.add_argument("--import-delay", type=float, default=5, help="每个组件模块导入耗时（毫秒）")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_components_"))
+    comp_root = work_dir / "components"
+    cache_path = work_dir / "component_metadata.json"
+    make_components(comp_root, args.components, args.import_delay)
+    enum_types = {}
+    logger = _Logger()
+    try:
+        comp_map, scan_eager = timed(lambda: eager_scan(comp_root))
+        _, open_eager = timed(lambda: open_canvas(comp_map))
+
+        registry = ComponentRegistry(comp_root, MetadataCache(cache_path), enum_types)
+        (comp_map, _), scan_cold = timed(lambda: registry.scan(logger))
+        _, open_cold = timed(lambda: open_canvas(comp_map))
+        registry.metadata_cache.save()
+
+        # 新进程：重新加载磁盘缓存
+        registry = ComponentRegistry(comp_root, MetadataCache(cache_path), enum_types)
+        (comp_map, _), scan_warm = timed(lambda: registry.scan(logger))
+        _, open_warm = timed(lambda: open_canvas(comp_map))
+        (comp_map, _), scan_reopen = timed(lambda: registry.scan(logger))
+        _, open_reopen = timed(lambda: open_canvas(comp_map))
+
+        # 修改一个文件后重新扫描
+        changed = next(comp_root.rglob("*.py"))
+        changed.write_text(changed.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        _, scan_changed = timed(lambda: registry.scan(logger))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"组件数: {args.components}，单个模块导入耗时: {args.import_delay}ms")
+    print(f"{'场景':<10}{'扫描(ms)':>12}{'打开画布(ms)':>16}{'合计(ms)':>12}")
+    for label, scan, open_time in [
+        ("eager", scan_eager, open_eager),
+        ("cold", scan_cold, open_cold),
+        ("warm", scan_warm, open_warm),
+        ("reopen", scan_reopen, open_reopen),
+    ]:
+        print(f"{label:<10}{scan * 1000:>12.1f}{open_time * 1000:>16.1f}{(scan + open_time) * 1000:>12.1f}")
+    print(f"修改 1 个文件后重新扫描: {scan_changed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+画廊索引基准测试：在临时目录生成 N 个工作流文件
+
+对比：
+- 原实现：每次刷新 glob + stat 全部文件，再在 Python 中过滤排序
+- gallery_index：首次建立索引、无变化时的增量同步、一页的查询（count + query）
+    python dev/bench_gallery_index.py --count 5000
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.utils import workflow_io
+from app.utils.gallery_index import GalleryIndex, KIND_WORKFLOW
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def legacy_refresh(workflow_dir, text):
+    files = []
+    for wf_path in workflow_dir.glob("*.workflow.json"):
+        stat = wf_path.stat()
+        name = wf_path.stem.split(".")[0]
+        if text and text not in name.lower():
+            continue
+        files.append((wf_path, stat.st_mtime))
+    files.sort(key=lambda x: x[1], reverse=True)
+    return files[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5000)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_gallery_index_"))
+    try:
+        workflow_dir = work_dir / "workflows"
+        workflow_dir.mkdir()
+        graph = {"nodes": {f"n{i}": {"type_": "x", "name": f"node {i}"} for i in range(20)}, "connections": []}
+        for i in range(args.count):
+            workflow_io.write_workflow(workflow_dir / f"wf_{i:05d}.workflow.json", {"graph": graph, "runtime": {}})
+
+        index = GalleryIndex(work_dir / "gallery_index.db")
+        build, _ = timed(lambda: index.sync_workflows(workflow_dir))
+        resync, changed = timed(lambda: index.sync_workflows(workflow_dir))
+        assert not changed
+
+        def page():
+            index.count(KIND_WORKFLOW, workflow_dir, "12")
+            return index.query(KIND_WORKFLOW, workflow_dir, "12", "mtime", False, 0, 10)
+
+        query, _ = timed(page)
+        legacy, _ = timed(lambda: legacy_refresh(workflow_dir, "12"))
+
+        print(f"{args.count} 个工作流")
+        print(f"{'原实现 glob + stat + 排序':<28}{legacy * 1000:>10.1f} ms")
+        print(f"{'首次建立索引':<28}{build * 1000:>10.1f} ms")
+        print(f"{'增量同步（无变化）':<28}{resync * 1000:>10.1f} ms")
+        print(f"{'查询一页':<28}{query * 1000:>10.1f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+workflow_runner 连接索引基准测试
+
+构造一个大规模合成图，对比逐节点扫描 connections 与 GraphIndex 查询的耗时：
+    python dev/bench_graph_index.py --nodes 1000 --fan-in 3 --loops 50
+"""
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "runner"))
+
+from graph_index import GraphIndex
+
+
+def make_graph(num_nodes, fan_in, seed=0):
+    """生成 DAG：每个节点最多从前面的节点接入 fan_in 条连接"""
+    rng = random.Random(seed)
+    node_ids = [f"0x{i:08x}" for i in range(num_nodes)]
+    connections = []
+    for i in range(1, num_nodes):
+        for k in range(min(fan_in, i)):
+            src = node_ids[rng.randrange(0, i)]
+            connections.append({"out": [src, f"out_{k}"], "in": [node_ids[i], f"in_{k}"]})
+    return node_ids, connections
+
+
+def legacy_inputs(node_id, connections):
+    return [
+        (conn["out"][0], conn["out"][1], conn["in"][1])
+        for conn in connections if conn["in"][0] == node_id
+    ]
+
+
+def legacy_downstream(start, connections, all_ids):
+    downstream, visited, queue = set(), set(), deque([start])
+    while queue:
+        current = queue.popleft()
+        if current in visited:
+            continue
+        visited.add(current)
+        for conn in connections:
+            if conn["out"][0] == current and conn["in"][0] in all_ids:
+                target = conn["in"][0]
+                if target not in visited:
+                    downstream.add(target)
+                    queue.append(target)
+    return downstream
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32}{elapsed * 1000:>10.1f} ms")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--fan-in", type=int, default=3)
+    parser.add_argument("--loops", type=int, default=50, help="模拟循环体重复构建输入的次数")
+    parser.add_argument("--downstream-samples", type=int, default=10)
+    args = parser.parse_args()
+
+    node_ids, connections = make_graph(args.nodes, args.fan_in)
+    all_ids = set(node_ids)
+    loop_body = node_ids[: max(1, args.nodes // 10)]
+    samples = node_ids[: args.downstream_samples]
+    print(f"节点: {len(node_ids)}  连接: {len(connections)}  循环体节点: {len(loop_body)}  迭代: {args.loops}")
+    print("-" * 42)
+
+    legacy_in, t1 = timed("legacy: 全图输入构建", lambda: [legacy_inputs(n, connections) for n in node_ids])
+    legacy_loop, t2 = timed("legacy: 循环体输入构建", lambda: [
+        legacy_inputs(n, connections) for _ in range(args.loops) for n in loop_body])
+    legacy_down, t3 = timed("legacy: 下游 BFS", lambda: [
+        legacy_downstream(n, connections, all_ids) for n in samples])
+
+    index, t0 = timed("index: 构建索引", lambda: GraphIndex(connections))
+    index_in, t4 = timed("index: 全图输入构建", lambda: [list(index.inputs_of(n)) for n in node_ids])
+    index_loop, t5 = timed("index: 循环体输入构建", lambda: [
+        list(index.inputs_of(n)) for _ in range(args.loops) for n in loop_body])
+    index_down, t6 = timed("index: 下游 BFS", lambda: [index.downstream(n, all_ids) for n in samples])
+
+    assert legacy_in == index_in
+    assert legacy_loop == index_loop
+    assert legacy_down == index_down
+    print("-" * 42)
+    legacy_total = t1 + t2 + t3
+    index_total = t0 + t4 + t5 + t6
+    print(f"{'合计 legacy / index':<32}{legacy_total * 1000:>10.1f} ms / {index_total * 1000:.1f} ms "
+          f"(x{legacy_total / max(index_total, 1e-9):.0f})")
+
+
+if __name__ == "__main__":
+    main()
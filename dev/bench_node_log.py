@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+节点日志文件写入基准测试
+
+对比原实现（每行读取整个文件、追加一行后整体重写）与 RingLogFile（追加写入 + 周期压缩）：
+    python dev/bench_node_log.py --lines 100000 --legacy-lines 5000
+原实现逐行耗时随文件行数线性增长，默认只跑 legacy-lines 行并按单行耗时外推到 lines 行。
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.node_logger import MAX_LOG_LINES, RingLogFile
+
+
+def legacy_append(path: Path, line: str):
+    existing_lines = []
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            existing_lines = f.readlines()[-(MAX_LOG_LINES - 1):]
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines((existing_lines + [line])[-MAX_LOG_LINES:])
+
+
+def make_line(index: int) -> str:
+    return f"[2025-01-01 00:00:00] run-{index % 300} INFO: 处理第 {index} 条记录，当前进度 {index / 1000:.2f}%\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--legacy-lines", type=int, default=5000)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_node_log_"))
+    try:
+        # 原实现：先写满 MAX_LOG_LINES 行，再测量满文件状态下的逐行耗时
+        legacy_path = work_dir / "legacy.log"
+        legacy_path.write_text("".join(make_line(i) for i in range(MAX_LOG_LINES)), encoding="utf-8")
+        start = time.perf_counter()
+        for i in range(args.legacy_lines):
+            legacy_append(legacy_path, make_line(i))
+        legacy_per_line = (time.perf_counter() - start) / args.legacy_lines
+
+        ring = RingLogFile(work_dir / "ring.log")
+        start = time.perf_counter()
+        for i in range(args.lines):
+            ring.append(make_line(i))
+        ring_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(100):
+            tail = ring.read_tail()
+        read_elapsed = (time.perf_counter() - start) / 100
+        ring.close()
+
+        tail_lines = tail.splitlines()
+        assert len(tail_lines) == MAX_LOG_LINES, len(tail_lines)
+        assert tail_lines[-1] == make_line(args.lines - 1).rstrip("\n")
+        file_lines = len((work_dir / "ring.log").read_text(encoding="utf-8").splitlines())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"写入 {args.lines} 行，保留最近 {MAX_LOG_LINES} 行")
+    print(f"原实现:      {legacy_per_line * 1e6:>10.1f} us/行，外推 {legacy_per_line * args.lines:>8.1f} s")
+    print(f"RingLogFile: {ring_elapsed / args.lines * 1e6:>10.1f} us/行，合计 {ring_elapsed:>8.2f} s")
+    print(f"读取尾部 {MAX_LOG_LINES} 行: {read_elapsed * 1000:.2f} ms；文件当前行数 {file_lines}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+工作流文件读写基准测试（使用 workflows/ 下自带的示例工作流）
+
+对比：
+- 原实现：json.load / json.dump(indent=2, ensure_ascii=False)
+- workflow_io：标准库 / orjson 后端的紧凑分行格式，可选 zstd 压缩
+"到 graph"为解析出 graph 字段（界面可以开始创建节点）的耗时
+    python dev/bench_workflow_io.py --repeat 5
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.utils import workflow_io
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_to_graph(path):
+    for key, _ in workflow_io.iter_workflow_sections(path):
+        if key == "graph":
+            return
+
+
+def reorder(data):
+    """与 save_full_workflow 一致：runtime 放在最后"""
+    order = ["version", "graph", "global_variable", "runtime"]
+    return {key: data[key] for key in sorted(data, key=lambda k: order.index(k) if k in order else len(order))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = ["json"]
+    try:
+        workflow_io.set_backend("orjson")
+        backends.append("orjson")
+    except ValueError:
+        pass
+    compress_options = [False, True] if workflow_io.zstd_available() else [False]
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_workflow_io_"))
+    try:
+        for source in sorted((ROOT / "workflows").glob("*.workflow.json")):
+            with open(source, "r", encoding="utf-8") as f:
+                data = reorder(json.load(f))
+            legacy_path = work_dir / "legacy.workflow.json"
+            with open(legacy_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+            def legacy_load():
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    json.load(f)
+
+            def legacy_save():
+                with open(work_dir / "legacy_out.json", "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+
+            print(f"\n{source.name}  ({source.stat().st_size / 1024:.0f} KB)")
+            print(f"{'方式':<24}{'大小(KB)':>10}{'保存(ms)':>10}{'加载(ms)':>10}{'到graph(ms)':>12}")
+            print(f"{'原实现 json indent=2':<24}{legacy_path.stat().st_size / 1024:>10.0f}"
+                  f"{best_of(args.repeat, legacy_save) * 1000:>10.1f}{best_of(args.repeat, legacy_load) * 1000:>10.1f}"
+                  f"{best_of(args.repeat, lambda: time_to_graph(legacy_path)) * 1000:>12.1f}")
+
+            for backend in backends:
+                workflow_io.set_backend(backend)
+                for compress in compress_options:
+                    path = work_dir / f"{backend}_{compress}.workflow.json"
+                    save = best_of(args.repeat, lambda: workflow_io.write_workflow(path, data, compress=compress))
+                    load = best_of(args.repeat, lambda: workflow_io.read_workflow(path))
+                    to_graph = best_of(args.repeat, lambda: time_to_graph(path))
+                    assert workflow_io.read_workflow(path) == json.loads(json.dumps(data))
+                    label = f"{backend}{' + zstd' if compress else ''}"
+                    print(f"{label:<24}{path.stat().st_size / 1024:>10.0f}{save * 1000:>10.1f}"
+                          f"{load * 1000:>10.1f}{to_graph * 1000:>12.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+异步任务队列行为检查
+
+- DYNAMICFORM 输入（动态 pydantic 模型列表）经 /jobs 持久化后，工作线程拿到的数据与 /run 一致
+- 服务停止中断的任务保持运行中状态与上传目录，重建队列时重新排队
+- 客户端取消的任务记为 cancelled 并释放上传目录
+- 任务结束与客户端取消交错时 cancel() 不抛异常、不残留取消标记
+    python dev/check_job_queue.py
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import create_model
+
+from runner.component_executor import ExecutionCancelled
+from runner.job_queue import JobQueue, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_CANCELLED
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def check_dynamic_form(data_dir):
+    row_model = create_model("DynamicForm_check", name=(str, ...), weight=(float, ...))
+    input_model = create_model("InputModel", form=(List[row_model], None), text=(str, None))
+    request = input_model(form=[{"name": "a", "weight": 1.5}, {"name": "b", "weight": 2}], text="hi")
+    # /run 路径：_collect_external_inputs 对非文件输入做 jsonable_encoder
+    run_inputs = {key: jsonable_encoder(getattr(request, key)) for key in ("form", "text")}
+
+    received = {}
+    queue = JobQueue(runner=lambda inputs, cancel_event: received.update(inputs) or {"ok": True},
+                     data_dir=data_dir, workers=1)
+    queue.start()
+    job_id = queue.submit({"form": request.form, "text": request.text})
+    assert wait_for(lambda: queue.get(job_id)["status"] == JOB_SUCCEEDED), queue.get(job_id)
+    queue.stop()
+    assert received == run_inputs, (received, run_inputs)
+    print(f"DYNAMICFORM 输入一致: {received['form']}")
+
+
+def check_shutdown_and_cancel(data_dir):
+    released = []
+    started = threading.Event()
+
+    def blocking_runner(inputs, cancel_event):
+        started.set()
+        cancel_event.wait()
+        raise ExecutionCancelled("中止")
+
+    queue = JobQueue(runner=blocking_runner, data_dir=data_dir, workers=1, release_spool=released.append)
+    queue.start()
+    job_id = queue.submit({"x": 1}, spool_dir="spool-shutdown")
+    assert started.wait(5)
+    queue.stop()
+    assert wait_for(lambda: not queue._cancel_events)
+    assert queue.get(job_id)["status"] == JOB_RUNNING
+    assert released == [], released
+
+    started.clear()
+    queue = JobQueue(runner=blocking_runner, data_dir=data_dir, workers=1, release_spool=released.append)
+    assert queue.get(job_id)["status"] in (JOB_QUEUED, JOB_RUNNING)
+    queue.start()
+    assert started.wait(5)
+    queue.cancel(job_id)
+    assert wait_for(lambda: queue.get(job_id)["status"] == JOB_CANCELLED), queue.get(job_id)
+    assert released == ["spool-shutdown"], released
+    queue.stop()
+    print("停止后任务恢复、客户端取消释放上传目录：通过")
+
+
+def check_cancel_while_finishing(data_dir, rounds=200):
+    # 确定性交错：行仍为运行中、取消事件已不存在（旧实现中工作线程两次加锁之间的状态）
+    queue = JobQueue(runner=lambda inputs, cancel_event: {"ok": True}, data_dir=data_dir, workers=1)
+    job_id = queue.submit({"x": 0})
+    with queue._lock:
+        queue._conn.execute("UPDATE jobs SET status=? WHERE id=?", (JOB_RUNNING, job_id))
+        queue._conn.commit()
+    assert queue.cancel(job_id) == JOB_RUNNING
+    assert not queue._client_cancelled
+
+    # 并发交错：任务即刻完成，同时反复取消
+    queue.start()
+    for i in range(rounds):
+        job_id = queue.submit({"x": i})
+        while queue.get(job_id)["status"] not in (JOB_SUCCEEDED, JOB_CANCELLED):
+            queue.cancel(job_id)
+    queue.stop()
+    assert wait_for(lambda: not queue._cancel_events)
+    assert not queue._client_cancelled, queue._client_cancelled
+    print(f"任务结束与取消交错 {rounds} 次：通过")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        check_dynamic_form(Path(tmp) / "form")
+        check_shutdown_and_cancel(Path(tmp) / "shutdown")
+        check_cancel_while_finishing(Path(tmp) / "race")
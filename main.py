@@ -4,10 +4,15 @@ import sys
 import warnings
 warnings.filterwarnings("ignore")
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QApplication
+from app.utils.startup_profiler import PROFILER
+
+# --profile-startup：记录模块导入与各界面初始化耗时，首次绘制后输出到日志与 startup_profile.txt
+if "--profile-startup" in sys.argv:
+    sys.argv.remove("--profile-startup")
+    PROFILER.enable()
 
-from app.main_window import LowCodeWindow
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QApplication
 
 
 def enable_dpi_scale():
@@ -30,8 +35,14 @@ if __name__ == '__main__':
 
     # 创建并显示主窗口
     try:
-        window = LowCodeWindow()
+        with PROFILER.section("导入主窗口"):
+            from app.main_window import LowCodeWindow
+        with PROFILER.section("LowCodeWindow"):
+            window = LowCodeWindow()
         window.show()
+        PROFILER.mark("主窗口显示")
+        # 事件循环处理完首批绘制事件后输出报告
+        QTimer.singleShot(0, lambda: (PROFILER.mark("首次绘制完成"), PROFILER.finish()))
         print("✅ 低代码平台启动成功！")
     except Exception as e:
         import traceback